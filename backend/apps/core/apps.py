@@ -5,3 +5,7 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'コア機能'
+    
+    def ready(self):
+        """変更フィード・サジェスト用シグナルハンドラを登録"""
+        from . import signals  # noqa: F401
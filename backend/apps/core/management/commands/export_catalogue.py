@@ -0,0 +1,92 @@
+"""
+カタログのファイルエクスポートコマンド
+
+使用方法:
+    python manage.py export_catalogue tools --output=/tmp/tools.csv
+    python manage.py export_catalogue tags --format=xlsx --output=/tmp/tags.xlsx
+    python manage.py export_catalogue tools --chunk-size=1000 --output=/tmp/tools.csv
+
+説明:
+    管理画面のエクスポート（ToolResource / TagResource）と同じ列・形式で、
+    全件をチャンク単位で読み込みながらファイルに書き出します。
+    大量データを定期バッチ等のバックグラウンドで出力する場合に使用します。
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.exports import (
+    DEFAULT_CHUNK_SIZE, XLSX_EXPORT_ENABLED,
+    iter_export_rows, write_csv, write_xlsx,
+)
+
+
+def get_export_target(name):
+    """エクスポート対象: (リソース, クエリセット)"""
+    if name == 'tools':
+        from tools.admin import ToolResource
+        from tools.models import Tool
+        return ToolResource(), Tool.objects.prefetch_related('tags')
+    from tags.admin import TagResource
+    from tags.models import Tag
+    return TagResource(), Tag.objects.select_related('tag_category')
+
+
+class Command(BaseCommand):
+    help = 'ツール・タグをCSV / XLSXファイルにエクスポートします（ストリーミング）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'target',
+            choices=['tools', 'tags'],
+            help='エクスポート対象'
+        )
+        parser.add_argument(
+            '--output',
+            required=True,
+            help='出力ファイルのパス'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'xlsx'],
+            default='csv',
+            help='出力形式（デフォルト: csv、UTF-8 BOM付き）'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'DBから一度に読み込む件数（デフォルト: {DEFAULT_CHUNK_SIZE}）'
+        )
+
+    def handle(self, *args, **options):
+        if options['format'] == 'xlsx' and not XLSX_EXPORT_ENABLED:
+            raise CommandError('XLSX出力にはopenpyxlが必要です')
+
+        resource, queryset = get_export_target(options['target'])
+        rows = iter_export_rows(resource, queryset, chunk_size=max(1, options['chunk_size']))
+
+        # 件数表示用にヘッダー行以外を数える
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        start = time.perf_counter()
+        try:
+            if options['format'] == 'xlsx':
+                with open(options['output'], 'wb') as f:
+                    write_xlsx(counted(rows), f, title=options['target'])
+            else:
+                with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                    write_csv(counted(rows), f)
+        except OSError as e:
+            raise CommandError(f'ファイルに書き込めません: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {options["target"]}: {max(count - 1, 0):,}件を {options["output"]} に出力しました '
+            f'({time.perf_counter() - start:.1f}秒)'
+        ))
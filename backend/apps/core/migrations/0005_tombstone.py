@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_contactpage_to_streamfield'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('tool', 'ツール'), ('tag', 'タグ'), ('blog', 'ブログ記事')], max_length=20, verbose_name='種別')),
+                ('object_id', models.BigIntegerField(verbose_name='オブジェクトID')),
+                ('slug', models.CharField(blank=True, max_length=255, verbose_name='スラッグ')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='削除日時')),
+            ],
+            options={
+                'verbose_name': '削除記録',
+                'verbose_name_plural': '削除記録',
+                'ordering': ['-deleted_at'],
+            },
+        ),
+    ]
@@ -241,3 +241,43 @@ class ContactPage(AbstractEmailForm):
     class Meta:
         verbose_name = "お問い合わせページ"
         verbose_name_plural = "お問い合わせページ"
+
+
+class Tombstone(models.Model):
+    """
+    削除済みエンティティの記録（変更フィードAPI用）
+    
+    ツール・タグの削除、ブログ記事の非公開化/削除時にシグナルで記録し、
+    /api/changes/ で deleted として返す
+    """
+    
+    ENTITY_TYPES = [
+        ('tool', 'ツール'),
+        ('tag', 'タグ'),
+        ('blog', 'ブログ記事'),
+    ]
+    
+    entity_type = models.CharField(
+        "種別",
+        max_length=20,
+        choices=ENTITY_TYPES
+    )
+    object_id = models.BigIntegerField("オブジェクトID")
+    slug = models.CharField(
+        "スラッグ",
+        max_length=255,
+        blank=True
+    )
+    deleted_at = models.DateTimeField(
+        "削除日時",
+        auto_now_add=True,
+        db_index=True
+    )
+    
+    class Meta:
+        verbose_name = "削除記録"
+        verbose_name_plural = "削除記録"
+        ordering = ['-deleted_at']
+    
+    def __str__(self):
+        return f"{self.get_entity_type_display()} {self.slug or self.object_id} @ {self.deleted_at}"
@@ -0,0 +1,42 @@
+"""
+変更フィード・サジェスト用シグナルハンドラ
+
+- 削除・非公開化されたエンティティをTombstoneに記録する
+- タグ・タグマッピングの変更でサジェストインデックスを無効化する
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.signals import page_unpublished
+
+from blog.models import BlogPage
+from tags.models import Tag, TagMapping
+from tools.facets import invalidate_tool_catalogue
+from tools.models import Tool
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=Tool)
+def record_tool_deleted(sender, instance, **kwargs):
+    """ツール削除を記録"""
+    Tombstone.objects.create(entity_type='tool', object_id=instance.pk, slug=instance.slug)
+
+
+@receiver(post_delete, sender=Tag)
+def record_tag_deleted(sender, instance, **kwargs):
+    """タグ削除を記録"""
+    Tombstone.objects.create(entity_type='tag', object_id=instance.pk, slug=instance.slug)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=TagMapping)
+@receiver(post_delete, sender=TagMapping)
+def invalidate_suggest_index(sender, **kwargs):
+    """タグ名・表記ゆれの変更をサジェストに反映（カタログバージョンを更新）"""
+    invalidate_tool_catalogue()
+
+
+@receiver(page_unpublished, sender=BlogPage)
+def record_blog_unpublished(sender, instance, **kwargs):
+    """ブログ記事の非公開化（削除時も発火）を記録"""
+    Tombstone.objects.create(entity_type='blog', object_id=instance.pk, slug=instance.slug)
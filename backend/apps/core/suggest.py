@@ -0,0 +1,168 @@
+"""
+サジェスト（入力補完）インデックス
+
+ツール名・タグ名・タグの表記ゆれ（synonyms）・TagMappingのバリエーションを
+Tag.normalize_string（NFKC + 小文字化）で正規化し、前方一致で検索する。
+
+- 文字列全体に加え、単語の先頭（空白区切り）からの前方一致にも対応
+  （例: "bands" → "Bollinger Bands"）
+- 重み: ツールは week_score、タグは付与されたツールの week_score 合計
+- 短い入力（SHORT_PREFIX_LENGTH文字以下）は候補が多いため、
+  上位候補を事前計算した辞書で O(1) に返す。それ以上は二分探索で範囲を走査
+- ツールカタログのバージョン（tools.facets.get_catalogue_version）が
+  変わると次回アクセス時に再構築する（プロセスごとに保持）
+"""
+import re
+import threading
+from bisect import bisect_left
+
+from tags.models import Tag, TagMapping
+from tools.facets import get_catalogue_version
+from tools.models import Tool
+
+
+# 事前計算する前方一致の最大文字数
+SHORT_PREFIX_LENGTH = 2
+
+# 事前計算する候補数（種別ごと）
+SHORT_PREFIX_TOP_N = 10
+
+ENTITY_TYPES = ('tool', 'tag')
+
+
+def normalize_query(text):
+    """入力・インデックス共通の正規化（NFKC + 小文字化 + 空白の統一）"""
+    return re.sub(r'\s+', ' ', Tag.normalize_string(text or ''))
+
+
+def iter_keys(text):
+    """インデックスキー（文字列全体 + 各単語の先頭からの部分文字列）"""
+    normalized = normalize_query(text)
+    if not normalized:
+        return
+    yield normalized
+    for match in re.finditer(r' ', normalized):
+        yield normalized[match.end():]
+
+
+class SuggestIndex:
+    """ツール・タグのサジェストインデックス"""
+
+    def __init__(self, entries, version=None):
+        """
+        Args:
+            entries: (種別, 表示データdict, 重み, キー元の文字列リスト) のリスト
+            version: 構築時のカタログバージョン
+        """
+        self.version = version
+
+        # 重み降順 → 名前順に並べ、以降はこの順位で比較する
+        entries = sorted(entries, key=lambda entry: (-entry[2], entry[1]['name']))
+        self.types = [entity_type for entity_type, data, weight, texts in entries]
+        self.items = [data for entity_type, data, weight, texts in entries]
+
+        keys = set()
+        for position, (entity_type, data, weight, texts) in enumerate(entries):
+            for text in texts:
+                for key in iter_keys(text):
+                    keys.add((key, position))
+        self.keys = sorted(keys)
+        self.key_strings = [key for key, position in self.keys]
+
+        # 短い前方一致の上位候補
+        short = {}
+        for key, position in self.keys:
+            for length in range(1, min(len(key), SHORT_PREFIX_LENGTH) + 1):
+                short.setdefault(key[:length], set()).add(position)
+        self.short_prefixes = {}
+        for prefix, positions in short.items():
+            top = {entity_type: [] for entity_type in ENTITY_TYPES}
+            for position in sorted(positions):
+                candidates = top[self.types[position]]
+                if len(candidates) < SHORT_PREFIX_TOP_N:
+                    candidates.append(position)
+            self.short_prefixes[prefix] = top
+
+    @classmethod
+    def build(cls, version=None):
+        """DBから構築（3クエリ）"""
+        from django.db.models.functions import Coalesce
+        from django.db.models import F, Value
+
+        tag_weights = {}
+        entries = []
+        tools = Tool.objects.annotate(
+            score=Coalesce(F('stats__week_score'), Value(0.0))
+        ).values_list('id', 'name', 'slug', 'tag_slugs', 'score')
+        for tool_id, name, slug, tag_slugs, score in tools:
+            entries.append(('tool', {'type': 'tool', 'id': tool_id, 'name': name, 'slug': slug}, score, [name]))
+            for tag_slug in tag_slugs:
+                tag_weights[tag_slug] = tag_weights.get(tag_slug, 0.0) + score
+
+        # TagMappingのバリエーションは正式名称（= タグ名）のタグに紐付ける
+        variations = {}
+        for canonical_name, mapping_variations in TagMapping.objects.values_list('canonical_name', 'variations'):
+            variations.setdefault(normalize_query(canonical_name), []).extend(mapping_variations)
+
+        for tag_id, name, slug, synonyms in Tag.objects.values_list('id', 'name', 'slug', 'synonyms'):
+            texts = [name] + list(synonyms) + variations.get(normalize_query(name), [])
+            entries.append(('tag', {'type': 'tag', 'id': tag_id, 'name': name, 'slug': slug}, tag_weights.get(slug, 0.0), texts))
+
+        return cls(entries, version)
+
+    def suggest(self, query, limit=5):
+        """
+        前方一致の候補を取得
+
+        Returns:
+            dict: {'tools': [...], 'tags': [...]}（それぞれ重み順に最大limit件）
+        """
+        prefix = normalize_query(query)
+        results = {entity_type: [] for entity_type in ENTITY_TYPES}
+        if not prefix:
+            return self._format(results)
+
+        if len(prefix) <= SHORT_PREFIX_LENGTH and limit <= SHORT_PREFIX_TOP_N:
+            top = self.short_prefixes.get(prefix)
+            if top:
+                for entity_type in ENTITY_TYPES:
+                    results[entity_type] = top[entity_type][:limit]
+            return self._format(results)
+
+        positions = set()
+        start = bisect_left(self.key_strings, prefix)
+        for i in range(start, len(self.keys)):
+            key, position = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            positions.add(position)
+
+        for position in sorted(positions):
+            candidates = results[self.types[position]]
+            if len(candidates) < limit:
+                candidates.append(position)
+        return self._format(results)
+
+    def _format(self, results):
+        return {
+            f'{entity_type}s': [self.items[position] for position in positions]
+            for entity_type, positions in results.items()
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_suggest_index():
+    """最新のサジェストインデックスを取得（カタログ変更時は再構築）"""
+    global _index
+
+    version = get_catalogue_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = SuggestIndex.build(version)
+            index = _index
+    return index
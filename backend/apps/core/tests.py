@@ -1,3 +1,188 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tags.models import Tag, TagMapping
+from tools.models import Tool, ToolStats
+from tools.tests import create_tool
+from . import suggest
+
+
+class FastJSONRendererTest(TestCase):
+    """orjsonベースのレンダラー・パーサーがDRF標準と同じ入出力になることを検証"""
+
+    DATA = {
+        'text': '日本語\u2028改行\u2029',
+        'created_at': timezone.now(),
+        'price': Decimal('1.50'),
+        'elapsed': timedelta(seconds=90),
+        1: [None, True, 0.5],
+    }
+
+    def test_same_output_as_drf(self):
+        from rest_framework.renderers import JSONRenderer
+        from config.renderers import FastJSONRenderer
+
+        self.assertEqual(FastJSONRenderer().render(self.DATA), JSONRenderer().render(self.DATA))
+        # インデント指定時は標準実装で処理
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(self.DATA, renderer_context=context),
+            JSONRenderer().render(self.DATA, renderer_context=context)
+        )
+
+    def test_parser(self):
+        import io
+        from rest_framework.exceptions import ParseError
+        from config.renderers import FastJSONParser
+
+        body = '{"name": "ボリンジャーバンド", "tags": [1, 2]}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), {'name': 'ボリンジャーバンド', 'tags': [1, 2]})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ChangesFeedTest(TestCase):
+    """変更フィードAPI（キーセットカーソル・削除・遅延）を検証"""
+
+    def setUp(self):
+        # 一括更新と同じく全ツールを同一時刻で更新
+        self.changed_at = timezone.now() - timedelta(hours=1)
+        self.tools = [create_tool(f'Feed Tool {i}') for i in range(5)]
+        Tool.objects.update(updated_at=self.changed_at)
+
+    def get(self, params):
+        return self.client.get('/api/changes/', params)
+
+    def get_all(self, limit):
+        """has_moreがなくなるまでカーソルで読み進める"""
+        response = self.get({'since': (self.changed_at - timedelta(minutes=1)).isoformat(), 'limit': limit}).json()
+        pages = [response]
+        while response['has_more']:
+            response = self.get({'cursor': response['cursor'], 'limit': limit}).json()
+            pages.append(response)
+        return pages
+
+    def test_same_timestamp_pages(self):
+        pages = self.get_all(limit=2)
+        self.assertEqual([page['count'] for page in pages], [2, 2, 1])
+        ids = [change['id'] for page in pages for change in page['changes']]
+        self.assertEqual(ids, sorted(tool.pk for tool in self.tools))
+
+        # 最後のカーソルからは新しい変更のみ
+        response = self.get({'cursor': pages[-1]['cursor']}).json()
+        self.assertEqual((response['count'], response['has_more']), (0, False))
+        self.assertEqual(response['cursor'], pages[-1]['cursor'])
+
+    def test_deleted_and_recent_changes(self):
+        from .models import Tombstone
+
+        deleted = self.tools[0]
+        deleted.delete()
+        Tombstone.objects.update(deleted_at=self.changed_at)
+        # 直近の変更（遅延時間内）はまだ返さない
+        create_tool('Feed Tool New')
+
+        changes = [change for page in self.get_all(limit=10) for change in page['changes']]
+        self.assertEqual(len(changes), 5)
+        self.assertEqual(
+            [(change['type'], change['id'], change['action']) for change in changes if change['action'] == 'deleted'],
+            [('tool', deleted.pk, 'deleted')]
+        )
+
+    def test_invalid_params(self):
+        since = self.changed_at.isoformat()
+        self.assertEqual(self.get({}).status_code, 400)
+        self.assertEqual(self.get({'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.get({'since': since, 'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.get({'cursor': 'invalid'}).status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SuggestAPITest(TestCase):
+    """サジェストAPIを検証"""
+
+    def setUp(self):
+        cache.clear()
+        suggest._index = None
+
+        tag = Tag.objects.create(name='ボリンジャーバンド', slug='bollinger-bands', synonyms=['ボリバン'])
+        TagMapping.objects.create(canonical_name='ボリンジャーバンド', variations=['bb'])
+        for i, name in enumerate(['Bollinger Bands EA', 'Bollinger Scalper']):
+            tool = create_tool(name)
+            tool.tags.add(tag)
+            ToolStats.objects.create(tool=tool, week_score=float(i))
+
+    def get(self, q):
+        return self.client.get('/api/suggest/', {'q': q}).json()
+
+    def test_prefix_weighted_by_score(self):
+        data = self.get('boll')
+        self.assertEqual([tool['name'] for tool in data['tools']], ['Bollinger Scalper', 'Bollinger Bands EA'])
+
+    def test_word_prefix_and_fullwidth(self):
+        self.assertEqual([tool['name'] for tool in self.get('ＢＡＮＤＳ')['tools']], ['Bollinger Bands EA'])
+
+    def test_tag_synonyms_and_variations(self):
+        self.assertEqual([tag['slug'] for tag in self.get('ボリバ')['tags']], ['bollinger-bands'])
+        self.assertEqual([tag['slug'] for tag in self.get('ｂｂ')['tags']], ['bollinger-bands'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class StreamingExportTest(TestCase):
+    """ストリーミングエクスポートが通常のエクスポートと同じCSVを出力することを検証"""
+
+    def setUp(self):
+        tag = Tag.objects.create(name='RSI', slug='rsi', synonyms=['アールエスアイ', 'ＲＳＩ'])
+        for i in range(3):
+            tool = create_tool(
+                f'Export Tool {i}',
+                short_description='説明, カンマ入り',
+                tool_type='Indicator',
+                ribbons=['featured', 'sale'],
+                metadata={'version': i},
+            )
+            tool.tags.add(tag)
+
+    def assertSameCSV(self, resource, queryset):
+        from apps.core.exports import iter_csv, iter_export_rows
+        from tools.admin import CSVUTF8BOM
+
+        expected = CSVUTF8BOM().export_data(resource.export(queryset))
+        streamed = ''.join(iter_csv(iter_export_rows(resource, queryset, chunk_size=2), chunk_size=2))
+        self.assertTrue(streamed.startswith('\ufeff'))
+        self.assertEqual(streamed, expected)
+
+    def test_tool_export(self):
+        from tools.admin import ToolResource
+
+        self.assertSameCSV(ToolResource(), Tool.objects.prefetch_related('tags'))
+
+    def test_tag_export(self):
+        from tags.admin import TagResource
+
+        self.assertSameCSV(TagResource(), Tag.objects.select_related('tag_category'))
+
+    def test_admin_export_follows_changelist_filters(self):
+        from django.contrib.auth import get_user_model
+
+        create_tool('Other Tool', tool_type='EA')
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+        # 変更リストの絞り込み・検索がエクスポート対象に反映される
+        for params, expected in (
+            ({'format': 'csv'}, 4),
+            ({'format': 'csv', 'tool_type__exact': 'Indicator'}, 3),
+            ({'format': 'csv', 'q': 'Export Tool 1'}, 1),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get('/admin/tools/tool/export-stream/', params)
+                content = b''.join(response.streaming_content).decode('utf-8-sig')
+                self.assertEqual(len(content.strip().splitlines()) - 1, expected)
+
+        response = self.client.get('/admin/tools/tool/export-stream/', {'format': 'csv', 'unknown': '1'})
+        self.assertRedirects(response, '/admin/tools/tool/?e=1', fetch_redirect_response=False)
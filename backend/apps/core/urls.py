@@ -1,16 +1,20 @@
 """
 Core app URL configuration
 お問い合わせフォーム用APIエンドポイント
+変更フィードAPIエンドポイント
+サジェストAPIエンドポイント
 """
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import ContactFormViewSet
+from .views import ContactFormViewSet, changes_feed, suggest
 
 router = DefaultRouter()
 router.register(r'contact', ContactFormViewSet, basename='contact')
 
 urlpatterns = [
+    path('changes/', changes_feed, name='changes-feed'),
+    path('suggest/', suggest, name='suggest'),
     path('', include(router.urls)),
 ]
@@ -1,10 +1,12 @@
 """
 Core app views
 お問い合わせフォーム用APIビュー
+変更フィードAPI
+サジェストAPI
 """
 
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.throttling import AnonRateThrottle
@@ -14,7 +16,7 @@ import logging
 import requests  # reCAPTCHA検証用
 
 from .serializers import ContactFormSerializer
-from .models import ContactPage
+from .models import ContactPage, Tombstone
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +39,15 @@ class ContactSustainedRateThrottle(AnonRateThrottle):
     scope = 'contact_sustained'
 
 
+class SuggestRateThrottle(AnonRateThrottle):
+    """
+    サジェストAPI専用のレート制限
+    入力ごとに呼ばれるため、匿名ユーザー全体の制限（100/hour）より緩くする
+    """
+    rate = '60/min'
+    scope = 'suggest'
+
+
 class ContactFormViewSet(viewsets.ViewSet):
     """
     お問い合わせフォーム送信用ViewSet
@@ -231,3 +242,225 @@ class ContactFormViewSet(viewsets.ViewSet):
         
         # 直接接続の場合
         return request.META.get('REMOTE_ADDR', '')
+
+
+# 変更フィードの1レスポンスあたり最大件数
+CHANGES_FEED_MAX_LIMIT = 5000
+
+# 変更フィードで返す変更の遅延（秒）
+# auto_nowの時刻はコミットより前に決まるため、直近の変更は次回以降に返す
+# （この秒数より長いトランザクションでコミットされた変更は取りこぼし得る）
+CHANGES_FEED_SAFETY_LAG_SECONDS = 5
+
+
+def encode_changes_cursor(changed_at, entity_type, pk):
+    """変更フィードのカーソル（changed_at, type, id）を不透明な文字列に変換"""
+    import base64
+    
+    value = f'{changed_at.isoformat()}|{entity_type}|{pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_changes_cursor(cursor):
+    """
+    変更フィードのカーソルを (changed_at, type, id) に変換
+    
+    Returns:
+        タプル（不正なカーソルの場合はNone）
+    """
+    import base64
+    import binascii
+    from django.utils.dateparse import parse_datetime
+    
+    try:
+        changed_at, entity_type, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        changed_at = parse_datetime(changed_at)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if changed_at is None or changed_at.tzinfo is None:
+        return None
+    return changed_at, entity_type, pk
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def changes_feed(request):
+    """
+    変更フィードAPI（フロントエンド・CDNの差分同期用）
+    
+    GET /api/changes/?since=2025-12-01T00:00:00%2B09:00&limit=1000
+    GET /api/changes/?cursor=...&limit=1000
+    
+    since以降（cursor指定時は前回の最後の変更の次から）に作成・更新・削除された
+    ツール、タグ、ブログ記事、週間ランキングを (changed_at, type, id) 昇順で返す。
+    レスポンスの cursor を次回の cursor に指定してポーリングする
+    （同時刻の変更が多数あっても type, id の順で続きから返すため重複・欠落しない）。
+    直近 CHANGES_FEED_SAFETY_LAG_SECONDS 秒以内の変更は次回以降に返す。
+    
+    レスポンス:
+    {
+        "cursor": "...",
+        "has_more": false,
+        "count": 2,
+        "changes": [
+            {"type": "tool", "id": 1, "slug": "...", "action": "updated", "changed_at": "..."},
+            {"type": "tag", "id": 5, "slug": "...", "action": "deleted", "changed_at": "..."}
+        ]
+    }
+    """
+    from datetime import timedelta
+    from django.db.models import Max, Q
+    from django.utils import timezone
+    from django.utils.dateparse import parse_datetime
+    from blog.models import BlogPage
+    from tags.models import Tag
+    from tools.models import Tool, ToolStats
+    
+    cursor_param = request.query_params.get('cursor')
+    since_param = request.query_params.get('since')
+    if cursor_param:
+        position = decode_changes_cursor(cursor_param)
+        if position is None:
+            return Response(
+                {'error': 'cursorが不正です'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        since = parse_datetime(since_param) if since_param else None
+        if since is None:
+            return Response(
+                {'error': 'sinceをISO 8601形式で指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        # 種別の空文字はどの種別よりも前 → since と同時刻の変更も含む
+        position = (since, '', 0)
+    
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 1000)), CHANGES_FEED_MAX_LIMIT))
+    except ValueError:
+        return Response(
+            {'error': 'limitは整数で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    since, after_type, after_id = position
+    until = timezone.now() - timedelta(seconds=CHANGES_FEED_SAFETY_LAG_SECONDS)
+    changes = []
+    
+    def after_position(field, entity_type):
+        """単一種別のテーブルで (changed_at, type, id) がカーソルより後の行の条件"""
+        if entity_type > after_type:
+            condition = Q(**{f'{field}__gte': since})
+        elif entity_type < after_type:
+            condition = Q(**{f'{field}__gt': since})
+        else:
+            condition = Q(**{f'{field}__gt': since}) | Q(**{field: since, 'id__gt': after_id})
+        return condition & Q(**{f'{field}__lte': until})
+    
+    def collect(entity_type, rows):
+        for pk, slug, created_at, changed_at in rows:
+            changes.append({
+                'type': entity_type,
+                'id': pk,
+                'slug': slug,
+                'action': 'created' if created_at and created_at >= since else 'updated',
+                'changed_at': changed_at,
+            })
+    
+    # 各テーブルとも更新日時のインデックスで範囲検索（has_more判定用に1件多く取得）
+    collect('tool', Tool.objects.filter(after_position('updated_at', 'tool')).order_by(
+        'updated_at', 'id'
+    ).values_list('id', 'slug', 'created_at', 'updated_at')[:limit + 1])
+    collect('tag', Tag.objects.filter(after_position('updated_at', 'tag')).order_by(
+        'updated_at', 'id'
+    ).values_list('id', 'slug', 'created_at', 'updated_at')[:limit + 1])
+    collect('blog', BlogPage.objects.live().public().filter(
+        after_position('last_published_at', 'blog')
+    ).order_by('last_published_at', 'id').values_list(
+        'id', 'slug', 'first_published_at', 'last_published_at'
+    )[:limit + 1])
+    
+    for entity_type, pk, slug, deleted_at in Tombstone.objects.filter(
+        Q(deleted_at__gt=since)
+        | Q(deleted_at=since, entity_type__gt=after_type)
+        | Q(deleted_at=since, entity_type=after_type, object_id__gt=after_id),
+        deleted_at__lte=until
+    ).order_by('deleted_at', 'entity_type', 'object_id').values_list(
+        'entity_type', 'object_id', 'slug', 'deleted_at'
+    )[:limit + 1]:
+        changes.append({
+            'type': entity_type,
+            'id': pk,
+            'slug': slug,
+            'action': 'deleted',
+            'changed_at': deleted_at,
+        })
+    
+    # ランキングは一覧全体を1エンティティとして扱う（カーソル上のidは0）
+    ranking_updated_at = ToolStats.objects.filter(
+        last_updated__gte=since,
+        last_updated__lte=until
+    ).aggregate(latest=Max('last_updated'))['latest']
+    if ranking_updated_at and (ranking_updated_at, 'ranking', 0) > position:
+        changes.append({
+            'type': 'ranking',
+            'id': None,
+            'slug': 'weekly',
+            'action': 'updated',
+            'changed_at': ranking_updated_at,
+        })
+    
+    changes.sort(key=lambda change: (change['changed_at'], change['type'], change['id'] or 0))
+    
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if changes:
+        last = changes[-1]
+        position = (last['changed_at'], last['type'], last['id'] or 0)
+    
+    return Response({
+        'cursor': encode_changes_cursor(*position),
+        'has_more': has_more,
+        'count': len(changes),
+        'changes': changes,
+    })
+
+
+# サジェストの1種別あたり最大件数
+SUGGEST_MAX_LIMIT = 10
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([SuggestRateThrottle])
+def suggest(request):
+    """
+    サジェストAPI（検索ボックスの入力補完用）
+    
+    GET /api/suggest/?q=ボリ&limit=5
+    
+    ツール名・タグ名・タグの表記ゆれを前方一致（単語の先頭からも可）で検索し、
+    週間スコア順に返す。全角入力も正規化して一致させる。
+    
+    レスポンス:
+    {
+        "query": "ボリ",
+        "tools": [{"type": "tool", "id": 1, "name": "...", "slug": "..."}],
+        "tags": [{"type": "tag", "id": 5, "name": "ボリンジャーバンド", "slug": "..."}]
+    }
+    """
+    from .suggest import get_suggest_index
+    
+    query = request.query_params.get('q', '')
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 5)), SUGGEST_MAX_LIMIT))
+    except ValueError:
+        return Response(
+            {'error': 'limitは整数で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response({'query': query, **get_suggest_index().suggest(query, limit=limit)})
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+    
+    def ready(self):
+        """タグスラッグ同期用シグナルハンドラを登録"""
+        from . import signals  # noqa: F401
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:00
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def populate_tag_slugs(apps, schema_editor):
+    """既存記事のtag_slugsをBlogPageTagから作成"""
+    BlogPage = apps.get_model('blog', 'BlogPage')
+    BlogPageTag = apps.get_model('blog', 'BlogPageTag')
+    
+    slugs_map = {}
+    rows = BlogPageTag.objects.order_by('tag__slug').values_list('content_object_id', 'tag__slug')
+    for page_id, slug in rows.iterator():
+        slugs_map.setdefault(page_id, []).append(slug)
+    
+    for page_id, slugs in slugs_map.items():
+        BlogPage.objects.filter(pk=page_id).update(tag_slugs=slugs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_categorize_streamfield_blocks'),
+        ('tags', '0008_tag_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpage',
+            name='tag_slugs',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, help_text='タグフィルタ用（自動更新されます）', size=None, verbose_name='タグスラッグ'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpage',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_slugs'], name='idx_blogpage_tag_slugs'),
+        ),
+        migrations.RunPython(populate_tag_slugs, migrations.RunPython.noop),
+    ]
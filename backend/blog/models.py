@@ -35,6 +35,8 @@ from .blocks import (
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel
 from modelcluster.fields import ParentalKey, ParentalManyToManyField
 from modelcluster.contrib.taggit import ClusterTaggableManager
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from taggit.models import ItemBase
 
 
@@ -338,6 +340,16 @@ class BlogPage(HeadlessPreviewMixin, Page):
         verbose_name="タグ",
         help_text="記事に関連するタグ（入力で候補表示、既存タグから選択）"
     )
+    # タグスラッグ（tagsの非正規化コピー）
+    # タグフィルタを1条件（GINインデックス @> / &&）で処理するため、保存時・タグ変更時に同期される
+    tag_slugs = ArrayField(
+        models.CharField(max_length=100),
+        verbose_name="タグスラッグ",
+        blank=True,
+        default=list,
+        editable=False,
+        help_text="タグフィルタ用（自動更新されます）"
+    )
     
     # ========================================
     # 統計
@@ -376,10 +388,52 @@ class BlogPage(HeadlessPreviewMixin, Page):
     class Meta:
         verbose_name = "ブログ記事"
         verbose_name_plural = "ブログ記事"
+        indexes = [
+            GinIndex(fields=['tag_slugs'], name='idx_blogpage_tag_slugs'),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        from tags.cooccurrence import refresh_cooccurrence
+        
+        # タグスラッグの同期（ClusterTaggableManagerは未保存のタグも返す）
+        self.tag_slugs = sorted({tag.slug for tag in self.tags.all()})
+        previous_tag_ids = set(
+            BlogPageTag.objects.filter(content_object_id=self.pk).values_list('tag_id', flat=True)
+        ) if self.pk else set()
+        super().save(*args, **kwargs)
+        
+        # タグ共起行列の再計算（タグはsuper().save()内でコミットされるため保存後に実行）
+        current_tag_ids = set(
+            BlogPageTag.objects.filter(content_object_id=self.pk).values_list('tag_id', flat=True)
+        )
+        refresh_cooccurrence(previous_tag_ids | current_tag_ids)
+    
+    @classmethod
+    def sync_tag_slugs(cls, page_ids, batch_size=500):
+        """指定記事のtag_slugsをBlogPageTagから再計算して保存（タグ名変更・削除時用）"""
+        from django.utils import timezone
+        
+        page_ids = list(page_ids)
+        slugs_map = {page_id: [] for page_id in page_ids}
+        rows = BlogPageTag.objects.filter(
+            content_object_id__in=page_ids
+        ).order_by('tag__slug').values_list('content_object_id', 'tag__slug')
+        for page_id, slug in rows:
+            slugs_map[page_id].append(slug)
+        
+        # 記事の更新日時（APIのupdated_at）はlast_published_at
+        # → 変更フィード・サイトマップに反映されるよう一緒に更新
+        now = timezone.now()
+        cls.objects.bulk_update(
+            [cls(pk=page_id, tag_slugs=slugs, last_published_at=now) for page_id, slugs in slugs_map.items()],
+            ['tag_slugs', 'last_published_at'],
+            batch_size=batch_size
+        )
+        return slugs_map
+    
     # ========================================
     # Headless Preview設定
     # ========================================
@@ -4,7 +4,12 @@ Serializers for Blog API
 from rest_framework import serializers
 from wagtail.images.api.fields import ImageRenditionField
 from .models import BlogPage, BlogCategory, InvestmentType
-from tools.serializers import ToolListSerializer
+from tools.serializers import (
+    DynamicFieldsMixin,
+    ToolListSerializer,
+    ToolListFastSerializer,
+    use_fast_tool_serialization,
+)
 from tags.serializers import TagSimpleSerializer
 
 
@@ -24,9 +29,19 @@ class InvestmentTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description']
 
 
-class BlogPageSerializer(serializers.Serializer):
+class BlogPageSerializer(DynamicFieldsMixin, serializers.Serializer):
     """ブログ記事のシリアライザ（詳細表示用）"""
     
+    # アイキャッチ画像のレンディション（ビュー側でprefetchする）
+    featured_image_renditions = ('fill-300x200', 'fill-800x450', 'fill-1200x630')
+    
+    expandable_fields = {
+        'body': ['body'],
+        'featured_image': ['featured_image'],
+        'related_tools': ['related_tools'],
+        'tags': ['tags'],
+    }
+    
     id = serializers.IntegerField(read_only=True)
     title = serializers.CharField()
     slug = serializers.SlugField()
@@ -43,7 +58,7 @@ class BlogPageSerializer(serializers.Serializer):
     body = serializers.SerializerMethodField()
     
     # 関連
-    related_tools = ToolListSerializer(many=True, read_only=True)
+    related_tools = serializers.SerializerMethodField()
     tags = TagSimpleSerializer(many=True, read_only=True)
     
     # メタ情報
@@ -67,6 +82,16 @@ class BlogPageSerializer(serializers.Serializer):
             'large': obj.featured_image.get_rendition('fill-1200x630').url,
         }
     
+    def get_related_tools(self, obj):
+        """関連ツール（ToolListSerializer形式）を取得"""
+        from django.db.models import QuerySet
+        
+        related_tools = obj.related_tools.all()
+        # プレビュー時など未保存のリレーションはQuerySetではないため通常のシリアライザを使用
+        if use_fast_tool_serialization() and isinstance(related_tools, QuerySet):
+            return ToolListFastSerializer().serialize_queryset(related_tools)
+        return ToolListSerializer(related_tools, many=True).data
+    
     def get_body(self, obj):
         """StreamFieldをJSON形式で返す（comparison_tableブロックは変換）"""
         try:
@@ -170,9 +195,17 @@ class BlogPageSerializer(serializers.Serializer):
             return block
 
 
-class BlogPageListSerializer(serializers.Serializer):
+class BlogPageListSerializer(DynamicFieldsMixin, serializers.Serializer):
     """ブログ記事のシリアライザ（一覧表示用・軽量版）"""
     
+    # アイキャッチ画像のレンディション（ビュー側でprefetchする）
+    featured_image_renditions = ('fill-300x200',)
+    
+    expandable_fields = {
+        'featured_image': ['featured_image_thumbnail'],
+        'tags': ['tag_names'],
+    }
+    
     id = serializers.IntegerField(read_only=True)
     title = serializers.CharField()
     slug = serializers.SlugField()
@@ -0,0 +1,64 @@
+"""
+ブログ関連のシグナルハンドラ
+
+タグのスラッグ変更・削除時にBlogPage.tag_slugs（タグフィルタ用の非正規化カラム）を同期する
+記事の削除時にタグ共起行列を再計算する
+（記事自体のタグ・公開状態の変更はBlogPage.save()で同期）
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from tags.cooccurrence import refresh_cooccurrence
+from tags.models import Tag
+from tags.signals import tags_bulk_updated
+from .models import BlogPage, BlogPageTag
+
+
+@receiver(post_save, sender=Tag)
+def sync_blog_tag_slugs_on_tag_save(sender, instance, created, **kwargs):
+    """タグのスラッグ変更をtag_slugsに反映"""
+    if created:
+        return
+    page_ids = BlogPageTag.objects.filter(tag=instance).values_list('content_object_id', flat=True)
+    # 新しいスラッグを含まない記事のみ再計算（スラッグ変更がなければ対象なし）
+    stale_ids = list(
+        BlogPage.objects.filter(pk__in=page_ids).exclude(
+            tag_slugs__contains=[instance.slug]
+        ).values_list('pk', flat=True)
+    )
+    if stale_ids:
+        BlogPage.sync_tag_slugs(stale_ids)
+
+
+@receiver(post_delete, sender=Tag)
+def sync_blog_tag_slugs_on_tag_delete(sender, instance, **kwargs):
+    """削除されたタグをtag_slugsから除去（BlogPageTagはCASCADEで削除済み）"""
+    page_ids = list(
+        BlogPage.objects.filter(tag_slugs__contains=[instance.slug]).values_list('pk', flat=True)
+    )
+    if page_ids:
+        BlogPage.sync_tag_slugs(page_ids)
+
+
+@receiver(tags_bulk_updated)
+def sync_blog_tag_slugs_on_tags_bulk_updated(sender, tag_ids, **kwargs):
+    """タグの一括更新（bulk操作、post_saveなし）をtag_slugsに反映"""
+    page_ids = set(
+        BlogPageTag.objects.filter(tag_id__in=tag_ids).values_list('content_object_id', flat=True)
+    )
+    if page_ids:
+        BlogPage.sync_tag_slugs(page_ids)
+
+
+@receiver(pre_delete, sender=BlogPage)
+def remember_blog_tags_on_delete(sender, instance, **kwargs):
+    """削除後はBlogPageTagがCASCADEで消えるため、付いていたタグを記録"""
+    instance._deleted_tag_ids = set(
+        BlogPageTag.objects.filter(content_object_id=instance.pk).values_list('tag_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=BlogPage)
+def refresh_cooccurrence_on_blog_delete(sender, instance, **kwargs):
+    """削除した記事に付いていたタグの共起件数を再計算"""
+    refresh_cooccurrence(getattr(instance, '_deleted_tag_ids', ()))
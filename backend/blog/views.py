@@ -8,6 +8,8 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
 from django.db.models import Q, Count
 from django_filters import rest_framework as django_filters
+from tools.serializers import use_fast_tool_serialization
+from tools.views import SparseFieldsetMixin
 from .models import BlogPage, BlogCategory, InvestmentType
 from .serializers import (
     BlogPageSerializer,
@@ -51,34 +53,86 @@ class BlogPageFilter(django_filters.FilterSet):
     investment_type = django_filters.CharFilter(field_name='investment_type__slug')
     
     # タグフィルタ（カンマ区切りで複数指定可）
-    tags = django_filters.CharFilter(method='filter_tags')
+    tags = django_filters.CharFilter(method='filter_tags')  # すべて含む
+    tags_any = django_filters.CharFilter(method='filter_tags_any')  # いずれかを含む
     
     class Meta:
         model = BlogPage
-        fields = ['category', 'investment_type', 'tags']
+        fields = ['category', 'investment_type', 'tags', 'tags_any']
     
     def filter_tags(self, queryset, name, value):
-        """タグフィルタ（カンマ区切りで複数指定可）"""
-        tag_slugs = [slug.strip() for slug in value.split(',')]
-        for slug in tag_slugs:
-            queryset = queryset.filter(tags__slug=slug)
-        return queryset.distinct()
+        """タグフィルタ（カンマ区切りで複数指定可、AND条件: tag_slugs @> 指定スラッグ）"""
+        tag_slugs = [slug.strip() for slug in value.split(',') if slug.strip()]
+        return queryset.filter(tag_slugs__contains=tag_slugs)
+    
+    def filter_tags_any(self, queryset, name, value):
+        """タグフィルタ（カンマ区切りで複数指定可、OR条件: tag_slugs && 指定スラッグ）"""
+        tag_slugs = [slug.strip() for slug in value.split(',') if slug.strip()]
+        if not tag_slugs:
+            return queryset
+        return queryset.filter(tag_slugs__overlap=tag_slugs)
 
 
-class BlogPageViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogPageViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ブログ記事API
     
     list: 記事一覧取得（検索・フィルタリング対応）
     retrieve: 記事詳細取得
+    
+    フィールド指定:
+    - fields=id,title,slug: 指定フィールドのみ返却
+    - expand=featured_image,tags: 本文・画像・関連を除いた軽量版 + 指定分を返却
     """
     lookup_field = 'slug'
     
     def get_queryset(self):
-        """公開済みのライブページのみ取得"""
-        return BlogPage.objects.live().public().select_related(
-            'category', 'investment_type'
-        ).prefetch_related('tags', 'related_tools')
+        """
+        公開済みのライブページのみ取得
+        
+        返却フィールドに応じて本文のdefer / select_related / prefetch を絞り込む
+        （Wagtailページはonly()だと内部で参照するカラムまで遅延されるためdefer()を使用）
+        """
+        from django.db.models import Prefetch
+        from wagtail.images import get_image_model
+        from tools.models import Tool
+        
+        selected = self.get_selected_fields()
+        queryset = BlogPage.objects.live().public()
+        
+        if 'body' not in selected:
+            queryset = queryset.defer('body')
+        
+        related = [
+            name for name, fields in (
+                ('category', {'category', 'category_name'}),
+                ('investment_type', {'investment_type', 'investment_type_name'}),
+            ) if selected & fields
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        
+        if selected & {'featured_image', 'featured_image_thumbnail'}:
+            renditions = getattr(self.get_serializer_class(), 'featured_image_renditions', ())
+            queryset = queryset.prefetch_related(Prefetch(
+                'featured_image',
+                queryset=get_image_model().objects.prefetch_renditions(*renditions)
+            ))
+        
+        if 'tags' in selected:
+            # TagSimpleSerializerのcategory用にtag_categoryも同時取得
+            queryset = queryset.prefetch_related('tags__tag_category')
+        elif 'tag_names' in selected:
+            queryset = queryset.prefetch_related('tags')
+        
+        # 高速シリアライズ時はget_related_tools側でvalues()取得するためprefetch不要
+        if 'related_tools' in selected and not use_fast_tool_serialization():
+            queryset = queryset.prefetch_related(Prefetch(
+                'related_tools',
+                queryset=Tool.objects.select_related('stats').prefetch_related('tags')
+            ))
+        
+        return queryset
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = BlogPageFilter
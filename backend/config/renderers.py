@@ -0,0 +1,88 @@
+"""
+高速JSONレンダラー / パーサー（orjson）
+
+DRF標準のJSONRenderer / JSONParserと同じ出力・入力仕様のまま、
+シリアライズ処理をorjsonに置き換える。
+orjsonが未インストールの場合は標準実装にフォールバックする。
+
+設定（settings.REST_FRAMEWORK）:
+    'DEFAULT_RENDERER_CLASSES': ['config.renderers.FastJSONRenderer', ...]
+    'DEFAULT_PARSER_CLASSES': ['config.renderers.FastJSONParser', ...]
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson（高速JSON）
+try:
+    import orjson
+    FAST_JSON_ENABLED = True
+except ImportError:
+    FAST_JSON_ENABLED = False
+
+
+# DRFのJSONEncoderに合わせるオプション
+# - OPT_UTC_Z: UTCの "+00:00" を "Z" で出力
+# - OPT_NON_STR_KEYS: 数値などのキーを文字列化（json.dumps互換）
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    if FAST_JSON_ENABLED else 0
+)
+
+# orjsonが非対応の型（Decimal、遅延翻訳文字列、timedelta等）はDRFのエンコーダーに委譲
+_drf_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjsonベースのJSONレンダラー
+
+    インデント指定時・UNICODE_JSON / COMPACT_JSON無効時など、orjsonで同一出力を
+    保証できないケースは標準のJSONRendererで処理する
+    ※ NaN / Infinity は標準実装ではエラー（STRICT_JSON）、orjsonでは null になる
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        if (
+            not FAST_JSON_ENABLED
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_drf_encoder.default, option=ORJSON_OPTIONS)
+
+        # 標準JSONRendererと同様にU+2028/U+2029をエスケープ（JavaScript埋め込み対策）
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """orjsonベースのJSONパーサー"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not FAST_JSON_ENABLED or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            raw = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                raw = raw.decode(encoding)
+            return orjson.loads(raw)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',  # 数値フォーマット用
+    'django.contrib.postgres',  # pg_trgm（類似ツール検出）等のPostgreSQL拡張
     
     # Wagtail apps
     'wagtail.contrib.forms',
@@ -273,6 +274,17 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     
+    # JSONレンダラー / パーサー（orjsonで高速化、未インストール時は標準実装にフォールバック）
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    
     # レート制限設定（スパム対策）
     # 開発環境（DEBUG=True）ではレート制限を無効化し、本番環境のみで有効化
     'DEFAULT_THROTTLE_CLASSES': [] if DEBUG else [
@@ -282,9 +294,48 @@ REST_FRAMEWORK = {
         'anon': '100/hour',  # 本番環境: 匿名ユーザー全体の制限（開発環境では無効化）
         'contact_burst': '3/min',  # お問い合わせ: 短時間の連続送信制限
         'contact_sustained': '10/hour',  # お問い合わせ: 長期的なスパム制限
+        'suggest': '60/min',  # サジェスト: 入力ごとのリクエストを許容
     },
 }
 
+# ツール一覧・ランキング・関連ツールをvalues()ベースの高速シリアライザで出力
+# （ToolListSerializerと同一JSON。問題発生時はFalseで従来のシリアライザに戻せる）
+FAST_TOOL_SERIALIZATION = os.getenv('FAST_TOOL_SERIALIZATION', 'True') == 'True'
+
+# /api/tools/facets/ のキャッシュ秒数（ツール・タグ変更時は即時無効化）
+TOOL_FACETS_CACHE_TIMEOUT = int(os.getenv('TOOL_FACETS_CACHE_TIMEOUT', '300'))
+
+# /api/ranking/weekly/ のセグメント別レスポンスのキャッシュ秒数
+# （update_weekly_statsで事前作成。順位・ツール変更時はカタログバージョンの更新で即時無効化）
+WEEKLY_RANKING_CACHE_TIMEOUT = int(os.getenv('WEEKLY_RANKING_CACHE_TIMEOUT', '86400'))
+
+# ツール一覧・ファセットの絞り込みをインメモリのビットマップインデックスで処理
+# （ワーカープロセスごとに保持。カタログ変更時に自動再構築、未対応の条件はDBで処理）
+TOOL_BITMAP_INDEX = os.getenv('TOOL_BITMAP_INDEX', 'False') == 'True'
+
+# ツールの作成・説明文の変更時に、説明文（短い説明・詳細説明）に含まれるタグを自動で付与
+# （付与のみ、既存タグは外さない。カタログ全体は manage.py autotag_tools で一括処理）
+TOOL_AUTO_TAGGING_ON_SAVE = os.getenv('TOOL_AUTO_TAGGING_ON_SAVE', 'True') == 'True'
+
+# 管理画面の一括インポートで受け付ける最大行数（リクエスト内で処理するため。超える場合は manage.py import_tools を使用）
+TOOL_ADMIN_IMPORT_MAX_ROWS = int(os.getenv('TOOL_ADMIN_IMPORT_MAX_ROWS', '5000'))
+
+# 週間順位の履歴（ToolRankSnapshot）の保持日数（update_weekly_statsの実行時に古い履歴を削除）
+RANK_HISTORY_RETENTION_DAYS = int(os.getenv('RANK_HISTORY_RETENTION_DAYS', '365'))
+
+# 週間スコアの重み（tools.scoring）
+TOOL_SCORE_WEIGHTS = {
+    'clicks': float(os.getenv('TOOL_SCORE_WEIGHT_CLICKS', '5.0')),
+    'shares': float(os.getenv('TOOL_SCORE_WEIGHT_SHARES', '2.0')),
+    'duration': float(os.getenv('TOOL_SCORE_WEIGHT_DURATION', '0.05')),  # 平均滞在時間（秒）あたり
+    'views': float(os.getenv('TOOL_SCORE_WEIGHT_VIEWS', '0.3')),
+}
+
+# 週間スコアの時間減衰の半減期（日）と計算期間（日）
+# （0なら減衰なしで直近7日間の単純合計。変更後は manage.py replay_tool_scores で履歴を再計算）
+TOOL_SCORE_HALF_LIFE_DAYS = float(os.getenv('TOOL_SCORE_HALF_LIFE_DAYS', '7'))
+TOOL_SCORE_WINDOW_DAYS = int(os.getenv('TOOL_SCORE_WINDOW_DAYS', '28'))
+
 # DRF Spectacular (OpenAPI/Swagger)
 SPECTACULAR_SETTINGS = {
     'TITLE': 'ToolRadar API',
@@ -1,7 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from taggit.models import Tag as TaggitTag
 from import_export import resources, fields, widgets
 from import_export.admin import ImportExportModelAdmin
+from apps.core.exports import StreamingExportAdminMixin
 from .models import Tag, TagMapping, TagCategory
 
 # django-taggitの標準Tag管理画面を非表示にする
@@ -89,11 +90,12 @@ class TagResource(resources.ModelResource):
 
 
 @admin.register(Tag)
-class TagAdmin(ImportExportModelAdmin):
+class TagAdmin(StreamingExportAdminMixin, ImportExportModelAdmin):
     """タグ管理画面（インポート・エクスポート対応）"""
     
     resource_class = TagResource
     formats = (CSVUTF8BOM,)  # UTF-8 BOM付きCSV（Excel日本語対応）
+    change_list_template = 'admin/tags/tag/change_list.html'  # 一括エクスポートボタン追加
     
     list_display = [
         'name',
@@ -115,6 +117,8 @@ class TagAdmin(ImportExportModelAdmin):
         'slug': ('name',)
     }
     
+    actions = ['merge_selected_tags']
+    
     fieldsets = (
         ('基本情報', {
             'fields': ('name', 'slug', 'tag_category')
@@ -129,6 +133,60 @@ class TagAdmin(ImportExportModelAdmin):
         }),
     )
     
+    @admin.action(description='🔗 選択したタグを統合', permissions=['change', 'delete'])
+    def merge_selected_tags(self, request, queryset):
+        """
+        選択したタグを1つに統合（確認画面で統合先を選択）
+        
+        統合先以外のタグの関連ツール・記事を統合先に付け替え、
+        名前・表記ゆれを統合先のsynonymsに取り込んで削除する（tags.merge.merge_tags）
+        """
+        from django.contrib.admin import helpers
+        from django.db.models import Count
+        from django.template.response import TemplateResponse
+        from .merge import merge_tags
+        
+        tags = list(queryset)
+        if len(tags) < 2:
+            messages.warning(request, '統合するタグを2件以上選択してください')
+            return None
+        
+        if request.POST.get('apply'):
+            target = next((tag for tag in tags if str(tag.pk) == request.POST.get('target')), None)
+            if target is None:
+                messages.error(request, '統合先のタグを選択してください')
+                return None
+            result = merge_tags(target, tags)
+            messages.success(
+                request,
+                f'✅ {result["deleted"]}件のタグを「{target.name}」に統合しました'
+                f'（ツール {result["tools"]}件 / 記事 {result["posts"]}件の関連を付け替え）'
+            )
+            return None
+        
+        # 関連の多いタグを統合先の初期選択にする
+        counts = {
+            pk: (tool_count, post_count)
+            for pk, tool_count, post_count in queryset.annotate(
+                tool_count=Count('tool_tags', distinct=True),
+                post_count=Count('tagged_blogs', distinct=True)
+            ).values_list('pk', 'tool_count', 'post_count')
+        }
+        tags.sort(key=lambda tag: -sum(counts.get(tag.pk, (0, 0))))
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'タグの統合',
+            'tags': [(tag, *counts.get(tag.pk, (0, 0))) for tag in tags],
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/tags/tag/merge_tags.html', context)
+    
+    def get_streaming_export_queryset(self, request):
+        """ストリーミングエクスポート: カテゴリをJOINで取得"""
+        return super().get_streaming_export_queryset(request).select_related('tag_category')
+    
     def get_tool_count(self, obj):
         """ツール数を表示"""
         from tools.models import Tool
@@ -0,0 +1,197 @@
+"""
+タグ共起行列（関連タグAPI用）
+
+ツール（ToolTag）・公開中の記事（BlogPageTag）ごとのタグ集合から
+タグ×タグの共起件数を事前計算し、TagCooccurrenceに保存する。
+リクエストごとに中間テーブルを自己結合する代わりに、アイテム×タグの
+疎な接続行列 X の XᵀX を、アイテムごとのタグの組み合わせの加算で求める
+（計算量はΣk²、k: アイテムあたりのタグ数。タグ総数の2乗にはならない）。
+
+- 保存は上三角（tag_a <= tag_b）+ 対角（タグ自体の件数）、0件のペアは保持しない
+- タグの付け外し時は、変更のあったタグを含む行だけを再計算（refresh_cooccurrence）
+- 関連タグのスコア: Jaccard / PMI / 正規化PMI（NPMI）
+"""
+import math
+from collections import defaultdict
+from itertools import combinations_with_replacement
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import Tag, TagCooccurrence
+
+
+# 共起の集計元（種類 → TagCooccurrenceのカラム）
+SOURCE_FIELDS = {
+    'tools': ('tool_count',),
+    'posts': ('post_count',),
+    'all': ('tool_count', 'post_count'),
+}
+
+METRICS = ('jaccard', 'pmi', 'npmi')
+DEFAULT_METRIC = 'jaccard'
+
+
+def iter_tag_sets(tag_ids=None):
+    """
+    (カラム名, アイテムごとのタグID集合) を集計元ごとに返す
+
+    Args:
+        tag_ids: 指定時はこれらのタグを含むアイテムのみ
+    """
+    from blog.models import BlogPageTag
+    from tools.models import ToolTag
+
+    sources = (
+        ('tool_count', ToolTag.objects.all()),
+        ('post_count', BlogPageTag.objects.filter(content_object__live=True)),
+    )
+    for field, queryset in sources:
+        if tag_ids is not None:
+            queryset = queryset.filter(
+                content_object_id__in=queryset.filter(tag_id__in=tag_ids).values('content_object_id')
+            )
+        tag_sets = defaultdict(set)
+        for item_id, tag_id in queryset.values_list('content_object_id', 'tag_id').iterator(chunk_size=5000):
+            tag_sets[item_id].add(tag_id)
+        yield field, tag_sets.values()
+
+
+def count_cooccurrence(tag_ids=None):
+    """
+    共起件数を計算
+
+    Args:
+        tag_ids: 指定時はこれらのタグを含むペアのみ
+
+    Returns:
+        dict: {(tag_a, tag_b): {'tool_count': 件数, 'post_count': 件数}}（tag_a <= tag_b）
+    """
+    tag_ids = set(tag_ids) if tag_ids is not None else None
+    counts = defaultdict(lambda: {'tool_count': 0, 'post_count': 0})
+    for field, tag_sets in iter_tag_sets(tag_ids):
+        for tags in tag_sets:
+            for pair in combinations_with_replacement(sorted(tags), 2):
+                if tag_ids is None or pair[0] in tag_ids or pair[1] in tag_ids:
+                    counts[pair][field] += 1
+    return counts
+
+
+def _save(counts, tag_ids=None):
+    """計算結果で該当範囲の行を置き換え"""
+    rows = TagCooccurrence.objects.all()
+    if tag_ids is not None:
+        rows = rows.filter(Q(tag_a_id__in=tag_ids) | Q(tag_b_id__in=tag_ids))
+
+    with transaction.atomic():
+        rows.delete()
+        # 同じタグの再計算が並行した場合も一意制約違反にしない
+        TagCooccurrence.objects.bulk_create(
+            [
+                TagCooccurrence(tag_a_id=tag_a, tag_b_id=tag_b, **values)
+                for (tag_a, tag_b), values in counts.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['tag_a', 'tag_b'],
+            update_fields=['tool_count', 'post_count'],
+        )
+    return len(counts)
+
+
+def rebuild_cooccurrence():
+    """
+    共起行列を全件再作成
+
+    Returns:
+        int: 保存したペア数（対角を含む）
+    """
+    return _save(count_cooccurrence())
+
+
+def refresh_cooccurrence(tag_ids):
+    """
+    指定タグを含むペアのみ再計算（タグの付け外し後に呼ぶ）
+
+    Returns:
+        int: 保存したペア数
+    """
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return 0
+    return _save(count_cooccurrence(tag_ids), tag_ids)
+
+
+def score(metric, count, count_a, count_b, total):
+    """
+    共起スコア
+
+    - jaccard: |A∩B| / |A∪B|
+    - pmi: log2(P(A,B) / (P(A)P(B)))
+    - npmi: PMI / -log2(P(A,B))（-1〜1、件数の少ないタグの過大評価を抑える）
+    """
+    if metric == 'jaccard':
+        return count / (count_a + count_b - count)
+    pmi = math.log2(count * total / (count_a * count_b))
+    if metric == 'pmi':
+        return pmi
+    if count >= total:
+        return 1.0
+    return pmi / -math.log2(count / total)
+
+
+def get_related_tags(tag, metric=DEFAULT_METRIC, source='all', limit=10, min_count=1):
+    """
+    共起スコア順の関連タグ
+
+    Args:
+        metric: jaccard / pmi / npmi
+        source: tools / posts / all（共起を数える対象）
+        min_count: 共起件数の下限
+
+    Returns:
+        list: [(Tag, 共起件数, スコア)]
+    """
+    fields = SOURCE_FIELDS[source]
+    count_expr = sum((F(field) for field in fields[1:]), F(fields[0]))
+
+    partners = {}
+    for tag_a, tag_b, count in TagCooccurrence.objects.filter(
+        Q(tag_a=tag) | Q(tag_b=tag)
+    ).annotate(count=count_expr).values_list('tag_a_id', 'tag_b_id', 'count'):
+        if tag_a != tag_b and count >= min_count:
+            partners[tag_b if tag_a == tag.pk else tag_a] = count
+    if not partners:
+        return []
+
+    # 各タグ自体の件数（対角成分）
+    tag_counts = dict(
+        TagCooccurrence.objects.filter(
+            tag_a_id__in=list(partners) + [tag.pk],
+            tag_b_id=F('tag_a_id')
+        ).annotate(count=count_expr).values_list('tag_a_id', 'count')
+    )
+    total = 0
+    if metric != 'jaccard':
+        from blog.models import BlogPage
+        from tools.models import Tool
+        if 'tool_count' in fields:
+            total += Tool.objects.count()
+        if 'post_count' in fields:
+            total += BlogPage.objects.live().count()
+
+    own_count = tag_counts.get(tag.pk, 0)
+    scored = sorted(
+        (
+            (score(metric, count, own_count, tag_counts.get(partner_id, count), total), count, partner_id)
+            for partner_id, count in partners.items()
+        ),
+        key=lambda item: (-item[0], -item[1], item[2])
+    )[:limit]
+
+    tags = Tag.objects.select_related('tag_category').in_bulk([partner_id for _, _, partner_id in scored])
+    return [
+        (tags[partner_id], count, value)
+        for value, count, partner_id in scored
+        if partner_id in tags
+    ]
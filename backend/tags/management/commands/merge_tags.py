@@ -0,0 +1,75 @@
+"""
+タグ統合コマンド
+
+使用方法:
+    python manage.py merge_tags rsi rsi-2 relative-strength-index
+    python manage.py merge_tags rsi rsi-2 --dry-run
+
+説明:
+    1つ目のスラッグのタグ（統合先）に、2つ目以降のタグ（統合元）を統合します。
+    - 統合元の関連ツール・記事を統合先に付け替え（既に付いている場合は重複させない）
+    - 統合元の名前・表記ゆれを統合先の表記ゆれに追加
+    - 統合元のタグを削除
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import BlogPageTag
+from tags.merge import merge_synonyms, merge_tags
+from tags.models import Tag
+from tools.models import ToolTag
+
+
+class Command(BaseCommand):
+    help = '表記ゆれで分かれたタグを1つに統合します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'target',
+            help='統合先のタグのスラッグ'
+        )
+        parser.add_argument(
+            'sources',
+            nargs='+',
+            help='統合元のタグのスラッグ（複数指定可）'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='実際には統合せず、対象のみ表示'
+        )
+
+    def handle(self, *args, **options):
+        tags = Tag.objects.in_bulk([options['target']] + options['sources'], field_name='slug')
+        missing = [slug for slug in [options['target']] + options['sources'] if slug not in tags]
+        if missing:
+            raise CommandError(f'タグが見つかりません: {", ".join(missing)}')
+
+        target = tags[options['target']]
+        sources = [tags[slug] for slug in dict.fromkeys(options['sources']) if slug != target.slug]
+        if not sources:
+            raise CommandError('統合元のタグを指定してください')
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('タグ統合'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        self.stdout.write(f'統合先: {target.name} (slug: {target.slug})')
+        for source in sources:
+            self.stdout.write(f'統合元: {source.name} (slug: {source.slug})')
+
+        if options['dry_run']:
+            tool_links = ToolTag.objects.filter(tag__in=sources).count()
+            post_links = BlogPageTag.objects.filter(tag__in=sources).count()
+            self.stdout.write(self.style.WARNING('\n🔍 ドライランモード（統合しません）'))
+            self.stdout.write(f'付け替え対象: ツール {tool_links}件 / 記事 {post_links}件')
+            self.stdout.write(f'統合後の表記ゆれ: {", ".join(merge_synonyms(target, sources))}')
+            return
+
+        result = merge_tags(target, sources)
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {result["deleted"]}件のタグを統合しました'
+            f'（ツール {result["tools"]}件 / 記事 {result["posts"]}件の関連を付け替え）'
+        ))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
@@ -0,0 +1,33 @@
+"""
+タグ共起行列の再作成コマンド
+
+使用方法:
+    python manage.py rebuild_tag_cooccurrence
+
+説明:
+    ツール・公開中の記事のタグから、関連タグAPI（/api/tags/{slug}/related/）が
+    使用するタグ共起行列（TagCooccurrence）を全件作り直します。
+    通常はタグの付け外し時に変更のあったタグだけ自動で再計算されるため、
+    初回導入時やデータの一括修正後に実行してください。
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from tags.cooccurrence import rebuild_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'タグ共起行列（関連タグAPI用）を全件再作成します'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('タグ共起行列の再作成'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        start = time.perf_counter()
+        pairs = rebuild_cooccurrence()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(f'✅ 完了: {pairs:,}ペア ({elapsed:.1f}秒)'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
@@ -0,0 +1,118 @@
+"""
+タグの統合（表記ゆれで別タグになったものを1つにまとめる）
+
+統合元タグの関連（ToolTag / BlogPageTag）を統合先へ集合演算のSQLで付け替え、
+統合元の名前・表記ゆれを統合先のsynonymsに取り込んでから統合元を削除する。
+
+- 統合先に既に付いているツール・記事の関連は付け替えずに削除（重複を作らない）
+- TagMappingの正式名称が統合元の場合は統合先に付け替え
+- tag_slugs（非正規化カラム）は tags_bulk_updated シグナルで同期
+- タグ共起行列は統合先のペアを再計算（統合元のペアはタグ削除でCASCADE）
+- ファセット・サジェスト等のキャッシュ無効化は最後に1回だけ
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .cooccurrence import refresh_cooccurrence
+from .models import Tag, TagMapping
+from .signals import tags_bulk_updated
+
+
+def _repoint(model, object_field, sources, target):
+    """
+    model（タグ中間テーブル）の統合元タグの行を統合先に付け替え
+
+    Args:
+        object_field: 対象オブジェクトを表すカラム
+
+    Returns:
+        int: 付け替え・削除した行数
+    """
+    same_object = {object_field: OuterRef(object_field)}
+
+    rows = model.objects.filter(tag__in=sources)
+    count = rows.count()
+    if not count:
+        return 0
+
+    # 統合先が既に付いているオブジェクト → 削除
+    rows.filter(Exists(model.objects.filter(tag=target, **same_object))).delete()
+    # 統合元が複数付いているオブジェクト → 最小ID以外を削除
+    rows.filter(
+        Exists(model.objects.filter(tag__in=sources, id__lt=OuterRef('id'), **same_object))
+    ).delete()
+    rows.update(tag=target)
+    return count
+
+
+def merge_synonyms(target, sources):
+    """統合先のsynonyms + 統合元の名前・synonyms（正規化して重複を除く）"""
+    seen = {Tag.normalize_string(target.name)}
+    merged = []
+    for synonym in list(target.synonyms) + [
+        name for source in sources for name in [source.name] + list(source.synonyms)
+    ]:
+        normalized = Tag.normalize_string(synonym)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            merged.append(synonym)
+    return merged
+
+
+def merge_tags(target, sources):
+    """
+    統合元タグを統合先タグにまとめて削除
+
+    Args:
+        target: 統合先のTag
+        sources: 統合元のTagのリスト（統合先を含んでいてもよい）
+
+    Returns:
+        dict: {'tools': 付け替えたツールの関連数, 'posts': 付け替えた記事の関連数, 'deleted': 削除したタグ数}
+    """
+    from blog.models import BlogPageTag
+    from tools.facets import batch_catalogue_invalidation
+    from tools.models import ToolTag
+
+    sources = [source for source in sources if source.pk != target.pk]
+    if not sources:
+        return {'tools': 0, 'posts': 0, 'deleted': 0}
+    source_names = [source.name for source in sources]
+
+    with batch_catalogue_invalidation(), transaction.atomic():
+        result = {
+            'tools': _repoint(ToolTag, 'content_object_id', sources, target),
+            'posts': _repoint(BlogPageTag, 'content_object_id', sources, target),
+        }
+
+        # 統合元の名前・表記ゆれを取り込む（update()ではauto_nowが効かないため明示）
+        target.synonyms = merge_synonyms(target, sources)
+        target.updated_at = timezone.now()
+        Tag.objects.filter(pk=target.pk).update(synonyms=target.synonyms, updated_at=target.updated_at)
+
+        # 統合元を正式名称とするTagMappingを統合先へ
+        target_mapping = TagMapping.objects.filter(canonical_name=target.name).first()
+        for mapping in TagMapping.objects.filter(canonical_name__in=source_names):
+            if target_mapping is None:
+                mapping.variations = list(dict.fromkeys(mapping.variations + [mapping.canonical_name]))
+                mapping.canonical_name = target.name
+                mapping.save()
+                target_mapping = mapping
+            else:
+                target_mapping.variations = list(dict.fromkeys(
+                    target_mapping.variations + mapping.variations + [mapping.canonical_name]
+                ))
+                target_mapping.save()
+                mapping.delete()
+
+        # 付け替えたツール・記事のtag_slugsを同期（統合先の全関連を再計算）
+        tags_bulk_updated.send(sender=Tag, tag_ids=[target.pk])
+
+        # 統合元を削除（関連は付け替え済み、削除の記録等はpost_deleteで処理）
+        Tag.objects.filter(pk__in=[source.pk for source in sources]).delete()
+        result['deleted'] = len(sources)
+
+        refresh_cooccurrence([target.pk])
+
+    return result
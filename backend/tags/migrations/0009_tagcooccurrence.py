@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0008_tag_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tool_count', models.PositiveIntegerField(default=0, verbose_name='ツール数')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='記事数')),
+                ('tag_a', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tags.tag')),
+                ('tag_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tags.tag')),
+            ],
+            options={
+                'verbose_name': 'タグ共起',
+                'verbose_name_plural': 'タグ共起',
+                'constraints': [models.UniqueConstraint(fields=('tag_a', 'tag_b'), name='unique_tag_cooccurrence')],
+            },
+        ),
+    ]
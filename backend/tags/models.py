@@ -151,6 +151,10 @@ class Tag(TagBase):
         help_text="タグの説明（任意）"
     )
     
+    # タイムスタンプ（変更フィードAPI用）
+    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+    updated_at = models.DateTimeField("更新日時", auto_now=True, db_index=True)
+    
     panels = [
         FieldPanel('name'),
         FieldPanel('slug'),
@@ -259,48 +263,117 @@ class Tag(TagBase):
         if not tag_name:
             return None
         
-        # TagMappingから正式名称を取得
-        canonical_name = TagMapping.get_canonical_name(tag_name)
+        return cls.normalize_many([tag_name])[tag_name]
+    
+    @classmethod
+    def normalize_many(cls, tag_names):
+        """
+        複数のタグ名をまとめて正規化して取得または作成
         
-        # 既存タグを検索
-        tag = cls.find_by_name_or_synonym(canonical_name)
+        1件ずつの正規化と同じ規則（TagMappingの正式名称 → 名前 → 表記ゆれの順で照合、
+        見つからなければ作成、元の表記をsynonymsに追加）を、名前の数によらず
+        固定回数のクエリで処理する（新規作成はbulk_create、表記ゆれ追加はbulk_update）
         
-        if tag:
-            # synonymsに元の名前を追加（重複チェック付き）
-            original_normalized = cls.normalize_string(tag_name)
-            if original_normalized not in [cls.normalize_string(s) for s in tag.synonyms]:
-                if original_normalized != cls.normalize_string(tag.name):
-                    tag.synonyms.append(tag_name)
-                    tag.save()
-            return tag
+        Returns:
+            dict: 入力タグ名 → Tag（空のタグ名は除く）
+        """
+        from django.db import transaction
+        from django.utils import timezone
         
-        # 新規作成
-        from django.utils.text import slugify
+        tag_names = [name for name in dict.fromkeys(tag_names) if name]
+        if not tag_names:
+            return {}
         
-        # TagMappingからカテゴリスラッグを取得
-        category_slug = 'technical_indicator'
-        try:
-            mapping = TagMapping.objects.get(canonical_name=canonical_name)
-            category_slug = mapping.category
-        except TagMapping.DoesNotExist:
-            pass
+        # TagMapping: 正規化したバリエーション → 正式名称（表示順で先のマッピングを優先）
+        canonical_names = {}
+        mapping_categories = {}
+        for canonical_name, variations, category in TagMapping.objects.values_list(
+            'canonical_name', 'variations', 'category'
+        ):
+            mapping_categories[canonical_name] = category
+            for variation in variations:
+                canonical_names.setdefault(cls.normalize_string(variation), canonical_name)
         
-        # TagCategoryを取得（存在しない場合はNone）
-        tag_category = None
-        try:
-            tag_category = TagCategory.objects.get(slug=category_slug)
-        except TagCategory.DoesNotExist:
-            pass
+        # 既存タグ: 正規化した名前 / 表記ゆれ → Tag（表記ゆれは表示順で先のタグを優先）
+        tags_by_name = {}
+        tags_by_synonym = {}
+        slugs = set()
+        for tag in cls.objects.all():
+            tags_by_name.setdefault(cls.normalize_string(tag.name), tag)
+            for synonym in tag.synonyms:
+                tags_by_synonym.setdefault(cls.normalize_string(synonym), tag)
+            slugs.add(tag.slug)
         
-        tag = cls.objects.create(
-            name=canonical_name,
-            slug=slugify(canonical_name),
-            tag_category=tag_category,
-            synonyms=[tag_name] if tag_name != canonical_name else []
-        )
+        categories = {category.slug: category for category in TagCategory.objects.all()}
         
-        return tag
-
+        resolved = {}
+        new_tags = []
+        changed_tags = {}
+        for tag_name in tag_names:
+            canonical_name = canonical_names.get(cls.normalize_string(tag_name), tag_name)
+            normalized = cls.normalize_string(canonical_name)
+            tag = tags_by_name.get(normalized) or tags_by_synonym.get(normalized)
+            
+            if tag:
+                # synonymsに元の名前を追加（重複チェック付き）
+                original_normalized = cls.normalize_string(tag_name)
+                if original_normalized not in [cls.normalize_string(s) for s in tag.synonyms]:
+                    if original_normalized != cls.normalize_string(tag.name):
+                        tag.synonyms.append(tag_name)
+                        tags_by_synonym.setdefault(original_normalized, tag)
+                        if tag.pk:
+                            changed_tags[tag.pk] = tag
+            else:
+                # 新規作成（カテゴリはTagMappingから、なければテクニカル指標）
+                tag = cls(
+                    name=canonical_name,
+                    slug=cls._unique_slug(canonical_name, slugs),
+                    tag_category=categories.get(mapping_categories.get(canonical_name, 'technical_indicator')),
+                    synonyms=[tag_name] if tag_name != canonical_name else []
+                )
+                new_tags.append(tag)
+                slugs.add(tag.slug)
+                tags_by_name[normalized] = tag
+                for synonym in tag.synonyms:
+                    tags_by_synonym.setdefault(cls.normalize_string(synonym), tag)
+            
+            resolved[tag_name] = tag
+        
+        if new_tags or changed_tags:
+            # bulk_updateではauto_nowが効かないため、更新日時を明示的に設定
+            now = timezone.now()
+            for tag in changed_tags.values():
+                tag.updated_at = now
+            
+            with transaction.atomic():
+                cls.objects.bulk_create(new_tags)
+                cls.objects.bulk_update(changed_tags.values(), ['synonyms', 'updated_at'])
+                
+                # bulk操作ではpost_saveが送られないため、サジェスト等のキャッシュ無効化を通知
+                from .signals import tags_bulk_updated
+                tags_bulk_updated.send(
+                    sender=cls,
+                    tag_ids=[tag.pk for tag in new_tags] + list(changed_tags)
+                )
+        
+        return resolved
+    
+    @classmethod
+    def _unique_slug(cls, name, taken):
+        """
+        新規タグのスラッグ（既存・作成予定のスラッグと重複しないもの）
+        
+        ASCIIでスラッグ化できない名前（日本語等）はtaggitと同じくUnicodeのまま使う
+        """
+        from django.utils.text import slugify
+        
+        base = slugify(name) or slugify(name, allow_unicode=True)
+        slug = base
+        i = 1
+        while slug in taken:
+            slug = f'{base}_{i}'
+            i += 1
+        return slug
 
 class TaggedItem(GenericTaggedItemBase):
     """Tag-Item中間テーブル"""
@@ -309,3 +382,36 @@ class TaggedItem(GenericTaggedItemBase):
         on_delete=models.CASCADE,
         related_name="%(app_label)s_%(class)s_items",
     )
+
+
+class TagCooccurrence(models.Model):
+    """
+    タグ×タグの共起件数（関連タグAPI用の事前計算テーブル）
+    
+    対称行列のため tag_a <= tag_b の上三角のみ、0件のペアは保持しない。
+    対角成分（tag_a = tag_b）はそのタグ自体の件数。
+    tags.cooccurrence の refresh_cooccurrence() でタグ単位に再計算される。
+    """
+    tag_a = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    tag_b = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    tool_count = models.PositiveIntegerField("ツール数", default=0)
+    post_count = models.PositiveIntegerField("記事数", default=0)
+    
+    class Meta:
+        verbose_name = "タグ共起"
+        verbose_name_plural = "タグ共起"
+        constraints = [
+            models.UniqueConstraint(fields=['tag_a', 'tag_b'], name='unique_tag_cooccurrence'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tag_a_id} × {self.tag_b_id}"
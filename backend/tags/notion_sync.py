@@ -0,0 +1,238 @@
+"""
+Notionタグマスターの同期（差分適用）
+
+タグマスター（JSON / CSV）と現在のタグを1回ずつ読み込み、メモリ上で
+作成 / 更新 / 変更なし / マスターにないタグ（orphaned）の差分を計算する。
+作成・更新は1トランザクションのbulk_create / bulk_updateで適用し、
+変更のないタグは書き込まない（キャッシュの無効化も発生しない）。
+
+タグマスターの形式:
+    JSON: [{"name": ..., "slug": ..., "category": ..., "synonyms": [...]}, ...]
+    CSV:  name,slug,category,synonyms（synonymsはパイプ区切り、カンマ区切りも可）
+"""
+import csv
+import json
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Tag, TagCategory
+from .signals import tags_bulk_updated
+
+
+# デフォルトのタグマスター（Notionからの取得結果）
+DEFAULT_SOURCE = Path(__file__).resolve().parent / 'data' / 'notion_tags.json'
+
+# カテゴリ名のマッピング（slug → 日本語表示名、未作成のカテゴリはこの順で作成）
+CATEGORY_NAMES = {
+    'technical_indicator': 'テクニカル指標',
+    'trade_style': '取引スタイル',
+    'currency_pair': '通貨ペア',
+    'strategy_type': '戦略タイプ',
+    'asset_type': '資産タイプ',
+}
+
+# 同期対象のフィールド
+SYNC_FIELDS = ('name', 'slug', 'tag_category', 'synonyms')
+
+
+def split_synonyms(value):
+    """CSVのsynonyms列 → リスト（ArrayFieldWidgetと同じくパイプ優先）"""
+    if not value:
+        return []
+    separator = '|' if '|' in value else ','
+    return [item.strip() for item in value.split(separator) if item.strip()]
+
+
+def load_tag_source(path=DEFAULT_SOURCE):
+    """
+    タグマスターファイルを読み込む
+
+    Returns:
+        list: [{'name', 'slug', 'category', 'synonyms'}]
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            rows = [
+                dict(row, synonyms=split_synonyms(row.get('synonyms')))
+                for row in csv.DictReader(f)
+            ]
+    else:
+        with open(path, encoding='utf-8') as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows.get('tags', [])
+
+    tags = []
+    for i, row in enumerate(rows, start=1):
+        if not isinstance(row, dict) or not all(row.get(key) for key in ('name', 'slug', 'category')):
+            raise ValueError(f'{i}件目: name / slug / category は必須です')
+        tags.append({
+            'name': row['name'].strip(),
+            'slug': row['slug'].strip(),
+            'category': row['category'].strip(),
+            'synonyms': list(row.get('synonyms') or []),
+        })
+    return tags
+
+
+def compute_tag_diff(source_tags):
+    """
+    タグマスターと現在のタグの差分を計算（DBには書き込まない）
+
+    既存タグはslug → 名前の順で照合する
+
+    Returns:
+        dict: {
+            'create': [Tag（未保存）],
+            'update': [(Tag（変更適用済み・未保存）, {フィールド: (旧値, 新値)})],
+            'unchanged': [Tag],
+            'orphaned': [Tag]（マスターに存在しないタグ）,
+            'categories': [TagCategory（未保存、作成が必要なカテゴリ）],
+            'errors': [メッセージ],
+        }
+    """
+    tags = list(Tag.objects.select_related('tag_category'))
+    tags_by_slug = {tag.slug: tag for tag in tags}
+    tags_by_name = {tag.name: tag for tag in tags}
+
+    categories = {category.slug: category for category in TagCategory.objects.all()}
+    new_categories = []
+    display_order = max((category.display_order for category in categories.values()), default=0)
+    for slug in dict.fromkeys(
+        list(CATEGORY_NAMES) + [row['category'] for row in source_tags]
+    ):
+        if slug not in categories:
+            display_order += 1
+            category = TagCategory(
+                name=CATEGORY_NAMES.get(slug, slug),
+                slug=slug,
+                display_order=display_order
+            )
+            categories[slug] = category
+            new_categories.append(category)
+
+    diff = {
+        'create': [],
+        'update': [],
+        'unchanged': [],
+        'orphaned': [],
+        'categories': new_categories,
+        'errors': [],
+    }
+    matched_ids = set()
+    source_slugs = set()
+    source_names = set()
+
+    for row in source_tags:
+        if row['slug'] in source_slugs or row['name'] in source_names:
+            diff['errors'].append(f'slug・名前が重複しています: {row["name"]} ({row["slug"]})')
+            continue
+        source_slugs.add(row['slug'])
+        source_names.add(row['name'])
+
+        tag = tags_by_slug.get(row['slug']) or tags_by_name.get(row['name'])
+        category = categories[row['category']]
+
+        if tag is None:
+            diff['create'].append(Tag(
+                name=row['name'],
+                slug=row['slug'],
+                tag_category=category,
+                synonyms=row['synonyms']
+            ))
+            continue
+
+        if tag.pk in matched_ids:
+            diff['errors'].append(f'同じタグに複数の行が対応しています: {row["name"]} ({row["slug"]})')
+            continue
+        matched_ids.add(tag.pk)
+
+        # 他のタグが使用中のslug・名前への変更は一意制約違反になるため除外
+        conflict = tags_by_slug.get(row['slug'], tag)
+        if conflict == tag:
+            conflict = tags_by_name.get(row['name'], tag)
+        if conflict != tag:
+            diff['errors'].append(
+                f'{tag.name} ({tag.slug}): slug・名前が別のタグ {conflict.name} ({conflict.slug}) と重複します'
+            )
+            continue
+
+        new_values = {
+            'name': row['name'],
+            'slug': row['slug'],
+            'tag_category': category,
+            'synonyms': row['synonyms'],
+        }
+        changes = {}
+        for field in SYNC_FIELDS:
+            old_value = getattr(tag, field)
+            new_value = new_values[field]
+            if field == 'tag_category':
+                # 未作成のカテゴリはpkがNoneのため、slugで比較
+                changed = getattr(old_value, 'slug', None) != new_value.slug
+            else:
+                changed = old_value != new_value
+            if changed:
+                changes[field] = (old_value, new_value)
+                setattr(tag, field, new_value)
+
+        if changes:
+            diff['update'].append((tag, changes))
+        else:
+            diff['unchanged'].append(tag)
+
+    diff['orphaned'] = [
+        tag for tag in tags
+        if tag.pk not in matched_ids and tag.slug not in source_slugs
+    ]
+    return diff
+
+
+def apply_tag_diff(diff):
+    """
+    差分を1トランザクションで適用（作成・更新のみ、orphanedは削除しない）
+
+    Returns:
+        bool: 書き込みがあったか
+    """
+    updates = [tag for tag, changes in diff['update']]
+    if not (diff['categories'] or diff['create'] or updates):
+        return False
+
+    # bulk_updateではauto_nowが効かないため、更新日時を明示的に設定
+    now = timezone.now()
+    for tag in updates:
+        tag.updated_at = now
+    update_fields = sorted({field for tag, changes in diff['update'] for field in changes})
+
+    with transaction.atomic():
+        TagCategory.objects.bulk_create(diff['categories'])
+        Tag.objects.bulk_create(diff['create'])
+        if updates:
+            Tag.objects.bulk_update(updates, update_fields + ['updated_at'])
+
+        # bulk操作ではpost_saveが送られないため、tag_slugsの同期・キャッシュ無効化を通知
+        tag_ids = [tag.pk for tag in diff['create']] + [tag.pk for tag in updates]
+        if tag_ids:
+            tags_bulk_updated.send(sender=Tag, tag_ids=tag_ids)
+
+    return True
+
+
+def sync_tags(source_tags, dry_run=False):
+    """
+    タグマスターを同期
+
+    Returns:
+        dict: compute_tag_diff の差分（dry_run時は未適用）
+    """
+    diff = compute_tag_diff(source_tags)
+    if not dry_run:
+        apply_tag_diff(diff)
+    return diff
@@ -0,0 +1,12 @@
+"""
+タグ関連のカスタムシグナル
+
+bulk_create / bulk_update ではpost_saveが送られないため、
+タグを一括で作成・更新した処理はこのシグナルで変更を通知する
+（受信側: tools / blog のtag_slugs同期、ファセット・サジェストの無効化）
+"""
+from django.dispatch import Signal
+
+
+# 引数: tag_ids（作成・更新したタグのID）
+tags_bulk_updated = Signal()
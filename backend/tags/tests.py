@@ -1,3 +1,199 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from .models import Tag, TagCategory, TagMapping
+
+
+class TagNormalizeManyTest(TestCase):
+    """タグ名の一括正規化（Tag.normalize_many）を検証"""
+
+    def setUp(self):
+        TagCategory.objects.create(name='テクニカル指標', slug='technical_indicator')
+        TagMapping.objects.create(
+            canonical_name='ボリンジャーバンド',
+            variations=['bb', 'ボリバン'],
+            category='technical_indicator'
+        )
+        self.rsi = Tag.objects.create(name='RSI', slug='rsi', synonyms=['アールエスアイ'])
+
+    def count_queries(self, names):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            Tag.normalize_many(names)
+        return len(context)
+
+    def test_query_count_independent_of_name_count(self):
+        Tag.objects.create(name='ボリンジャーバンド', slug='bollinger-bands')
+        TagMapping.objects.create(
+            canonical_name='RSI',
+            variations=['relative strength index', '相対力指数'],
+            category='technical_indicator'
+        )
+
+        # いずれも「既存タグへの表記ゆれ追加」と「新規作成」を含む
+        few = self.count_queries(['bb', 'トレンド'])
+        many = self.count_queries([
+            'ボリバン', 'relative strength index', '相対力指数', 'スキャルピング', 'デイトレ', 'グリッド', '',
+        ])
+        self.assertEqual(few, many)
+
+    def test_resolves_like_single_name_api(self):
+        names = ['ＲＳＩ', 'rsi', 'アールエスアイ', 'BB', 'ボリバン', 'トレンド', '']
+        tags = Tag.normalize_many(names)
+
+        self.assertEqual(set(tags), set(names) - {''})
+        self.assertEqual({tags['ＲＳＩ'], tags['rsi'], tags['アールエスアイ']}, {self.rsi})
+        self.assertEqual(tags['BB'], tags['ボリバン'])
+        self.assertEqual(tags['BB'].name, 'ボリンジャーバンド')
+        self.assertEqual(tags['BB'].tag_category.slug, 'technical_indicator')
+        self.assertEqual(tags['BB'].synonyms, ['BB', 'ボリバン'])
+        self.assertEqual(tags['トレンド'].slug, 'トレンド')
+
+        # 名前と同じ表記（正規化後）はsynonymsに追加しない
+        self.rsi.refresh_from_db()
+        self.assertEqual(self.rsi.synonyms, ['アールエスアイ'])
+
+    def test_matches_single_name_api(self):
+        tag = Tag.normalize_and_get_or_create('bb')
+        self.assertEqual(Tag.normalize_many(['ボリバン'])['ボリバン'], tag)
+        self.assertEqual(Tag.objects.filter(name='ボリンジャーバンド').count(), 1)
+
+        tag.refresh_from_db()
+        self.assertEqual(tag.synonyms, ['bb', 'ボリバン'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class NotionTagSyncTest(TestCase):
+    """タグマスター同期（差分の一括適用）を検証"""
+
+    SOURCE = [
+        {'name': 'RSI', 'slug': 'rsi', 'category': 'technical_indicator', 'synonyms': ['アールエスアイ']},
+        {'name': 'スキャルピング', 'slug': 'scalping', 'category': 'trade_style', 'synonyms': ['Scalping']},
+    ]
+
+    def test_diff_and_apply(self):
+        from tools.tests import create_tool
+        from .notion_sync import sync_tags
+
+        old = Tag.objects.create(name='RSI', slug='rsi-old')
+        Tag.objects.create(name='古いタグ', slug='old-tag')
+        tool = create_tool('RSI Alert', tool_type='Indicator')
+        tool.tags.add(old)
+
+        dry_run = sync_tags(self.SOURCE, dry_run=True)
+        self.assertEqual([tag.slug for tag in dry_run['create']], ['scalping'])
+        self.assertEqual(set(dry_run['update'][0][1]), {'slug', 'tag_category', 'synonyms'})
+        self.assertEqual([tag.slug for tag in dry_run['orphaned']], ['old-tag'])
+        self.assertFalse(Tag.objects.filter(slug='scalping').exists())
+
+        sync_tags(self.SOURCE)
+        old.refresh_from_db()
+        tool.refresh_from_db()
+        self.assertEqual(old.slug, 'rsi')
+        self.assertEqual(old.tag_category.slug, 'technical_indicator')
+        self.assertEqual(tool.tag_slugs, ['rsi'])
+
+    def test_unchanged_tags_are_not_written(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .notion_sync import sync_tags
+
+        sync_tags(self.SOURCE)
+        with CaptureQueriesContext(connection) as context:
+            diff = sync_tags(self.SOURCE)
+
+        self.assertEqual(len(diff['unchanged']), 2)
+        self.assertEqual(len(context), 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TagMergeTest(TestCase):
+    """タグ統合（関連の付け替え・表記ゆれの取り込み）を検証"""
+
+    def setUp(self):
+        from tools.tests import create_tool
+
+        self.target = Tag.objects.create(name='RSI', slug='rsi')
+        self.source = Tag.objects.create(name='ＲＳＩ指標', slug='rsi-2', synonyms=['rsi indicator'])
+        self.other = Tag.objects.create(name='相対力指数', slug='rsi-3')
+        self.tools = []
+        for i, tags in enumerate([[self.target, self.source], [self.source, self.other]]):
+            tool = create_tool(f'Merge Tool {i}', tool_type='Indicator')
+            tool.tags.add(*tags)
+            self.tools.append(tool)
+
+    def test_merge_tags(self):
+        from tools.models import Tool
+        from .merge import merge_tags
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            result = merge_tags(self.target, [self.source, self.other, self.target])
+
+        self.assertEqual(result, {'tools': 3, 'posts': 0, 'deleted': 2})
+        # キャッシュ無効化は1回のみ
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertFalse(Tag.objects.filter(slug__in=['rsi-2', 'rsi-3']).exists())
+        for tool in self.tools:
+            self.assertEqual(list(tool.tags.all()), [self.target])
+            self.assertEqual(Tool.objects.get(pk=tool.pk).tag_slugs, ['rsi'])
+
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.synonyms, ['ＲＳＩ指標', 'rsi indicator', '相対力指数'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TagCooccurrenceTest(TestCase):
+    """タグ共起行列（差分再計算）と関連タグAPIを検証"""
+
+    def setUp(self):
+        from tools.tests import create_tool
+
+        self.rsi, self.macd, self.scalping = (
+            Tag.objects.create(name=name, slug=slug)
+            for name, slug in [('RSI', 'rsi'), ('MACD', 'macd'), ('スキャルピング', 'scalping')]
+        )
+        self.tools = []
+        for i, tags in enumerate([
+            [self.rsi, self.macd],
+            [self.rsi, self.macd, self.scalping],
+            [self.rsi, self.scalping],
+            [self.macd],
+        ]):
+            tool = create_tool(f'Cooccurrence Tool {i}', tool_type='Indicator')
+            tool.tags.add(*tags)
+            self.tools.append(tool)
+
+    def get_counts(self):
+        from .models import TagCooccurrence
+
+        return dict(
+            ((tag_a, tag_b), tool_count)
+            for tag_a, tag_b, tool_count in TagCooccurrence.objects.values_list('tag_a_id', 'tag_b_id', 'tool_count')
+        )
+
+    def test_incremental_matches_rebuild(self):
+        from .cooccurrence import rebuild_cooccurrence
+
+        self.tools[0].tags.remove(self.macd)
+        self.tools[3].tags.clear()
+        self.tools[2].delete()
+        incremental = self.get_counts()
+
+        rebuild_cooccurrence()
+        self.assertEqual(incremental, self.get_counts())
+        self.assertEqual(incremental[tuple(sorted([self.rsi.pk, self.macd.pk]))], 1)
+
+    def test_related_api(self):
+        response = self.client.get('/api/tags/rsi/related/', {'metric': 'jaccard'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        # RSI(3件)とMACD(3件)は2件、スキャルピング(2件)は2件で共起
+        self.assertEqual([result['slug'] for result in results], ['scalping', 'macd'])
+        self.assertEqual([result['score'] for result in results], [round(2 / 3, 4), 0.5])
+
+        npmi = self.client.get('/api/tags/rsi/related/', {'metric': 'npmi', 'source': 'tools'}).json()
+        self.assertEqual(npmi['results'][0]['slug'], 'scalping')
+
+        self.assertEqual(self.client.get('/api/tags/rsi/related/', {'metric': 'cosine'}).status_code, 400)
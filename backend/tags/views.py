@@ -1,12 +1,18 @@
 """
 Views for Tags API
 """
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Tag, TagCategory
 from .serializers import TagSerializer, TagCategorySerializer
 
 
+# 関連タグAPIの最大件数
+RELATED_TAGS_MAX_LIMIT = 50
+
+
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     """
     タグAPI
@@ -30,6 +36,55 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """select_relatedでN+1問題を防ぐ"""
         return Tag.objects.select_related('tag_category').all()
+    
+    @action(detail=True, methods=['get'])
+    def related(self, request, slug=None):
+        """
+        関連タグ取得API（タグページの「関連タグ」用）
+        
+        GET /api/tags/{slug}/related/?metric=jaccard&source=all&limit=10&min_count=1
+        
+        - metric: jaccard（デフォルト） / pmi / npmi
+        - source: all（デフォルト） / tools / posts（共起を数える対象）
+        - min_count: 共起件数の下限（PMIは件数の少ないタグを過大評価するため2以上を推奨）
+        
+        事前計算した共起行列（TagCooccurrence）から、共起スコア順に返す。
+        """
+        from .cooccurrence import DEFAULT_METRIC, METRICS, SOURCE_FIELDS, get_related_tags
+        
+        tag = self.get_object()
+        metric = request.query_params.get('metric', DEFAULT_METRIC)
+        source = request.query_params.get('source', 'all')
+        if metric not in METRICS or source not in SOURCE_FIELDS:
+            return Response(
+                {'error': f'metricは{" / ".join(METRICS)}、sourceは{" / ".join(SOURCE_FIELDS)}で指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), RELATED_TAGS_MAX_LIMIT))
+            min_count = max(1, int(request.query_params.get('min_count', 1)))
+        except ValueError:
+            return Response(
+                {'error': 'limit・min_countは整数で指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        related = get_related_tags(tag, metric=metric, source=source, limit=limit, min_count=min_count)
+        return Response({
+            'tag': tag.slug,
+            'metric': metric,
+            'results': [
+                {
+                    'id': related_tag.id,
+                    'name': related_tag.name,
+                    'slug': related_tag.slug,
+                    'category': related_tag.tag_category.slug if related_tag.tag_category else None,
+                    'count': count,
+                    'score': round(score, 4),
+                }
+                for related_tag, count, score in related
+            ],
+        })
 
 
 class TagCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -3,6 +3,7 @@ from django import forms
 from django.contrib import messages
 from import_export import resources, fields, widgets
 from import_export.admin import ImportExportModelAdmin
+from apps.core.exports import StreamingExportAdminMixin
 from .models import Tool
 from tags.models import Tag
 
@@ -146,22 +147,19 @@ class ToolResource(resources.ModelResource):
             # カンマ区切りでタグ名を分割
             tag_names = [name.strip() for name in tags_str.split(',') if name.strip()]
             
-            # 正規化処理を使ってタグを取得または作成
+            # 正規化処理を使ってタグをまとめて取得または作成
             normalized_tags = []
-            for tag_name in tag_names:
-                try:
-                    # Tag.normalize_and_get_or_create()を使用
-                    tag = Tag.normalize_and_get_or_create(tag_name)
-                    normalized_tags.append(tag)
-                except Exception as e:
-                    # エラーが発生した場合はログに記録
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.warning(f"タグ '{tag_name}' の正規化に失敗しました: {e}")
+            try:
+                normalized_tags = list(Tag.normalize_many(tag_names).values())
+            except Exception as e:
+                # エラーが発生した場合はログに記録
+                import logging
+                logger = logging.getLogger(__name__)
+                logger.warning(f"タグ {tag_names} の正規化に失敗しました: {e}")
             
             # タグを設定
             if normalized_tags:
-                instance.tags.set(normalized_tags)
+                instance.tags.set(list(set(normalized_tags)))
         
     def export(self, queryset=None, **kwargs):
         """エクスポート処理のカスタマイズ"""
@@ -179,6 +177,12 @@ class ToolAdminForm(forms.ModelForm):
     ツール管理フォーム（ファジーマッチング警告機能付き）
     """
     
+    # 類似とみなすファジーマッチングの類似度（%）
+    similarity_threshold = 85
+    
+    # ファジーマッチングで再評価する候補数（pg_trgmのトライグラム距離の近い順）
+    similar_candidate_limit = 20
+    
     class Meta:
         model = Tool
         fields = '__all__'
@@ -193,7 +197,11 @@ class ToolAdminForm(forms.ModelForm):
         名前の類似チェック（同一プラットフォーム内）
         - 85%以上の類似度で警告リストに追加
         - 登録自体はブロックしない（警告のみ）
+        - 候補はpg_trgm（normalized_nameのGiSTインデックス）でトライグラム距離の近い順に取得し、
+          上位のみファジーマッチングで再評価する（どちらも正規化名で比較）
         """
+        from django.contrib.postgres.search import TrigramDistance
+        
         name = self.cleaned_data.get('name')
         platform = self.data.get('platform')  # フォームデータから取得
         
@@ -210,11 +218,21 @@ class ToolAdminForm(forms.ModelForm):
         if platform:
             queryset = queryset.filter(platform=platform)
         
+        normalized_name = Tool._normalize_name(name)
+        if not normalized_name:
+            return name
+        
+        # トライグラム距離（<->演算子）の近い順に上位候補を取得
+        # （%演算子はサーバー設定 pg_trgm.similarity_threshold で候補を落とすため使わない）
+        candidates = queryset.annotate(
+            distance=TrigramDistance('normalized_name', normalized_name)
+        ).order_by('distance')[:self.similar_candidate_limit]
+        
         similar_tools = []
-        for tool in queryset:
-            # ファジーマッチングで類似度を計算
-            ratio = fuzz.ratio(name.lower(), tool.name.lower())
-            if ratio >= 85:
+        for tool in candidates:
+            # ファジーマッチングで類似度を計算（候補抽出と同じ正規化名で比較）
+            ratio = fuzz.ratio(normalized_name, tool.normalized_name)
+            if ratio >= self.similarity_threshold:
                 similar_tools.append({
                     'tool': tool,
                     'ratio': ratio,
@@ -229,12 +247,13 @@ class ToolAdminForm(forms.ModelForm):
 
 
 @admin.register(Tool)
-class ToolAdmin(ImportExportModelAdmin):
+class ToolAdmin(StreamingExportAdminMixin, ImportExportModelAdmin):
     """ツール管理画面(インポート・エクスポート対応)"""
     
     form = ToolAdminForm  # ファジーマッチング警告機能付きフォーム
     resource_class = ToolResource
     formats = (CSVUTF8BOM,)  # UTF-8 BOM付きCSV(Excel日本語対応)
+    change_list_template = 'admin/tools/tool/change_list.html'  # 「重複候補」ボタン追加
     
     list_display = [
         'name',
@@ -318,16 +337,20 @@ class ToolAdmin(ImportExportModelAdmin):
         current_tags = list(obj.tags.all())
         
         if current_tags:
-            # 正規化されたタグのリストを作成
-            normalized_tags = []
-            for tag in current_tags:
-                # 正規化処理を実行
-                normalized_tag = Tag.normalize_and_get_or_create(tag.name)
-                normalized_tags.append(normalized_tag)
+            # 正規化されたタグをまとめて取得（タグ数によらず固定回数のクエリ）
+            normalized_tags = Tag.normalize_many([tag.name for tag in current_tags])
             
-            # 一度全てクリアして、正規化されたタグを再設定
-            obj.tags.clear()
-            obj.tags.add(*normalized_tags)
+            # 正規化されたタグを再設定（変更がなければ何もしない）
+            obj.tags.set(list(set(normalized_tags.values())))
+        
+        # フォームのタグ保存で外れるため、保存時の自動タグ付けをここで再適用
+        # （説明文を変更していない編集では、手動で外したタグを戻さない）
+        from .autotag import TEXT_FIELDS, auto_tagging_on_save, autotag_tool
+        if auto_tagging_on_save() and (not change or set(form.changed_data) & set(TEXT_FIELDS)):
+            added = autotag_tool(obj)
+            if added:
+                names = Tag.objects.filter(pk__in=added).values_list('name', flat=True)
+                messages.info(request, f'説明文から自動でタグを付与しました: {", ".join(names)}')
     
     def save_model(self, request, obj, form, change):
         """
@@ -403,6 +426,134 @@ class ToolAdmin(ImportExportModelAdmin):
         except Exception as e:
             messages.error(request, f'❌ コマンド実行エラー: {str(e)}')
     
+    def get_urls(self):
+        """重複候補・一括インポート画面のURLを追加"""
+        from django.urls import path
+        
+        custom_urls = [
+            path(
+                'duplicates/',
+                self.admin_site.admin_view(self.duplicates_view),
+                name='tools_tool_duplicates'
+            ),
+            path(
+                'bulk-import/',
+                self.admin_site.admin_view(self.bulk_import_view),
+                name='tools_tool_bulk_import'
+            ),
+        ]
+        return custom_urls + super().get_urls()
+    
+    def duplicates_view(self, request):
+        """
+        重複候補クラスタの一覧・統合画面
+        
+        find_duplicate_tools コマンドの最新結果を表示し、
+        クラスタごとに統合先を選んでまとめる（tools.duplicates.merge_tools）
+        """
+        from django.core.cache import cache
+        from django.core.exceptions import PermissionDenied
+        from django.shortcuts import redirect
+        from django.template.response import TemplateResponse
+        from .duplicates import DUPLICATE_REPORT_CACHE_KEY, merge_tools
+        
+        if not (self.has_change_permission(request) and self.has_delete_permission(request)):
+            raise PermissionDenied
+        
+        if request.method == 'POST':
+            tool_ids = {int(value) for value in request.POST.getlist('tool_ids') if value.isdigit()}
+            primary = Tool.objects.filter(pk=request.POST.get('primary') or None).first()
+            if primary is None or primary.pk not in tool_ids:
+                messages.error(request, '統合先のツールを選択してください')
+            elif len(tool_ids) < 2:
+                messages.error(request, '統合するツールを2件以上選択してください')
+            else:
+                duplicates = Tool.objects.filter(pk__in=tool_ids - {primary.pk})
+                count = merge_tools(primary, list(duplicates))
+                messages.success(request, f'✅ {count}件のツールを「{primary.name}」に統合しました')
+            return redirect('admin:tools_tool_duplicates')
+        
+        report = cache.get(DUPLICATE_REPORT_CACHE_KEY)
+        clusters = []
+        if report:
+            tools = Tool.objects.in_bulk({
+                tool_id for cluster in report['clusters'] for tool_id in cluster['tool_ids']
+            })
+            for cluster in report['clusters']:
+                cluster_tools = [tools[tool_id] for tool_id in cluster['tool_ids'] if tool_id in tools]
+                # 統合・削除済みで2件未満になったクラスタは表示しない
+                if len(cluster_tools) >= 2:
+                    clusters.append({'score': cluster['score'], 'tools': cluster_tools})
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': '重複候補ツール',
+            'report': report,
+            'clusters': clusters[:100],
+        }
+        return TemplateResponse(request, 'admin/tools/tool/duplicates.html', context)
+    
+    def get_streaming_export_queryset(self, request):
+        """ストリーミングエクスポート: タグはチャンクごとにprefetch"""
+        return super().get_streaming_export_queryset(request).prefetch_related('tags')
+    
+    def bulk_import_view(self, request):
+        """
+        大量データ用のCSV一括インポート画面
+        
+        通常のインポート（ToolResource）は1行ずつ保存するため、
+        数千行以上のCSVは tools.bulk_import でチャンク単位に取り込む
+        
+        リクエスト内で処理するため、TOOL_ADMIN_IMPORT_MAX_ROWS（デフォルト: 5000行）を
+        超えるファイルは受け付けず、manage.py import_tools での取り込みを案内する
+        """
+        import io
+        from django.conf import settings
+        from django.core.exceptions import PermissionDenied
+        from django.template.response import TemplateResponse
+        from .bulk_import import count_rows, import_tools
+        
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        
+        result = None
+        dry_run = bool(request.POST.get('dry_run'))
+        max_rows = getattr(settings, 'TOOL_ADMIN_IMPORT_MAX_ROWS', 5000)
+        if request.method == 'POST':
+            upload = request.FILES.get('import_file')
+            if upload is None:
+                messages.error(request, 'CSVファイルを選択してください')
+            else:
+                file = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+                rows = count_rows(file)
+                if rows > max_rows:
+                    messages.error(
+                        request,
+                        f'{rows}行のファイルは管理画面では取り込めません（上限 {max_rows}行）。'
+                        f'python manage.py import_tools でインポートしてください'
+                    )
+                else:
+                    result = import_tools(file, dry_run=dry_run)
+                    message = (
+                        f'{result["rows"]}行処理: 新規 {result["created"]}件 / '
+                        f'更新 {result["updated"]}件 / エラー {len(result["errors"])}件'
+                    )
+                    if dry_run:
+                        messages.info(request, f'🔍 ドライラン（保存していません）: {message}')
+                    else:
+                        messages.success(request, f'✅ インポート完了: {message}')
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'ツール一括インポート',
+            'result': result,
+            'errors': result['errors'][:100] if result else [],
+            'max_rows': max_rows,
+        }
+        return TemplateResponse(request, 'admin/tools/tool/bulk_import.html', context)
+    
     def computed_ribbons_display(self, obj):
         """自動計算されるリボンを表示"""
         if obj.pk:
@@ -468,13 +619,44 @@ class ToolStatsAdmin(admin.ModelAdmin):
     actions = ['calculate_scores']
     
     def calculate_scores(self, request, queryset):
-        """選択した統計のスコアを再計算"""
-        count = 0
-        for stats in queryset:
-            stats.calculate_score()
-            stats.save()
-            count += 1
-        self.message_user(request, f'{count}件のスコアを再計算しました。')
+        """
+        選択した統計のスコアを日別集計から再計算（現在の重み・半減期）
+        
+        日別集計はEventLogから作り直してから計算する（未作成・古い集計で週間統計が0にならないよう）。
+        順位は次回の update_weekly_stats で更新される。
+        """
+        from datetime import timedelta
+        from django.db import transaction
+        from django.utils import timezone
+        from .facets import invalidate_tool_catalogue
+        from .scoring import WEEK_DAYS, compute_tool_scores, get_score_config, refresh_daily_stats
+        
+        config = get_score_config()
+        today = timezone.localdate()
+        stats_list = list(queryset)
+        
+        with transaction.atomic():
+            refresh_daily_stats(today - timedelta(days=max(config['window_days'], WEEK_DAYS) - 1), today)
+            scores = compute_tool_scores(
+                as_of=today,
+                config=config,
+                tool_ids=[stats.tool_id for stats in stats_list]
+            )
+            now = timezone.now()
+            for stats in stats_list:
+                for name, value in scores[stats.tool_id].items():
+                    setattr(stats, name, value)
+                # bulk_updateではauto_nowが更新されないため明示的に設定
+                stats.last_updated = now
+            ToolStats.objects.bulk_update(
+                stats_list,
+                ['week_views', 'week_clicks', 'week_shares', 'week_avg_duration', 'week_score', 'last_updated'],
+                batch_size=500
+            )
+            # ランキング・ファセットのキャッシュを無効化（bulk_updateはシグナルを発火しないため明示的に実行）
+            invalidate_tool_catalogue()
+        
+        self.message_user(request, f'{len(stats_list)}件のスコアを再計算しました。')
     calculate_scores.short_description = 'スコアを再計算'
 
 
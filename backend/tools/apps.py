@@ -9,11 +9,14 @@ class ToolsConfig(AppConfig):
         """
         Djangoアプリケーション起動時に実行される処理
         
-        スケジューラーを自動起動します。
+        シグナルハンドラを登録し、スケジューラーを自動起動します。
         """
         import logging
         logger = logging.getLogger(__name__)
         
+        # シグナルハンドラの登録（タグスラッグ同期）
+        from . import signals  # noqa: F401
+        
         try:
             # スケジューラーをインポートして起動
             from .scheduler import start_scheduler
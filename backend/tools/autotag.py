@@ -0,0 +1,340 @@
+"""
+ツール説明文からの自動タグ付け（Aho-Corasick）
+
+タグの名前・表記ゆれ（Tag.synonyms）・TagMappingの表記ゆれを正規化して
+1つのAho-Corasickオートマトンにまとめ、説明文を1回走査するだけで
+（語彙数によらず文字数に比例する時間で）含まれるタグを検出する。
+
+- 正規化: Tag.normalize_string と同じ NFKC + 小文字化（全角・大文字の表記差を吸収）
+- 英数字の語は前後が英数字でない位置のみ一致（"ema" の中の "ma" 等を除外）
+- 付与のみ行い、既存のタグは外さない
+- オートマトンはプロセスごとに保持し、タグ・TagMappingの変更時に再構築
+  （語彙バージョンをキャッシュで共有）
+- 照合はDBに依存しない関数で行い、カタログ全体は複数プロセスで並列実行できる
+"""
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+VOCABULARY_VERSION_KEY = 'tool_autotag:version'
+
+# 照合対象のフィールド
+TEXT_FIELDS = ('short_description', 'long_description')
+
+# これより短い語は誤検出が多いため照合しない
+MIN_TERM_LENGTH = 2
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def auto_tagging_on_save():
+    """ツール保存時に説明文からタグを付与するかどうか（settings.TOOL_AUTO_TAGGING_ON_SAVE）"""
+    from django.conf import settings
+    return getattr(settings, 'TOOL_AUTO_TAGGING_ON_SAVE', True)
+
+
+def normalize_text(text):
+    """Tag.normalize_string と同じ正規化（NFKC + 小文字化）"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def _is_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+class TagMatcher:
+    """
+    正規化済みの語 → タグIDのAho-Corasickオートマトン
+
+    状態ごとに遷移（dict）・失敗遷移・出力（語の長さ、タグID、境界チェックの要否）を
+    リストで保持する（プロセス間で受け渡せるようpickle可能な構造のみ）
+    """
+
+    def __init__(self, vocabulary):
+        """
+        Args:
+            vocabulary: {正規化済みの語: タグIDの集合}
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for term, tag_ids in vocabulary.items():
+            if len(term) < MIN_TERM_LENGTH:
+                continue
+            state = 0
+            for char in term:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append((
+                len(term),
+                tuple(sorted(tag_ids)),
+                _is_word_char(term[0]),
+                _is_word_char(term[-1]),
+            ))
+
+        # 失敗遷移を幅優先で作成（出力は失敗遷移先の出力も含める）
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def __len__(self):
+        """状態数"""
+        return len(self.goto)
+
+    def find(self, text):
+        """
+        テキストに含まれるタグのID集合
+
+        Args:
+            text: 正規化済みのテキスト
+        """
+        found = set()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, tag_ids, check_start, check_end in outputs[state]:
+                start = i - length + 1
+                if check_start and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if check_end and i + 1 < len(text) and _is_word_char(text[i + 1]):
+                    continue
+                found.update(tag_ids)
+        return found
+
+    def find_in(self, *texts):
+        """複数のテキスト（未正規化）に含まれるタグのID集合"""
+        # 語が連結されないよう改行で区切る
+        return self.find('\n'.join(normalize_text(text) for text in texts))
+
+
+def build_vocabulary():
+    """タグ名・表記ゆれ・TagMappingから {正規化済みの語: タグIDの集合} を作成"""
+    from tags.models import Tag, TagMapping
+
+    vocabulary = {}
+    tag_ids_by_name = {}
+
+    def add(term, tag_id):
+        term = normalize_text(term).strip()
+        if term:
+            vocabulary.setdefault(term, set()).add(tag_id)
+
+    for tag_id, name, synonyms in Tag.objects.values_list('id', 'name', 'synonyms'):
+        tag_ids_by_name[normalize_text(name).strip()] = tag_id
+        for term in [name] + list(synonyms or []):
+            add(term, tag_id)
+
+    # TagMappingは正式名称と同名のタグに対応付ける
+    for canonical_name, variations in TagMapping.objects.values_list('canonical_name', 'variations'):
+        tag_id = tag_ids_by_name.get(normalize_text(canonical_name).strip())
+        if tag_id is not None:
+            for term in variations:
+                add(term, tag_id)
+
+    return vocabulary
+
+
+# プロセスごとのオートマトン（語彙バージョン, TagMatcher）
+_matcher = None
+
+
+def get_matcher():
+    """現在の語彙のTagMatcher（語彙バージョンが変わった場合のみ再構築）"""
+    from django.core.cache import cache
+    from .facets import new_cache_version
+
+    global _matcher
+    version = cache.get_or_set(VOCABULARY_VERSION_KEY, new_cache_version, timeout=None)
+    if _matcher is None or _matcher[0] != version:
+        _matcher = (version, TagMatcher(build_vocabulary()))
+    return _matcher[1]
+
+
+def invalidate_matcher():
+    """語彙（タグ名・表記ゆれ・TagMapping）の変更を通知（コミット後に全プロセスで再構築）"""
+    from django.core.cache import cache
+    from django.db import transaction
+    from .facets import new_cache_version
+
+    def bump():
+        try:
+            cache.incr(VOCABULARY_VERSION_KEY)
+        except ValueError:
+            cache.set(VOCABULARY_VERSION_KEY, new_cache_version(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+# ワーカープロセスのTagMatcher（initializerで受け取る）
+_worker_matcher = None
+
+
+def _init_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _match_chunk(rows, matcher=None):
+    """[(id, テキスト, ...)] → [(id, タグIDの集合)]（ワーカープロセス用）"""
+    matcher = matcher or _worker_matcher
+    return [(row[0], matcher.find_in(*row[1:])) for row in rows]
+
+
+def iter_matches(rows, matcher, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    チャンクごとの照合結果を順に返す
+
+    Args:
+        rows: (id, テキスト, ...) のイテラブル
+        workers: 照合のプロセス数（1ならプロセスを使わない）
+
+    Yields:
+        list: [(id, タグIDの集合)]
+    """
+    from collections import deque
+    from itertools import islice
+
+    rows = iter(rows)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    if workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(matcher,)
+        ) as executor:
+            # executor.mapは全チャンクを先に読み込んで投入するため、
+            # 実行中のチャンクをプロセス数の2倍までに抑え、1件取り出すごとに1件補充する
+            pending = deque(executor.submit(_match_chunk, chunk) for chunk in islice(chunks, workers * 2))
+            while pending:
+                result = pending.popleft().result()
+                for chunk in islice(chunks, 1):
+                    pending.append(executor.submit(_match_chunk, chunk))
+                yield result
+    else:
+        for chunk in chunks:
+            yield _match_chunk(chunk, matcher)
+
+
+def find_new_tags(matches):
+    """
+    照合結果から未付与のタグのみを取り出す
+
+    Args:
+        matches: [(ツールID, タグIDの集合)]
+
+    Returns:
+        dict: {ツールID: 未付与のタグIDのリスト}
+    """
+    from .models import ToolTag
+
+    matches = {tool_id: tag_ids for tool_id, tag_ids in matches if tag_ids}
+    if not matches:
+        return {}
+
+    existing = set(
+        ToolTag.objects.filter(content_object_id__in=matches).values_list('content_object_id', 'tag_id')
+    )
+    new_tags = {}
+    for tool_id, tag_ids in matches.items():
+        new_ids = sorted(tag_id for tag_id in tag_ids if (tool_id, tag_id) not in existing)
+        if new_ids:
+            new_tags[tool_id] = new_ids
+    return new_tags
+
+
+def apply_matches(matches):
+    """
+    照合結果のうち未付与のタグを一括で付与（tag_slugs・タグ共起行列も同期）
+
+    Returns:
+        dict: {ツールID: 追加したタグIDのリスト}
+    """
+    from tags.cooccurrence import refresh_cooccurrence
+    from .models import Tool, ToolTag
+
+    added = find_new_tags(matches)
+    if added:
+        ToolTag.objects.bulk_create([
+            ToolTag(content_object_id=tool_id, tag_id=tag_id)
+            for tool_id, tag_ids in added.items()
+            for tag_id in tag_ids
+        ], ignore_conflicts=True)
+        Tool.sync_tag_slugs(added)
+        refresh_cooccurrence({tag_id for tag_ids in added.values() for tag_id in tag_ids})
+    return added
+
+
+def autotag_tool(tool):
+    """
+    1ツールの説明文からタグを付与（保存時用）
+
+    Returns:
+        list: 追加したタグIDのリスト
+    """
+    from .facets import invalidate_tool_catalogue
+
+    found = get_matcher().find_in(*(getattr(tool, field) for field in TEXT_FIELDS))
+    added = apply_matches([(tool.pk, found)]).get(tool.pk, [])
+    if added:
+        # 後続のsave()で古い値に戻らないよう、インスタンス側も更新
+        tool.tag_slugs = type(tool).objects.values_list('tag_slugs', flat=True).get(pk=tool.pk)
+        invalidate_tool_catalogue()
+    return added
+
+
+def autotag_tools(queryset, apply=False, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    カタログ全体（querysetのツール）の説明文からタグを提案・付与
+
+    Args:
+        apply: Trueなら未付与のタグを付与（Falseなら提案のみ）
+        workers: 照合のプロセス数
+        progress: チャンクごとに呼ばれるコールバック（集計途中の結果を渡す）
+
+    Returns:
+        dict: {
+            'tools': 照合したツール数,
+            'suggestions': {ツールID: 未付与のタグIDのリスト}（apply時は付与したタグ）,
+        }
+    """
+    from django.db import transaction
+    from .facets import batch_catalogue_invalidation, invalidate_tool_catalogue
+
+    matcher = get_matcher()
+    rows = queryset.order_by('pk').values_list('pk', *TEXT_FIELDS).iterator(chunk_size=chunk_size)
+    result = {'tools': 0, 'suggestions': {}}
+
+    with batch_catalogue_invalidation():
+        for matches in iter_matches(rows, matcher, workers=workers, chunk_size=chunk_size):
+            result['tools'] += len(matches)
+            if apply:
+                # チャンクごとにコミット
+                with transaction.atomic():
+                    added = apply_matches(matches)
+                if added:
+                    invalidate_tool_catalogue()
+            else:
+                added = find_new_tags(matches)
+            result['suggestions'].update(added)
+            if progress:
+                progress(result)
+
+    return result
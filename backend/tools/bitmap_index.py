@@ -0,0 +1,242 @@
+"""
+ツールカタログのインメモリ・ビットマップインデックス
+
+platform / tool_type / price_type / ribbons / tags の値ごとに
+ツール集合をビットセット（Pythonのint）で保持し、ToolFilterの条件と
+ファセット件数をビット演算で処理する。
+
+- ビット位置 = 人気順（week_score降順）の順位なので、
+  結果ビットセットを下位ビットから走査すればそのまま人気順のID列になる
+- カタログのバージョン（tools.facets.get_catalogue_version）が変わると
+  次回アクセス時にDBから再構築する
+- 全文検索・カテゴリ・人気順以外の並び替えはインデックスで扱えないため、
+  呼び出し側は filter() が None を返した場合にDBで処理する
+
+設定:
+    TOOL_BITMAP_INDEX = True  # 有効化（デフォルト: False）
+"""
+import threading
+
+from django.conf import settings
+
+from .facets import CHOICE_FACETS, get_catalogue_version
+from .models import Tool
+
+
+# インデックス対象: (ファセット名, カラム名, 配列カラムか)
+INDEXED_FIELDS = (
+    ('platform', 'platform', False),
+    ('tool_type', 'tool_type', False),
+    ('price_type', 'price_type', False),
+    ('ribbons', 'effective_ribbons', True),
+    ('tags', 'tag_slugs', True),
+)
+
+# ToolFilterのパラメータ: (ファセット名, 結合方法, 空要素を除くか)
+# - any: いずれかを含む（OR） / all: すべて含む（AND） / exact: 単一値
+FILTER_PARAMS = {
+    'platform': ('platform', 'any', False),
+    'tool_type': ('tool_type', 'any', False),
+    'price_type': ('price_type', 'exact', False),
+    'tags': ('tags', 'all', True),
+    'tags_any': ('tags', 'any', True),
+    'ribbons': ('ribbons', 'all', True),
+}
+
+# インデックスで扱えないパラメータ（指定時はDBで処理）
+UNSUPPORTED_PARAMS = ('search', 'category')
+
+# インデックスの並び順と一致するorderingパラメータ
+SUPPORTED_ORDERINGS = ('', '-week_score', '-week_score,-created_at')
+
+
+# BitmapResultのスライスで読み飛ばす単位（ビット数）
+SEEK_CHUNK_BITS = 4096
+SEEK_CHUNK_MASK = (1 << SEEK_CHUNK_BITS) - 1
+
+
+def iter_positions(bits):
+    """ビットセットの立っているビット位置を昇順に返す"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class BitmapResult:
+    """
+    フィルタ結果（人気順のツールID列）
+
+    len() とスライスに対応し、DRFのページネーションにそのまま渡せる
+
+    スライス開始位置まではチャンク単位のbit_count()で読み飛ばし、
+    読み終えた位置をカーソルとして保持して次のスライスはその続きから走査する
+    """
+
+    def __init__(self, index, bits):
+        self.index = index
+        self.bits = bits
+        # (読んだ要素数, 残りビットの基準位置, 基準位置以降の未読ビット)
+        self._cursor = (0, 0, bits)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError('BitmapResultはスライスのみ対応しています')
+        start, stop, step = key.indices(len(self))
+        ids = []
+        if start >= stop:
+            return ids
+
+        count, base, rest = self._cursor if self._cursor[0] <= start else (0, 0, self.bits)
+        # 開始位置を含まないチャンクはビット数だけ数えて読み飛ばす
+        while rest:
+            chunk_count = (rest & SEEK_CHUNK_MASK).bit_count()
+            if count + chunk_count > start:
+                break
+            count += chunk_count
+            rest >>= SEEK_CHUNK_BITS
+            base += SEEK_CHUNK_BITS
+
+        while rest and count < stop:
+            chunk = rest & SEEK_CHUNK_MASK
+            while chunk and count < stop:
+                lowest = chunk & -chunk
+                if count >= start and (count - start) % step == 0:
+                    ids.append(self.index.ids[base + lowest.bit_length() - 1])
+                chunk ^= lowest
+                count += 1
+            if chunk:
+                # 途中まで読んだチャンクは読んだビットを落として残す
+                rest = (rest >> SEEK_CHUNK_BITS << SEEK_CHUNK_BITS) | chunk
+            else:
+                rest >>= SEEK_CHUNK_BITS
+                base += SEEK_CHUNK_BITS
+
+        self._cursor = (count, base, rest)
+        return ids
+
+    def __iter__(self):
+        return (self.index.ids[position] for position in iter_positions(self.bits))
+
+
+class ToolBitmapIndex:
+    """ツールカタログのビットマップインデックス"""
+
+    def __init__(self, rows, version=None):
+        """
+        Args:
+            rows: (id, platform, tool_type, price_type, effective_ribbons, tag_slugs) の人気順リスト
+            version: 構築時のカタログバージョン
+        """
+        self.version = version
+        self.ids = []
+        self.bitsets = {name: {} for name, column, is_array in INDEXED_FIELDS}
+
+        for position, (tool_id, *values) in enumerate(rows):
+            self.ids.append(tool_id)
+            bit = 1 << position
+            for (name, column, is_array), value in zip(INDEXED_FIELDS, values):
+                bitsets = self.bitsets[name]
+                for item in (value or []) if is_array else [value]:
+                    bitsets[item] = bitsets.get(item, 0) | bit
+
+        self.all_bits = (1 << len(self.ids)) - 1
+
+    @classmethod
+    def build(cls, version=None):
+        """DBから構築（ToolViewSetの人気順: week_score降順 → 新着順 → ID降順）"""
+        from django.db.models import F, Value
+        from django.db.models.functions import Coalesce
+
+        rows = Tool.objects.annotate(
+            week_score=Coalesce(F('stats__week_score'), Value(0.0))
+        ).order_by('-week_score', '-created_at', '-id').values_list(
+            'id', *[column for name, column, is_array in INDEXED_FIELDS]
+        )
+        return cls(list(rows), version)
+
+    def filter(self, query_params):
+        """
+        ToolFilterと同じ条件をビット演算で評価
+
+        Returns:
+            int: 結果のビットセット（インデックスで扱えない条件の場合はNone）
+        """
+        if any(query_params.get(name) for name in UNSUPPORTED_PARAMS):
+            return None
+        if query_params.get('ordering', '').replace(' ', '') not in SUPPORTED_ORDERINGS:
+            return None
+
+        bits = self.all_bits
+        for param, (name, mode, skip_empty) in FILTER_PARAMS.items():
+            value = query_params.get(param)
+            if not value:
+                continue
+            bitsets = self.bitsets[name]
+
+            if mode == 'exact':
+                # 選択肢外の値はDB側（ChoiceFilter）でバリデーションエラーにする
+                if value not in dict(CHOICE_FACETS[name]):
+                    return None
+                bits &= bitsets.get(value, 0)
+                continue
+
+            values = [v.strip() for v in value.split(',')]
+            if skip_empty:
+                values = [v for v in values if v]
+            if mode == 'any':
+                if values or not skip_empty:
+                    matched = 0
+                    for v in values:
+                        matched |= bitsets.get(v, 0)
+                    bits &= matched
+            else:
+                for v in values:
+                    bits &= bitsets.get(v, 0)
+
+        return bits
+
+    def result(self, bits):
+        """ビットセットを人気順のID列に変換"""
+        return BitmapResult(self, bits)
+
+    def facets(self, bits):
+        """ファセット件数（tools.facets.compute_tool_facetsと同じ形式）"""
+        facets = {}
+        for name, bitsets in self.bitsets.items():
+            counts = {value: (bits & value_bits).bit_count() for value, value_bits in bitsets.items()}
+            counts = {value: count for value, count in counts.items() if count}
+            if name in CHOICE_FACETS:
+                facets[name] = {value: counts.pop(value, 0) for value, label in CHOICE_FACETS[name]}
+                facets[name].update(counts)
+            else:
+                facets[name] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+        return {'count': bits.bit_count(), 'facets': facets}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_tool_bitmap_index():
+    """
+    最新のビットマップインデックスを取得（TOOL_BITMAP_INDEX無効時はNone）
+
+    カタログのバージョンが変わっていればDBから再構築する
+    """
+    global _index
+
+    if not getattr(settings, 'TOOL_BITMAP_INDEX', False):
+        return None
+
+    version = get_catalogue_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = ToolBitmapIndex.build(version)
+            index = _index
+    return index
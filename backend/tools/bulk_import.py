@@ -0,0 +1,270 @@
+"""
+ツールの一括インポート（ストリーミング + バルクupsert）
+
+CSV（ToolResourceのエクスポート形式）をチャンク単位で読み込み、
+1チャンクあたり固定回数のクエリで取り込む。
+ToolResource（django-import-export）は1行ずつ保存するため、大量データはこちらを使う。
+
+- 既存ツールの照合: external_url → (normalized_name, platform) の順
+- upsert: bulk_create(update_conflicts=True)
+  （新規・URL一致は external_url、名前一致は (normalized_name, platform) で衝突解決）
+- タグ: チャンク内のタグ名をTag.normalize_manyでまとめて正規化し、ToolTagを一括挿入
+  （tags列が空の行は既存タグを維持）
+- tag_slugs / effective_ribbons / タグ共起行列はチャンクごとにまとめて再計算
+"""
+import csv
+import json
+from contextlib import nullcontext
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from tags.cooccurrence import refresh_cooccurrence
+from tags.models import Tag
+from .facets import invalidate_tool_catalogue
+from .models import Tool, ToolTag
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+REQUIRED_COLUMNS = ('name', 'short_description', 'platform', 'tool_type', 'image_url', 'external_url')
+
+# 選択肢のバリデーション
+FIELD_CHOICES = {
+    'platform': {value for value, label in Tool.PLATFORM_CHOICES},
+    'tool_type': {value for value, label in Tool.TOOL_TYPE_CHOICES},
+    'price_type': {value for value, label in Tool.PRICE_TYPE_CHOICES},
+}
+
+# upsert時の更新フィールド（slug・created_atは既存の値を維持）
+UPDATE_FIELDS = (
+    'name', 'short_description', 'long_description', 'tool_type', 'price_type',
+    'ribbons', 'image_url', 'metadata', 'updated_at',
+)
+
+
+def split_values(value, separators=('|', ',')):
+    """区切り文字列 → リスト（ArrayFieldWidgetと同じくパイプ優先）"""
+    if not value:
+        return []
+    for separator in separators:
+        if separator in value:
+            return [item.strip() for item in value.split(separator) if item.strip()]
+    return [value.strip()]
+
+
+def parse_metadata(value):
+    """metadata列（JSON文字列）→ dict（空・不正な値は空dict）"""
+    if not value:
+        return {}
+    try:
+        metadata = json.loads(value)
+    except ValueError:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def clean_row(row):
+    """
+    CSVの1行をToolのフィールド値に変換（ToolResource.before_import_rowと同じ正規化）
+
+    Returns:
+        tuple: (フィールド値dict, タグ名リスト or None)
+
+    Raises:
+        ValueError: 必須項目の不足・選択肢外の値
+    """
+    row = {
+        key.strip(): value.strip() if isinstance(value, str) else ''
+        for key, value in row.items() if key
+    }
+
+    missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+    if missing:
+        raise ValueError(f'必須項目が空です: {", ".join(missing)}')
+
+    data = {
+        'name': row['name'],
+        'slug': row.get('slug') or slugify(row['name']),
+        'short_description': row['short_description'],
+        'long_description': row.get('long_description', ''),
+        'platform': row['platform'].lower(),
+        'tool_type': row['tool_type'],
+        'price_type': row.get('price_type') or 'free',
+        'ribbons': split_values(row.get('ribbons')),
+        'image_url': row['image_url'],
+        'external_url': row['external_url'],
+        'metadata': parse_metadata(row.get('metadata')),
+    }
+    for field, choices in FIELD_CHOICES.items():
+        if data[field] not in choices:
+            raise ValueError(f'{field} の値が不正です: {data[field]}')
+    if not data['slug']:
+        raise ValueError('slugを生成できません（slug列を指定してください）')
+    data['normalized_name'] = Tool._normalize_name(data['name'])
+
+    tag_names = split_values(row.get('tags'), separators=(',',)) or None
+    return data, tag_names
+
+
+def import_chunk(rows):
+    """
+    1チャンク分の行を取り込む
+
+    Args:
+        rows: (行番号, CSV行dict) のリスト
+
+    Returns:
+        dict: {'created': 新規件数, 'updated': 更新件数, 'errors': [(行番号, メッセージ)]}
+    """
+    result = {'created': 0, 'updated': 0, 'errors': []}
+
+    # 行の正規化（チャンク内で同じツールを指す行は後の行を優先）
+    by_url = {}
+    by_name = {}
+    for line, row in rows:
+        try:
+            data, tag_names = clean_row(row)
+        except ValueError as e:
+            result['errors'].append((line, str(e)))
+            continue
+        name_key = (data['normalized_name'], data['platform'])
+        for previous in (by_url.get(data['external_url']), by_name.get(name_key)):
+            if previous is not None:
+                by_url.pop(previous['data']['external_url'], None)
+                by_name.pop((previous['data']['normalized_name'], previous['data']['platform']), None)
+        entry = {'line': line, 'data': data, 'tag_names': tag_names}
+        by_url[data['external_url']] = entry
+        by_name[name_key] = entry
+    entries = sorted(by_url.values(), key=lambda entry: entry['line'])
+    if not entries:
+        return result
+
+    # 既存ツールの照合（1クエリ）
+    existing = Tool.objects.filter(
+        Q(external_url__in=[entry['data']['external_url'] for entry in entries])
+        | Q(normalized_name__in=[entry['data']['normalized_name'] for entry in entries])
+    ).values_list('id', 'slug', 'external_url', 'normalized_name', 'platform')
+    existing_by_url = {}
+    existing_by_name = {}
+    existing_slugs = set()
+    for tool_id, slug, external_url, normalized_name, platform in existing:
+        existing_by_url[external_url] = tool_id
+        existing_by_name[(normalized_name, platform)] = tool_id
+        existing_slugs.add(slug)
+
+    # 新規ツールのslug重複チェック（1クエリ）
+    new_slugs = [
+        entry['data']['slug'] for entry in entries
+        if entry['data']['external_url'] not in existing_by_url
+        and (entry['data']['normalized_name'], entry['data']['platform']) not in existing_by_name
+    ]
+    existing_slugs.update(Tool.objects.filter(slug__in=new_slugs).values_list('slug', flat=True))
+
+    url_entries = []   # 新規 + external_url一致
+    name_entries = []  # (normalized_name, platform) のみ一致（外部URLの変更）
+    for entry in entries:
+        data = entry['data']
+        url_match = existing_by_url.get(data['external_url'])
+        name_match = existing_by_name.get((data['normalized_name'], data['platform']))
+        if url_match and name_match and url_match != name_match:
+            result['errors'].append((entry['line'], '同じ名前・プラットフォームの別ツールが存在します'))
+        elif url_match or name_match:
+            (url_entries if url_match else name_entries).append(entry)
+            result['updated'] += 1
+        elif data['slug'] in existing_slugs:
+            result['errors'].append((entry['line'], f'slugが既に使われています: {data["slug"]}'))
+        else:
+            existing_slugs.add(data['slug'])
+            url_entries.append(entry)
+            result['created'] += 1
+
+    with transaction.atomic():
+        for chunk_entries, unique_fields, update_fields in (
+            (url_entries, ['external_url'], UPDATE_FIELDS + ('normalized_name', 'platform')),
+            (name_entries, ['normalized_name', 'platform'], UPDATE_FIELDS + ('external_url',)),
+        ):
+            if not chunk_entries:
+                continue
+            tools = [Tool(**entry['data']) for entry in chunk_entries]
+            Tool.objects.bulk_create(
+                tools,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=list(update_fields),
+            )
+            for entry, tool in zip(chunk_entries, tools):
+                entry['tool_id'] = tool.pk
+
+        imported = url_entries + name_entries
+        tool_ids = [entry['tool_id'] for entry in imported]
+
+        # タグの付け替え（tags列のある行のみ）
+        tagged = {entry['tool_id']: entry['tag_names'] for entry in imported if entry['tag_names']}
+        if tagged:
+            tags = Tag.normalize_many(name for names in tagged.values() for name in names)
+            old_links = ToolTag.objects.filter(content_object_id__in=tagged)
+            changed_tag_ids = set(old_links.values_list('tag_id', flat=True))
+            old_links.delete()
+            links = [
+                ToolTag(content_object_id=tool_id, tag_id=tag_id)
+                for tool_id, names in tagged.items()
+                for tag_id in {tags[name].pk for name in names}
+            ]
+            ToolTag.objects.bulk_create(links)
+            Tool.sync_tag_slugs(tagged)
+            refresh_cooccurrence(changed_tag_ids | {link.tag_id for link in links})
+
+        Tool.update_effective_ribbons(Tool.objects.filter(pk__in=tool_ids))
+        invalidate_tool_catalogue()
+
+    return result
+
+
+def iter_chunks(reader, chunk_size):
+    """CSVリーダーから (行番号, 行) のチャンクを順に返す（ヘッダーが1行目）"""
+    rows = enumerate(reader, start=2)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def count_rows(file):
+    """CSVのデータ行数（ヘッダー行を除く）を数え、ファイルを先頭に戻す"""
+    rows = max(sum(1 for row in csv.reader(file)) - 1, 0)
+    file.seek(0)
+    return rows
+
+
+def import_tools(file, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, progress=None):
+    """
+    CSVファイルからツールを一括インポート
+
+    Args:
+        file: テキストモードのファイルオブジェクト（UTF-8、BOM付き可）
+        chunk_size: 1チャンクの行数（チャンクごとにコミット）
+        dry_run: Trueの場合は全体をロールバック
+        progress: チャンク処理ごとに集計dictを受け取るコールバック
+
+    Returns:
+        dict: {'rows': 処理行数, 'created': 新規件数, 'updated': 更新件数, 'errors': [(行番号, メッセージ)]}
+    """
+    reader = csv.DictReader(file)
+    if reader.fieldnames:
+        # Excel出力のBOM付きCSVをバイナリ経由で渡された場合の対策
+        reader.fieldnames = [name.lstrip('\ufeff') for name in reader.fieldnames]
+
+    total = {'rows': 0, 'created': 0, 'updated': 0, 'errors': []}
+    with transaction.atomic() if dry_run else nullcontext():
+        for chunk in iter_chunks(reader, chunk_size):
+            result = import_chunk(chunk)
+            total['rows'] += len(chunk)
+            total['created'] += result['created']
+            total['updated'] += result['updated']
+            total['errors'].extend(result['errors'])
+            if progress:
+                progress(total)
+        if dry_run:
+            transaction.set_rollback(True)
+    return total
@@ -0,0 +1,293 @@
+"""
+カタログ全体の重複ツール検出（MinHash / LSH）とツール統合
+
+各ツールを以下のシングル（特徴量）の集合で表し、MinHashの署名を
+LSH（バンド分割）でバケット化して候補ペアのみを比較する（O(n²)の総当たりを回避）。
+
+- 名前: 正規化名（Tool._normalize_name）の文字3-gram
+- 外部URL: ホスト名（www.を除く）
+- 説明: 短い説明の文字4-gram（日本語の分かち書きなしでも有効）
+
+候補ペアは各特徴のJaccard係数の加重平均でスコア付けし、
+閾値以上のペアをUnion-Findでクラスタにまとめる。
+署名計算はDBに依存しない関数で行い、複数プロセスで並列実行できる。
+"""
+import hashlib
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+
+
+# MinHashのハッシュ関数数 = バンド数 × 1バンドの行数
+# 16バンド × 4行: Jaccard 0.5前後から候補になる（(1/16)^(1/4) ≈ 0.5）
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+# ハッシュ関数 h(x) = (a * x + b) mod p（p: メルセンヌ素数 2^61 - 1）
+MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f'a{i}'.encode(), digest_size=8).digest(), 'big') % (MERSENNE_PRIME - 1) + 1,
+        int.from_bytes(hashlib.blake2b(f'b{i}'.encode(), digest_size=8).digest(), 'big') % MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+# スコアの重み（名前 / ホスト / 説明）
+FEATURE_WEIGHTS = {'name': 0.6, 'host': 0.2, 'description': 0.2}
+
+# 1バケットの最大件数（共通ホスト等で巨大化したバケットは候補生成から除外）
+MAX_BUCKET_SIZE = 200
+
+DEFAULT_THRESHOLD = 0.6
+
+
+def char_ngrams(text, n):
+    """文字n-gramの集合（空白除去後、n文字未満は全体を1要素）"""
+    text = re.sub(r'\s+', '', text or '')
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def get_host(url):
+    """外部URLのホスト名（小文字、www.除去）"""
+    host = (urlparse(url or '').hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def get_features(name, external_url, description):
+    """
+    ツールの特徴量（種類ごとのシングル集合）
+
+    name は正規化済み（Tool._normalize_name）を渡す
+    """
+    from .models import Tool
+
+    host = get_host(external_url)
+    return {
+        'name': char_ngrams(name, 3),
+        'host': {host} if host else set(),
+        'description': char_ngrams(Tool._normalize_name(description), 4),
+    }
+
+
+def compute_signature(features):
+    """MinHash署名（全特徴のシングルを種類付きで1つの集合として扱う）"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f'{kind}:{shingle}'.encode(), digest_size=8).digest(), 'big')
+        for kind, shingles in features.items()
+        for shingle in shingles
+    ]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def _signature_chunk(rows):
+    """[(id, 正規化名, 外部URL, 説明)] → [(id, 特徴量, 署名)]（ワーカープロセス用）"""
+    results = []
+    for tool_id, name, external_url, description in rows:
+        features = get_features(name, external_url, description)
+        results.append((tool_id, features, compute_signature(features)))
+    return results
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def score_pair(features_a, features_b):
+    """2ツールの類似スコア（0〜1、特徴ごとのJaccard係数の加重平均）"""
+    return sum(
+        weight * jaccard(features_a[kind], features_b[kind])
+        for kind, weight in FEATURE_WEIGHTS.items()
+    )
+
+
+def find_duplicate_clusters(rows, threshold=DEFAULT_THRESHOLD, workers=1, chunk_size=500):
+    """
+    重複候補クラスタを検出
+
+    Args:
+        rows: [(id, 正規化名, 外部URL, 説明)] のリスト
+        threshold: クラスタにまとめるペアスコアの下限
+        workers: 署名計算のプロセス数（1ならプロセスを使わない）
+
+    Returns:
+        dict: {
+            'clusters': [{'tool_ids': [...], 'score': 最大ペアスコア, 'pairs': [(id, id, score)]}],
+            'candidate_pairs': LSHで比較したペア数,
+        }
+        クラスタはスコア降順 → 件数降順
+    """
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            signed = [item for chunk in executor.map(_signature_chunk, chunks) for item in chunk]
+    else:
+        signed = [item for chunk in chunks for item in _signature_chunk(chunk)]
+
+    features = {tool_id: tool_features for tool_id, tool_features, signature in signed}
+
+    # LSH: 署名をバンドに分割し、同じバンド値を持つツールを候補とする
+    buckets = defaultdict(list)
+    for tool_id, tool_features, signature in signed:
+        if signature is None:
+            continue
+        for band in range(NUM_BANDS):
+            start = band * ROWS_PER_BAND
+            buckets[(band, signature[start:start + ROWS_PER_BAND])].append(tool_id)
+
+    candidates = set()
+    for tool_ids in buckets.values():
+        if 1 < len(tool_ids) <= MAX_BUCKET_SIZE:
+            for i, a in enumerate(tool_ids):
+                for b in tool_ids[i + 1:]:
+                    candidates.add((a, b) if a < b else (b, a))
+
+    # 候補ペアのスコア計算 → Union-Findでクラスタ化
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    pairs = []
+    for a, b in candidates:
+        score = score_pair(features[a], features[b])
+        if score >= threshold:
+            pairs.append((a, b, round(score, 3)))
+            parent[find(a)] = find(b)
+
+    clusters = defaultdict(lambda: {'tool_ids': set(), 'pairs': []})
+    for a, b, score in pairs:
+        cluster = clusters[find(a)]
+        cluster['tool_ids'].update((a, b))
+        cluster['pairs'].append((a, b, score))
+
+    result = [
+        {
+            'tool_ids': sorted(cluster['tool_ids']),
+            'score': max(score for a, b, score in cluster['pairs']),
+            'pairs': sorted(cluster['pairs'], key=lambda pair: -pair[2]),
+        }
+        for cluster in clusters.values()
+    ]
+    result.sort(key=lambda cluster: (-cluster['score'], -len(cluster['tool_ids']), cluster['tool_ids'][0]))
+    return {'clusters': result, 'candidate_pairs': len(candidates)}
+
+
+# 最新の検出結果（管理画面の統合ビュー用）
+DUPLICATE_REPORT_CACHE_KEY = 'tool_duplicate_report'
+
+
+def build_duplicate_report(threshold=DEFAULT_THRESHOLD, workers=1):
+    """全ツールから重複候補レポートを作成（管理画面用にキャッシュへ保存）"""
+    from django.core.cache import cache
+    from django.utils import timezone
+    from .models import Tool
+
+    rows = list(Tool.objects.values_list('id', 'normalized_name', 'external_url', 'short_description'))
+    report = find_duplicate_clusters(rows, threshold=threshold, workers=workers)
+    report.update({
+        'tool_count': len(rows),
+        'threshold': threshold,
+        'generated_at': timezone.now().isoformat(),
+    })
+    cache.set(DUPLICATE_REPORT_CACHE_KEY, report, timeout=None)
+    return report
+
+
+def merge_tools(primary, duplicates):
+    """
+    重複ツールを統合ツールにまとめて削除
+
+    - タグ・関連ブログ記事・イベントログを統合ツールへ付け替え
+    - 日別集計（ToolDailyStats）は日付ごとに統合ツールの行へ合算
+      （EventLog削除済みの日の集計も週間スコア・再計算に残す）
+    - 順位履歴（ToolRankSnapshot）は統合ツールにない集計時刻の分のみ付け替え（同時刻は最上位の行）
+    - 統計（ToolStats）は削除（次回の週間統計更新で再集計）
+    - 削除したツールのslugを統合ツールの metadata['merged_slugs'] に記録（リダイレクト用）
+
+    Returns:
+        int: 削除したツール数
+    """
+    from django.db import transaction
+    from django.db.models import Sum
+    from blog.models import BlogPage
+    from .models import Tool
+    from .models_stats import EventLog, ToolDailyStats, ToolRankSnapshot, ToolStats
+    from .scoring import ROLLUP_FIELDS
+
+    duplicates = [tool for tool in duplicates if tool.pk != primary.pk]
+    if not duplicates:
+        return 0
+    duplicate_ids = [tool.pk for tool in duplicates]
+
+    with transaction.atomic():
+        tags = {tag for tool in duplicates for tag in tool.tags.all()}
+        if tags:
+            primary.tags.add(*tags)
+
+        RelatedTools = BlogPage.related_tools.through
+        linked_pages = set(
+            RelatedTools.objects.filter(tool_id__in=duplicate_ids).values_list('blogpage_id', flat=True)
+        )
+        already_linked = set(
+            RelatedTools.objects.filter(tool=primary).values_list('blogpage_id', flat=True)
+        )
+        RelatedTools.objects.bulk_create([
+            RelatedTools(blogpage_id=page_id, tool=primary)
+            for page_id in linked_pages - already_linked
+        ])
+
+        EventLog.objects.filter(tool_id__in=duplicate_ids).update(tool=primary)
+        ToolStats.objects.filter(tool_id__in=duplicate_ids).delete()
+
+        # 重複ツールの行はツール削除時にCASCADEで削除される
+        primary_daily = {row.date: row for row in ToolDailyStats.objects.filter(tool=primary)}
+        updated_daily, new_daily = [], []
+        for row in ToolDailyStats.objects.filter(tool_id__in=duplicate_ids).values('date').annotate(
+            **{name: Sum(name) for name in ROLLUP_FIELDS}
+        ).order_by():
+            date = row.pop('date')
+            if date in primary_daily:
+                daily = primary_daily[date]
+                for name, value in row.items():
+                    setattr(daily, name, getattr(daily, name) + value)
+                updated_daily.append(daily)
+            else:
+                new_daily.append(ToolDailyStats(tool=primary, date=date, **row))
+        ToolDailyStats.objects.bulk_update(updated_daily, ROLLUP_FIELDS, batch_size=1000)
+        ToolDailyStats.objects.bulk_create(new_daily, batch_size=1000)
+
+        captured = set(ToolRankSnapshot.objects.filter(tool=primary).values_list('captured_at', flat=True))
+        moved_ids = []
+        for snapshot_id, captured_at in ToolRankSnapshot.objects.filter(
+            tool_id__in=duplicate_ids
+        ).order_by('captured_at', 'rank').values_list('id', 'captured_at'):
+            if captured_at not in captured:
+                captured.add(captured_at)
+                moved_ids.append(snapshot_id)
+        ToolRankSnapshot.objects.filter(id__in=moved_ids).update(tool=primary)
+
+        merged_slugs = primary.metadata.get('merged_slugs', [])
+        primary.metadata['merged_slugs'] = merged_slugs + [
+            tool.slug for tool in duplicates if tool.slug not in merged_slugs
+        ]
+        primary.save()
+
+        Tool.objects.filter(pk__in=duplicate_ids).delete()
+
+    return len(duplicate_ids)
@@ -0,0 +1,187 @@
+"""
+ツール検索のファセット集計
+
+ToolFilterで絞り込んだ結果セットに対し、platform / tool_type / price_type /
+ribbons / tags ごとの件数を1回のSQL（UNION ALL）で集計する。
+結果はフィルタ条件を正規化したキーでキャッシュし、ツール・タグ変更時は
+カタログのバージョンキーの更新でまとめて無効化する
+（バージョンはビットマップインデックスの再構築判定にも使用）。
+"""
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Tool
+
+
+# キャッシュキー
+FACETS_CACHE_PREFIX = 'tool_facets'
+CATALOGUE_VERSION_KEY = 'tool_catalogue:version'
+
+# ファセット対象のクエリパラメータ（ToolFilterのフィルタ + 検索）
+# 値の順序が結果に影響しないカンマ区切りパラメータ
+CSV_PARAMS = ('platform', 'tool_type', 'tags', 'tags_any', 'ribbons')
+SINGLE_PARAMS = ('price_type', 'category', 'search')
+
+# 選択肢のあるファセット（0件の選択肢も返す）
+CHOICE_FACETS = {
+    'platform': Tool.PLATFORM_CHOICES,
+    'tool_type': Tool.TOOL_TYPE_CHOICES,
+    'price_type': Tool.PRICE_TYPE_CHOICES,
+}
+
+FACETS_SQL = """
+WITH filtered AS ({filtered_sql})
+SELECT 'count', NULL, COUNT(*) FROM filtered
+UNION ALL
+SELECT 'platform', platform, COUNT(*) FROM filtered GROUP BY platform
+UNION ALL
+SELECT 'tool_type', tool_type, COUNT(*) FROM filtered GROUP BY tool_type
+UNION ALL
+SELECT 'price_type', price_type, COUNT(*) FROM filtered GROUP BY price_type
+UNION ALL
+SELECT 'ribbons', ribbon, COUNT(*) FROM filtered, unnest(filtered.effective_ribbons) AS ribbon GROUP BY ribbon
+UNION ALL
+SELECT 'tags', tag_slug, COUNT(*) FROM filtered, unnest(filtered.tag_slugs) AS tag_slug GROUP BY tag_slug
+"""
+
+
+def normalize_facet_params(query_params):
+    """
+    ファセット対象のパラメータを正規化
+
+    - カンマ区切りは空要素除去・重複除去・ソート
+    - 未指定・空文字は除外
+
+    Returns:
+        dict: パラメータ名 → 正規化済みの値
+    """
+    normalized = {}
+    for name in CSV_PARAMS:
+        value = query_params.get(name, '')
+        if value:
+            normalized[name] = ','.join(sorted({v.strip() for v in value.split(',') if v.strip()}))
+    for name in SINGLE_PARAMS:
+        value = query_params.get(name, '').strip()
+        if value:
+            normalized[name] = value
+    return normalized
+
+
+def new_cache_version():
+    """
+    バージョンキーの初期値（ナノ秒単位の現在時刻）
+
+    キーがevictされて作り直されても以前の値と重ならないため、
+    古いバージョンのキャッシュ・ETag（304応答）が再び有効にならない
+    """
+    return time.time_ns()
+
+
+def get_catalogue_version():
+    """ツールカタログのバージョン（ツール・タグ・順位の変更で更新される）"""
+    return cache.get_or_set(CATALOGUE_VERSION_KEY, new_cache_version, timeout=None)
+
+
+def get_facets_cache_key(normalized_params):
+    """正規化済みパラメータからキャッシュキーを生成（バージョン付き）"""
+    version = get_catalogue_version()
+    digest = hashlib.md5(
+        json.dumps(normalized_params, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    return f'{FACETS_CACHE_PREFIX}:{version}:{digest}'
+
+
+# batch_catalogue_invalidation() の状態（スレッドごと）
+_batch = threading.local()
+
+
+def invalidate_tool_catalogue():
+    """
+    カタログ変更を通知し、ファセットキャッシュ・ビットマップインデックスを無効化
+
+    他プロセスがコミット前のデータで再構築しないよう、コミット後に更新する
+    （batch_catalogue_invalidation() 内では終了時にまとめて1回）
+    """
+    if getattr(_batch, 'depth', 0):
+        _batch.pending = True
+        return
+
+    def bump():
+        try:
+            cache.incr(CATALOGUE_VERSION_KEY)
+        except ValueError:
+            # バージョンキーが未作成（またはevict済み）
+            cache.set(CATALOGUE_VERSION_KEY, new_cache_version(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+@contextmanager
+def batch_catalogue_invalidation():
+    """
+    ブロック内の invalidate_tool_catalogue() を終了時の1回にまとめる
+
+    シグナル経由で無効化が何度も呼ばれる一括処理（タグ統合等）で使用
+    """
+    depth = getattr(_batch, 'depth', 0)
+    if not depth:
+        _batch.pending = False
+    _batch.depth = depth + 1
+    try:
+        yield
+    finally:
+        _batch.depth = depth
+        if not depth and _batch.pending:
+            _batch.pending = False
+            invalidate_tool_catalogue()
+
+
+def compute_tool_facets(queryset):
+    """
+    絞り込み済みのToolクエリセットからファセット件数を集計
+
+    Returns:
+        dict: {'count': 総件数, 'facets': {ファセット名: {値: 件数}}}
+    """
+    filtered_sql, params = queryset.order_by().values(
+        'platform', 'tool_type', 'price_type', 'effective_ribbons', 'tag_slugs'
+    ).query.sql_with_params()
+
+    facets = {
+        name: {value: 0 for value, label in choices}
+        for name, choices in CHOICE_FACETS.items()
+    }
+    facets['ribbons'] = {}
+    facets['tags'] = {}
+    total = 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(FACETS_SQL.format(filtered_sql=filtered_sql), params)
+        for facet, value, count in cursor.fetchall():
+            if facet == 'count':
+                total = count
+            else:
+                facets[facet][value] = count
+
+    # ribbons / tags は件数の多い順（同数は値の昇順）
+    for name in ('ribbons', 'tags'):
+        facets[name] = dict(sorted(facets[name].items(), key=lambda item: (-item[1], item[0])))
+
+    return {'count': total, 'facets': facets}
+
+
+def get_tool_facets(queryset, query_params):
+    """キャッシュ付きのファセット集計（TOOL_FACETS_CACHE_TIMEOUT秒）"""
+    cache_key = get_facets_cache_key(normalize_facet_params(query_params))
+    data = cache.get(cache_key)
+    if data is None:
+        data = compute_tool_facets(queryset)
+        cache.set(cache_key, data, getattr(settings, 'TOOL_FACETS_CACHE_TIMEOUT', 300))
+    return data
@@ -0,0 +1,104 @@
+"""
+説明文からの自動タグ付けコマンド
+
+使用方法:
+    python manage.py autotag_tools
+    python manage.py autotag_tools --apply
+    python manage.py autotag_tools --apply --workers=4 --chunk-size=1000
+
+説明:
+    全ツールの短い説明・詳細説明から、タグ名・表記ゆれ（TagMappingを含む）に
+    一致する語を検出し、未付与のタグを提案します（--apply で付与）。
+    - 語彙はAho-Corasickオートマトンに1回だけ変換し、説明文は1回の走査で照合
+    - 照合は複数プロセスで並列実行、付与はチャンクごとに一括挿入
+    - 既存のタグは外しません
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from tags.models import Tag
+from tools.autotag import DEFAULT_CHUNK_SIZE, autotag_tools
+from tools.models import Tool
+
+
+class Command(BaseCommand):
+    help = '説明文に含まれるタグを検出し、ツールに提案・付与します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='提案したタグを実際に付与する'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='照合のプロセス数（デフォルト: CPUコア数）'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'1チャンクのツール数（デフォルト: {DEFAULT_CHUNK_SIZE}）'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='表示するツール数（デフォルト: 50）'
+        )
+
+    def handle(self, *args, **options):
+        apply = options['apply']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('説明文からの自動タグ付け'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        if not apply:
+            self.stdout.write(self.style.WARNING('🔍 提案のみ（付与するには --apply を指定）\n'))
+
+        start = time.perf_counter()
+
+        def progress(total):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'  {total["tools"]:,}件照合 '
+                f'(タグ追加対象 {len(total["suggestions"]):,}件) '
+                f'{total["tools"] / elapsed if elapsed else 0:,.0f}件/秒'
+            )
+
+        result = autotag_tools(
+            Tool.objects.all(),
+            apply=apply,
+            workers=max(1, options['workers']),
+            chunk_size=max(1, options['chunk_size']),
+            progress=progress
+        )
+        elapsed = time.perf_counter() - start
+
+        suggestions = result['suggestions']
+        shown = sorted(suggestions)[:options['limit']]
+        tools = Tool.objects.in_bulk(shown)
+        tag_names = dict(Tag.objects.filter(
+            pk__in={tag_id for tool_id in shown for tag_id in suggestions[tool_id]}
+        ).values_list('pk', 'name'))
+
+        if shown:
+            self.stdout.write('')
+        for tool_id in shown:
+            names = ', '.join(tag_names.get(tag_id, str(tag_id)) for tag_id in suggestions[tool_id])
+            self.stdout.write(f'  {tools[tool_id].name}: {names}')
+        if len(suggestions) > len(shown):
+            self.stdout.write(f'  ... 他{len(suggestions) - len(shown)}件')
+
+        links = sum(len(tag_ids) for tag_ids in suggestions.values())
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ 完了: {result["tools"]:,}件照合 / '
+            f'{len(suggestions):,}件に{links:,}個のタグを{"付与" if apply else "提案"} ({elapsed:.1f}秒)'
+        ))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
@@ -0,0 +1,99 @@
+"""
+JSONレンダラーのベンチマークコマンド
+
+使用方法:
+    python manage.py benchmark_json_renderer
+    python manage.py benchmark_json_renderer --iterations=200
+    python manage.py benchmark_json_renderer --path=/api/tags/ --path=/api/tools/
+
+説明:
+    既存APIエンドポイントのレスポンスデータを取得し、
+    DRF標準のJSONRendererとorjsonベースのFastJSONRendererで
+    レンダリング時間を比較します（出力バイト列の一致も検証）。
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from config.renderers import FAST_JSON_ENABLED, FastJSONRenderer
+
+
+DEFAULT_PATHS = [
+    '/api/tags/',
+    '/api/ranking/weekly/',
+    '/api/tools/',
+]
+
+
+class Command(BaseCommand):
+    help = 'JSONレンダラー（標準 / orjson）のレンダリング時間を比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='計測するAPIパス（複数指定可、デフォルト: tags / ranking / tools）'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=100,
+            help='レンダリング回数（デフォルト: 100）'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        iterations = options['iterations']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('JSONレンダラー ベンチマーク'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        if not FAST_JSON_ENABLED:
+            self.stdout.write(self.style.WARNING(
+                'orjsonが未インストールのため、FastJSONRendererは標準実装にフォールバックします'
+            ))
+
+        factory = APIRequestFactory()
+        # ページネーションのURL生成でDisallowedHostにならないよう許可済みホストを使用
+        host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h), 'localhost')
+
+        for path in paths:
+            # ビューを直接呼び出し、レンダリング前のレスポンスデータを取得
+            match = resolve(path)
+            response = match.func(factory.get(path, HTTP_HOST=host), *match.args, **match.kwargs)
+            data = response.data
+
+            standard = JSONRenderer()
+            fast = FastJSONRenderer()
+
+            standard_output = standard.render(data)
+            fast_output = fast.render(data)
+            identical = standard_output == fast_output
+
+            standard_time = self._measure(standard, data, iterations)
+            fast_time = self._measure(fast, data, iterations)
+            speedup = standard_time / fast_time if fast_time else 0
+
+            self.stdout.write(f'{path} ({len(standard_output):,} bytes)')
+            self.stdout.write(f'  JSONRenderer    : {standard_time * 1000:8.3f} ms/回')
+            self.stdout.write(f'  FastJSONRenderer: {fast_time * 1000:8.3f} ms/回 (×{speedup:.1f})')
+            if identical:
+                self.stdout.write(self.style.SUCCESS('  出力一致: OK\n'))
+            else:
+                self.stdout.write(self.style.ERROR('  出力一致: NG（出力が異なります）\n'))
+
+        self.stdout.write(f'{"="*60}\n')
+
+    @staticmethod
+    def _measure(renderer, data, iterations):
+        """1回あたりの平均レンダリング時間（秒）"""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            renderer.render(data)
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,118 @@
+"""
+週間スコア計算のベンチマークコマンド
+
+使用方法:
+    python manage.py benchmark_tool_scores
+    python manage.py benchmark_tool_scores --iterations=10
+
+説明:
+    全ツールの週間スコア計算の実行時間を比較します（DBへの保存は行いません）。
+    - 従来方式: ツールごとにEventLogを集計し、ToolStats.calculate_score で計算（時間減衰なし）
+    - 一括（Python / NumPy）: 日別集計（ToolDailyStats）から全ツール分を一括計算
+    一括計算は読み込み込みの時間と、計算のみの時間を表示し、Python / NumPyの結果の一致も検証します。
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg
+from django.utils import timezone
+
+from tools.models import Tool
+from tools.models_stats import EventLog, ToolStats
+from tools.scoring import (
+    NUMPY_ENABLED,
+    WEEK_DAYS,
+    compute_tool_scores,
+    get_score_config,
+    load_rollups,
+    score_rollups,
+)
+
+
+class Command(BaseCommand):
+    help = '週間スコア計算（ツールごと / 一括Python / 一括NumPy）の実行時間を比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=5,
+            help='計測回数（デフォルト: 5）'
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        config = get_score_config()
+        today = timezone.localdate()
+        tool_count = Tool.objects.count()
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS(f'週間スコア計算 ベンチマーク（{tool_count:,}ツール）'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        if not NUMPY_ENABLED:
+            self.stdout.write(self.style.WARNING('NumPyが未インストールのため、NumPyの計測を省略します\n'))
+
+        # 従来方式は1ツールあたり5クエリのため1回のみ計測
+        legacy_time = self._measure(self._legacy_scores, 1)
+        self.stdout.write(f'従来方式（ツールごと）: {legacy_time * 1e3:10.1f} ms')
+
+        python_time = self._measure(lambda: compute_tool_scores(today, config, use_numpy=False), iterations)
+        self.stdout.write(f'一括（Python）:         {python_time * 1e3:10.1f} ms (×{self._speedup(legacy_time, python_time):.1f})')
+        if NUMPY_ENABLED:
+            numpy_time = self._measure(lambda: compute_tool_scores(today, config, use_numpy=True), iterations)
+            self.stdout.write(f'一括（NumPy）:          {numpy_time * 1e3:10.1f} ms (×{self._speedup(legacy_time, numpy_time):.1f})')
+
+        # 計算のみ（日別集計の読み込みを除く）
+        tool_ids = list(Tool.objects.order_by('id').values_list('id', flat=True))
+        window_days = max(config['window_days'], WEEK_DAYS)
+        rollups = load_rollups(today - timedelta(days=window_days - 1), today)
+        self.stdout.write(f'\n計算のみ（日別集計 {len(rollups["tool_id"]):,}行）')
+        python_time = self._measure(lambda: score_rollups(tool_ids, rollups, today, config, use_numpy=False), iterations)
+        self.stdout.write(f'  Python: {python_time * 1e3:10.2f} ms')
+        if NUMPY_ENABLED:
+            numpy_time = self._measure(lambda: score_rollups(tool_ids, rollups, today, config, use_numpy=True), iterations)
+            self.stdout.write(f'  NumPy:  {numpy_time * 1e3:10.2f} ms (×{self._speedup(python_time, numpy_time):.1f})')
+
+            python_result = score_rollups(tool_ids, rollups, today, config, use_numpy=False)
+            numpy_result = score_rollups(tool_ids, rollups, today, config, use_numpy=True)
+            if python_result == numpy_result:
+                self.stdout.write(self.style.SUCCESS('  結果一致: OK'))
+            else:
+                self.stdout.write(self.style.ERROR('  結果一致: NG（結果が異なります）'))
+
+        self.stdout.write(f'\n{"="*60}\n')
+
+    @staticmethod
+    def _legacy_scores():
+        """従来の update_weekly_stats と同じツールごとの集計・スコア計算（保存しない）"""
+        end_date = timezone.now()
+        start_date = end_date - timedelta(days=WEEK_DAYS)
+        stats_by_tool = ToolStats.objects.in_bulk()
+        scores = {}
+        for tool in Tool.objects.all():
+            events = EventLog.objects.filter(tool=tool, created_at__gte=start_date, created_at__lte=end_date)
+            stats = stats_by_tool.get(tool.pk) or ToolStats(tool=tool)
+            stats.week_views = events.filter(event_type='view').count()
+            stats.week_clicks = events.filter(event_type='click').count()
+            stats.week_shares = events.filter(event_type='share').count()
+            stats.week_avg_duration = round(events.filter(
+                event_type='duration',
+                duration_seconds__gte=10
+            ).aggregate(avg=Avg('duration_seconds'))['avg'] or 0.0, 2)
+            scores[tool.pk] = stats.calculate_score()
+        return scores
+
+    @staticmethod
+    def _speedup(before, after):
+        return before / after if after else 0
+
+    @staticmethod
+    def _measure(func, iterations):
+        """1回あたりの平均処理時間（秒）"""
+        func()  # ウォームアップ
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations
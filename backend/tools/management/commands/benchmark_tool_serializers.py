@@ -0,0 +1,99 @@
+"""
+ツール一覧シリアライザのベンチマークコマンド
+
+使用方法:
+    python manage.py benchmark_tool_serializers
+    python manage.py benchmark_tool_serializers --limit=500 --iterations=20
+
+説明:
+    ToolListSerializer / WeeklyRankingSerializer（DRF）と
+    ToolListFastSerializer / WeeklyRankingFastSerializer（values()ベース）の
+    1件あたりのシリアライズ時間（クエリ込み）を比較します（出力JSONの一致も検証）。
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from tools.models import Tool
+from tools.models_stats import ToolStats
+from tools.serializers import ToolListSerializer, ToolListFastSerializer
+from tools.serializers_stats import WeeklyRankingSerializer, WeeklyRankingFastSerializer
+
+
+class Command(BaseCommand):
+    help = 'ツール一覧・ランキングのシリアライズ時間（DRF / 高速版）を比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='対象ツール数（デフォルト: 100）'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='計測回数（デフォルト: 10）'
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        iterations = options['iterations']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('ツールシリアライザ ベンチマーク'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        tools = Tool.objects.order_by('id')[:limit]
+        rankings = ToolStats.objects.select_related('tool').filter(
+            current_rank__isnull=False,
+            current_rank__lte=50
+        ).order_by('current_rank')
+
+        self._compare(
+            'ツール一覧',
+            lambda: ToolListSerializer(tools.prefetch_related('tags').select_related('stats'), many=True).data,
+            lambda: ToolListFastSerializer().serialize_queryset(tools),
+            iterations,
+        )
+        self._compare(
+            '週間ランキング',
+            lambda: WeeklyRankingSerializer(rankings, many=True).data,
+            lambda: WeeklyRankingFastSerializer().serialize_queryset(rankings),
+            iterations,
+        )
+
+        self.stdout.write(f'{"="*60}\n')
+
+    def _compare(self, label, standard, fast, iterations):
+        """2つのシリアライズ処理の1件あたり時間を比較"""
+        renderer = JSONRenderer()
+        standard_data = standard()
+        fast_data = fast()
+        count = len(standard_data)
+
+        if count == 0:
+            self.stdout.write(self.style.WARNING(f'{label}: 対象データがありません\n'))
+            return
+
+        standard_time = self._measure(standard, iterations) / count
+        fast_time = self._measure(fast, iterations) / count
+        speedup = standard_time / fast_time if fast_time else 0
+
+        self.stdout.write(f'{label} ({count}件)')
+        self.stdout.write(f'  DRFシリアライザ: {standard_time * 1e6:9.1f} µs/件')
+        self.stdout.write(f'  高速シリアライザ: {fast_time * 1e6:9.1f} µs/件 (×{speedup:.1f})')
+        if renderer.render(standard_data) == renderer.render(fast_data):
+            self.stdout.write(self.style.SUCCESS('  出力一致: OK\n'))
+        else:
+            self.stdout.write(self.style.ERROR('  出力一致: NG（出力が異なります）\n'))
+
+    @staticmethod
+    def _measure(func, iterations):
+        """1回あたりの平均処理時間（秒）"""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,138 @@
+"""
+ツールタグ中間テーブルのベンチマークコマンド
+
+使用方法:
+    python manage.py benchmark_tool_tags
+    python manage.py benchmark_tool_tags --iterations=50
+
+説明:
+    汎用のTaggedItem（content_type + object_id）と
+    ToolTag（実FK + (tool, tag) / (tag, tool) 複合インデックス）で
+    タグ関連のクエリの実行時間を比較します（結果の一致も検証）。
+    比較用にToolTagの全行をTaggedItemへ一時的にコピーし、終了時にロールバックします。
+"""
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from tags.models import TaggedItem
+from tools.models import Tool, ToolTag
+
+
+class Command(BaseCommand):
+    help = 'ツールタグのクエリ実行時間（TaggedItem / ToolTag）を比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='計測回数（デフォルト: 20）'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='タグ名取得の対象ツール数（デフォルト: 100）'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('ツールタグ ベンチマーク'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        # 最も使われているタグ・最もタグの多いツールを計測対象にする
+        top_tag = ToolTag.objects.values('tag_id').annotate(n=Count('id')).order_by('-n').first()
+        top_tool = ToolTag.objects.values('content_object_id').annotate(n=Count('id')).order_by('-n').first()
+        if top_tag is None:
+            self.stdout.write(self.style.WARNING('タグ付きのツールがありません\n'))
+            return
+
+        tag_id = top_tag['tag_id']
+        tool_id = top_tool['content_object_id']
+        tag_ids = list(ToolTag.objects.filter(content_object_id=tool_id).values_list('tag_id', flat=True))
+        tool_ids = list(Tool.objects.order_by('id').values_list('id', flat=True)[:options['limit']])
+
+        with transaction.atomic():
+            content_type = ContentType.objects.get_for_model(Tool)
+            TaggedItem.objects.filter(content_type=content_type).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {TaggedItem._meta.db_table} (object_id, content_type_id, tag_id) '
+                    f'SELECT content_object_id, %s, tag_id FROM {ToolTag._meta.db_table}',
+                    [content_type.pk]
+                )
+                for model in (TaggedItem, ToolTag):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+            generic = TaggedItem.objects.filter(content_type=content_type)
+
+            self._compare(
+                'タグ絞り込み（タグ → ツール）',
+                lambda: set(Tool.objects.filter(
+                    id__in=generic.filter(tag_id=tag_id).values('object_id')
+                ).values_list('id', flat=True)),
+                lambda: set(Tool.objects.filter(
+                    tool_tags__tag_id=tag_id
+                ).values_list('id', flat=True)),
+                iterations,
+            )
+            self._compare(
+                '関連ツール（タグ一致数）',
+                lambda: list(generic.filter(tag_id__in=tag_ids).exclude(
+                    object_id=tool_id
+                ).values_list('object_id').annotate(n=Count('id')).order_by('-n', 'object_id')[:6]),
+                lambda: list(ToolTag.objects.filter(tag_id__in=tag_ids).exclude(
+                    content_object_id=tool_id
+                ).values_list('content_object_id').annotate(n=Count('id')).order_by('-n', 'content_object_id')[:6]),
+                iterations,
+            )
+            self._compare(
+                f'タグ名取得（ツール{len(tool_ids)}件 → タグ）',
+                lambda: sorted(generic.filter(
+                    object_id__in=tool_ids
+                ).values_list('object_id', 'tag__name')),
+                lambda: sorted(ToolTag.objects.filter(
+                    content_object_id__in=tool_ids
+                ).values_list('content_object_id', 'tag__name')),
+                iterations,
+            )
+            self._compare(
+                'タグ別ツール数',
+                lambda: dict(generic.values_list('tag_id').annotate(n=Count('id'))),
+                lambda: dict(ToolTag.objects.values_list('tag_id').annotate(n=Count('id'))),
+                iterations,
+            )
+
+            # 比較用のTaggedItem行は残さない
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{"="*60}\n')
+
+    def _compare(self, label, before, after, iterations):
+        """2つのクエリの1回あたり実行時間を比較"""
+        before_time = self._measure(before, iterations)
+        after_time = self._measure(after, iterations)
+        speedup = before_time / after_time if after_time else 0
+
+        self.stdout.write(label)
+        self.stdout.write(f'  TaggedItem: {before_time * 1e3:8.2f} ms')
+        self.stdout.write(f'  ToolTag:    {after_time * 1e3:8.2f} ms (×{speedup:.1f})')
+        if before() == after():
+            self.stdout.write(self.style.SUCCESS('  結果一致: OK\n'))
+        else:
+            self.stdout.write(self.style.ERROR('  結果一致: NG（結果が異なります）\n'))
+
+    @staticmethod
+    def _measure(func, iterations):
+        """1回あたりの平均処理時間（秒）"""
+        func()  # ウォームアップ
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations
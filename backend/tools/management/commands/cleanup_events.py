@@ -9,11 +9,14 @@
 説明:
     指定日数より古いEventLogを削除してDB容量を削減します。
     デフォルトでは30日以上前のログを削除します。
+    削除前に削除対象の日の日別集計（ToolDailyStats）を作り直し、削除履歴（EventLogCleanup）を記録します。
+    記録した日以前の日別集計は確定値となり、以降の集計で作り直されません。
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from tools.models_stats import EventLog
+from tools.models_stats import EventLog, EventLogCleanup
+from tools.scoring import refresh_daily_stats
 
 
 class Command(BaseCommand):
@@ -80,8 +83,13 @@ class Command(BaseCommand):
             # 確認メッセージ
             self.stdout.write(self.style.WARNING(f'本当に{total_count:,}件のログを削除しますか?'))
             
-            # 実際に削除
-            deleted_count, deleted_details = old_events.delete()
+            # 削除前に対象日の日別集計を確定させ、削除と削除履歴の記録を同時に行う
+            from django.db import transaction
+            oldest = old_events.order_by('created_at').values_list('created_at', flat=True).first()
+            with transaction.atomic():
+                refresh_daily_stats(timezone.localdate(oldest), timezone.localdate(cutoff_date))
+                deleted_count, deleted_details = old_events.delete()
+                EventLogCleanup.objects.create(cutoff=cutoff_date, deleted_count=deleted_count)
             
             self.stdout.write(self.style.SUCCESS(f'\n✓ {deleted_count:,}件のログを削除しました'))
             
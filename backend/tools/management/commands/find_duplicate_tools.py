@@ -0,0 +1,101 @@
+"""
+重複ツール検出コマンド
+
+使用方法:
+    python manage.py find_duplicate_tools
+    python manage.py find_duplicate_tools --threshold=0.7 --workers=4
+    python manage.py find_duplicate_tools --limit=100 --json > duplicates.json
+
+説明:
+    カタログ全体から重複候補のツールクラスタを検出し、スコア順に表示します。
+    - 名前・外部URLのホスト・説明のシングルをMinHash / LSHで候補化（総当たりしない）
+    - 署名計算は複数プロセスで並列実行
+    - 結果は管理画面「ツール → 重複候補」からクラスタ単位で統合できます
+"""
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from tools.duplicates import DEFAULT_THRESHOLD, build_duplicate_report
+from tools.models import Tool
+
+
+class Command(BaseCommand):
+    help = 'カタログ全体の重複候補ツールを検出します（MinHash / LSH）'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f'重複とみなすスコアの下限 0〜1（デフォルト: {DEFAULT_THRESHOLD}）'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='署名計算のプロセス数（デフォルト: CPUコア数）'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=50,
+            help='表示するクラスタ数（デフォルト: 50）'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='JSON形式で出力'
+        )
+    
+    def handle(self, *args, **options):
+        report = build_duplicate_report(
+            threshold=options['threshold'],
+            workers=max(1, options['workers'])
+        )
+        clusters = report['clusters'][:options['limit']]
+        
+        tool_ids = {tool_id for cluster in clusters for tool_id in cluster['tool_ids']}
+        tools = Tool.objects.in_bulk(tool_ids)
+        
+        if options['json']:
+            output = dict(report, clusters=[
+                dict(cluster, tools=[
+                    {
+                        'id': tool_id,
+                        'name': tools[tool_id].name,
+                        'slug': tools[tool_id].slug,
+                        'platform': tools[tool_id].platform,
+                        'external_url': tools[tool_id].external_url,
+                    }
+                    for tool_id in cluster['tool_ids'] if tool_id in tools
+                ])
+                for cluster in clusters
+            ])
+            self.stdout.write(json.dumps(output, ensure_ascii=False, indent=2))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('重複ツール検出'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+        
+        self.stdout.write(f'対象ツール数: {report["tool_count"]}')
+        self.stdout.write(f'比較ペア数（LSH候補）: {report["candidate_pairs"]}')
+        self.stdout.write(f'重複候補クラスタ: {len(report["clusters"])}件（閾値 {report["threshold"]}）\n')
+        
+        for rank, cluster in enumerate(clusters, start=1):
+            self.stdout.write(self.style.WARNING(
+                f'#{rank} スコア {cluster["score"]:.3f}（{len(cluster["tool_ids"])}件）'
+            ))
+            for tool_id in cluster['tool_ids']:
+                tool = tools.get(tool_id)
+                if tool:
+                    self.stdout.write(
+                        f'  - [{tool.id}] {tool.name} ({tool.platform.upper()}) {tool.external_url}'
+                    )
+            self.stdout.write('')
+        
+        self.stdout.write(f'{"="*60}')
+        self.stdout.write('管理画面「ツール → 重複候補」からクラスタを統合できます')
+        self.stdout.write(f'{"="*60}\n')
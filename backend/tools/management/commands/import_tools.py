@@ -0,0 +1,90 @@
+"""
+ツール一括インポートコマンド
+
+使用方法:
+    python manage.py import_tools tools.csv
+    python manage.py import_tools tools.csv --chunk-size=2000
+    python manage.py import_tools tools.csv --dry-run
+
+説明:
+    管理画面のエクスポート形式（UTF-8 BOM付きCSV）のファイルを
+    チャンク単位で読み込み、ツールを一括でupsertします。
+    - 既存ツールは external_url → (名前, プラットフォーム) の順で照合して更新
+    - タグはチャンクごとにまとめて正規化し、一括で関連付け
+    - チャンクごとにコミット（--dry-run の場合は全体をロールバック）
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tools.bulk_import import DEFAULT_CHUNK_SIZE, import_tools
+
+
+class Command(BaseCommand):
+    help = 'CSVファイルからツールを一括インポートします（ストリーミング + バルクupsert）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='インポートするCSVファイルのパス'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'1チャンクの行数（デフォルト: {DEFAULT_CHUNK_SIZE}）'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='実際には保存せず、結果のみ表示'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS('ツール一括インポート'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('🔍 ドライランモード（保存しません）\n'))
+
+        start = time.perf_counter()
+
+        def progress(total):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'  {total["rows"]:,}行処理 '
+                f'(新規 {total["created"]:,} / 更新 {total["updated"]:,} / エラー {len(total["errors"]):,}) '
+                f'{total["rows"] / elapsed if elapsed else 0:,.0f}行/秒'
+            )
+
+        try:
+            with open(options['file'], encoding='utf-8-sig', newline='') as f:
+                result = import_tools(
+                    f,
+                    chunk_size=max(1, options['chunk_size']),
+                    dry_run=dry_run,
+                    progress=progress
+                )
+        except OSError as e:
+            raise CommandError(f'ファイルを開けません: {e}')
+
+        elapsed = time.perf_counter() - start
+
+        if result['errors']:
+            self.stdout.write(self.style.WARNING(f'\n⚠️ エラー行: {len(result["errors"])}件'))
+            for line, message in result['errors'][:20]:
+                self.stdout.write(f'  {line}行目: {message}')
+            if len(result['errors']) > 20:
+                self.stdout.write(f'  ... 他{len(result["errors"]) - 20}件')
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ 完了: {result["rows"]:,}行 / 新規 {result["created"]:,}件 / '
+            f'更新 {result["updated"]:,}件 ({elapsed:.1f}秒)'
+        ))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('（ドライランのため保存していません）'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
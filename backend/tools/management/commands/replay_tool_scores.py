@@ -0,0 +1,78 @@
+"""
+週間スコア・順位履歴の再計算コマンド
+
+使用方法:
+    python manage.py replay_tool_scores
+    python manage.py replay_tool_scores --days=180
+    python manage.py replay_tool_scores --dry-run
+
+説明:
+    スコアの重み（TOOL_SCORE_WEIGHTS）・半減期（TOOL_SCORE_HALF_LIFE_DAYS）の変更後に、
+    日別集計（ToolDailyStats）から過去の日ごとのスコア・順位を現在の設定で再計算し、
+    期間内の順位履歴（ToolRankSnapshot）を置き換えます。
+    - EventLogが残っている日は、先に日別集計を作り直します
+    - 各日の順位履歴はその日の終わりの時刻で1回分（昨日まで）
+    - 現在のスコア・順位は次回の update_weekly_stats で新しい設定になります
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tools.scoring import NUMPY_ENABLED, get_score_config, refresh_daily_stats, replay_scores
+
+
+class Command(BaseCommand):
+    help = '日別集計から過去の週間スコア・順位を再計算し、順位履歴を置き換えます'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='再計算する日数（昨日から遡る日数、デフォルト: 90日）'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='実際に保存せず、対象件数のみ表示'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        config = get_score_config()
+        end_date = timezone.localdate() - timedelta(days=1)
+        start_date = end_date - timedelta(days=max(1, options['days']) - 1)
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS(f'週間スコア再計算（{start_date} 〜 {end_date}）'))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
+
+        weights = ', '.join(f'{name}={weight:g}' for name, weight in config['weights'].items())
+        self.stdout.write(f'重み: {weights}')
+        if config['half_life']:
+            self.stdout.write(f'時間減衰: 半減期{config["half_life"]:g}日（直近{config["window_days"]}日間）')
+        else:
+            self.stdout.write('時間減衰: なし（直近7日間の単純合計）')
+        self.stdout.write(f'計算: {"NumPy" if NUMPY_ENABLED else "Python"}\n')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('🔍 DRY RUN モード: 変更は保存されません\n'))
+        else:
+            rollup_count = refresh_daily_stats(start_date - timedelta(days=config['window_days'] - 1), end_date)
+            self.stdout.write(f'日別集計: {rollup_count}件（EventLogから作成）\n')
+
+        start = time.perf_counter()
+
+        def progress(date, count):
+            self.stdout.write(f'  {date}: {count:,}件')
+
+        total = replay_scores(start_date, end_date, config=config, dry_run=dry_run, progress=progress)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ 完了: 順位履歴 {total:,}件を{"作成予定" if dry_run else "作成"} ({elapsed:.1f}秒)'
+        ))
+        self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
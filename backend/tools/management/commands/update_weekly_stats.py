@@ -5,17 +5,23 @@
     python manage.py update_weekly_stats
     
 説明:
-    直近7日間のEventLogから週間統計を集計し、ToolStatsを更新します。
-    - 週間PV数、CTAクリック数、シェア数、平均滞在時間を計算
-    - 週間スコアを計算
-    - 順位を更新（前週順位も保存）
+    EventLogを日別集計（ToolDailyStats）にまとめ、全ツールの週間統計を一括で更新します。
+    - 週間PV数、CTAクリック数、シェア数、平均滞在時間を計算（直近7日間）
+    - 週間スコアを計算（日別集計に時間減衰を掛けて一括計算、重み・半減期は設定で変更可能）
+    - 順位を更新（前週順位は1週間前の順位履歴から）
+    - セグメント別（プラットフォーム / ツールタイプ / 組み合わせ）の順位を更新
+    - 全ツールの順位・統計を順位履歴に追記し、保持期間を過ぎた履歴を削除
+    - 実効リボン（new / popular）を再計算
+    - ランキングAPIのレスポンス（全セグメント分）を事前作成してキャッシュ
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
 from datetime import timedelta
 from tools.models import Tool
-from tools.models_stats import ToolStats, EventLog
+from tools.models_stats import ToolStats
+from tools.rankings import RANKING_SIZE, prune_rank_history, update_rankings, warm_ranking_cache
+from tools.scoring import NUMPY_ENABLED, compute_tool_scores, get_score_config, refresh_daily_stats
 
 
 class Command(BaseCommand):
@@ -26,7 +32,7 @@ class Command(BaseCommand):
             '--days',
             type=int,
             default=7,
-            help='集計対象日数（デフォルト: 7日間）'
+            help='週間統計（PV数等）の集計日数（デフォルト: 7日間）'
         )
         parser.add_argument(
             '--dry-run',
@@ -42,97 +48,96 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'週間統計更新開始（過去{days}日間）'))
         self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
         
-        # 集計期間
+        # 集計期間（日単位。今日を含む直近days日間）
         end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
+        today = timezone.localdate(end_date)
+        start_day = today - timedelta(days=days - 1)
+        config = get_score_config()
+        if not config['half_life']:
+            # 減衰なしは従来どおり集計日数の単純合計
+            config['window_days'] = days
+        window_days = max(days, config['window_days'])
         
-        self.stdout.write(f'集計期間: {start_date.strftime("%Y-%m-%d %H:%M")} 〜 {end_date.strftime("%Y-%m-%d %H:%M")}\n')
+        self.stdout.write(f'集計期間: {start_day} 〜 {today}')
+        if config['half_life']:
+            self.stdout.write(
+                f'スコア: 直近{window_days}日間の時間減衰（半減期{config["half_life"]:g}日）'
+                f'{" / NumPy" if NUMPY_ENABLED else ""}\n'
+            )
+        else:
+            self.stdout.write(f'スコア: 直近{window_days}日間の単純合計\n')
         
-        # 全ツールを取得
-        tools = Tool.objects.all()
-        self.stdout.write(f'対象ツール数: {tools.count()}\n')
+        # 日別集計（EventLog → ToolDailyStats）を更新し、全ツールのスコアを一括計算
+        # （DRY RUNでは日別集計の更新もロールバック）
+        with transaction.atomic():
+            rollup_count = refresh_daily_stats(today - timedelta(days=window_days - 1), today)
+            scores = compute_tool_scores(as_of=today, config=config, week_days=days)
+            if dry_run:
+                transaction.set_rollback(True)
         
-        updated_count = 0
+        self.stdout.write(f'日別集計: {rollup_count}件')
+        self.stdout.write(f'対象ツール数: {len(scores)}\n')
         
-        for tool in tools:
-            # 期間内のイベントを集計
-            events = EventLog.objects.filter(
-                tool=tool,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            )
-            
-            # PV数（viewイベント）
-            week_views = events.filter(event_type='view').count()
-            
-            # CTAクリック数（clickイベント）
-            week_clicks = events.filter(event_type='click').count()
-            
-            # シェア数（shareイベント）
-            week_shares = events.filter(event_type='share').count()
-            
-            # 平均滞在時間（durationイベント、10秒以上のみ）
-            duration_events = events.filter(
-                event_type='duration',
-                duration_seconds__gte=10
-            )
-            avg_duration = duration_events.aggregate(
-                avg=Avg('duration_seconds')
-            )['avg'] or 0.0
-            
-            # ToolStatsを取得または作成
-            stats, created = ToolStats.objects.get_or_create(tool=tool)
-            
-            # 前週順位を保存（順位が変わる前に）
-            if stats.current_rank is not None:
-                stats.prev_week_rank = stats.current_rank
-            
-            # 統計を更新
-            stats.week_views = week_views
-            stats.week_clicks = week_clicks
-            stats.week_shares = week_shares
-            stats.week_avg_duration = round(avg_duration, 2)
-            
-            # スコア計算
-            old_score = stats.week_score
-            stats.calculate_score()
-            
-            if not dry_run:
-                stats.save()
-            
-            updated_count += 1
-            
+        old_scores = dict(ToolStats.objects.values_list('tool_id', 'week_score'))
+        names = dict(Tool.objects.values_list('id', 'name'))
+        for tool_id, values in scores.items():
             # 進捗表示（変化があったもののみ）
-            if week_views > 0 or week_clicks > 0 or week_shares > 0 or avg_duration > 0:
+            if values['week_views'] or values['week_clicks'] or values['week_shares'] or values['week_avg_duration']:
                 self.stdout.write(
-                    f'  ✓ {tool.name}: '
-                    f'PV={week_views}, Click={week_clicks}, Share={week_shares}, '
-                    f'Duration={avg_duration:.1f}s, '
-                    f'Score={old_score:.1f}→{stats.week_score:.1f}'
+                    f'  ✓ {names.get(tool_id, tool_id)}: '
+                    f'PV={values["week_views"]}, Click={values["week_clicks"]}, Share={values["week_shares"]}, '
+                    f'Duration={values["week_avg_duration"]:.1f}s, '
+                    f'Score={old_scores.get(tool_id, 0.0):.1f}→{values["week_score"]:.1f}'
                 )
         
-        self.stdout.write(f'\n統計更新完了: {updated_count}件\n')
+        if not dry_run:
+            # ToolStatsがないツールは作成し、全ツールの統計を一括更新
+            ToolStats.objects.bulk_create(
+                [ToolStats(tool_id=tool_id) for tool_id in scores if tool_id not in old_scores],
+                ignore_conflicts=True
+            )
+            ToolStats.objects.bulk_update(
+                [
+                    ToolStats(tool_id=tool_id, last_updated=end_date, **values)
+                    for tool_id, values in scores.items()
+                ],
+                ['week_views', 'week_clicks', 'week_shares', 'week_avg_duration', 'week_score', 'last_updated'],
+                batch_size=500
+            )
+        
+        self.stdout.write(f'\n統計更新完了: {len(scores)}件\n')
         
         # 順位を計算
         self.stdout.write('順位計算中...\n')
         
-        # スコア順にソート
-        ranked_stats = ToolStats.objects.all().order_by('-week_score', 'tool__name')
+        # 全体・セグメント別（プラットフォーム / ツールタイプ / 組み合わせ）の順位を1クエリで計算
+        # （前週順位の更新・順位履歴の追記もここで行う）
+        ranks = update_rankings(dry_run=dry_run, now=end_date)
         
-        for rank, stats in enumerate(ranked_stats, start=1):
-            old_rank = stats.current_rank
-            stats.current_rank = rank
+        # TOP50のみ表示
+        for row in ranks[:RANKING_SIZE]:
+            change = ToolStats.format_rank_change(row['prev_week_rank'], row['global_rank'])
+            self.stdout.write(
+                f'  {row["global_rank"]:2d}位: {row["name"]:30s} '
+                f'(Score: {row["week_score"]:6.1f}, Change: {change})'
+            )
+        
+        # 実効リボンを再計算（popular: 新順位、new: 作成日からの経過日数）
+        if not dry_run:
+            ribbon_count = Tool.update_effective_ribbons()
+            self.stdout.write(f'\nリボン更新: {ribbon_count}件\n')
             
-            if not dry_run:
-                stats.save()
+            # 保持期間を過ぎた順位履歴を削除
+            pruned_count = prune_rank_history(now=end_date)
+            self.stdout.write(f'順位履歴: {len(ranks)}件追加 / {pruned_count}件削除\n')
             
-            # TOP50のみ表示
-            if rank <= 50:
-                change = stats.get_rank_change()
-                self.stdout.write(
-                    f'  {rank:2d}位: {stats.tool.name:30s} '
-                    f'(Score: {stats.week_score:6.1f}, Change: {change})'
-                )
+            # 順位・リボンの変更を通知（bulk_updateはシグナルを発火しないため明示的に実行）
+            from tools.facets import invalidate_tool_catalogue
+            invalidate_tool_catalogue()
+            
+            # 新しいカタログバージョンでランキングAPIのレスポンスを作成
+            segment_count = warm_ranking_cache()
+            self.stdout.write(f'ランキングキャッシュ作成: {segment_count}セグメント\n')
         
         self.stdout.write(f'\n{"="*60}')
         if dry_run:
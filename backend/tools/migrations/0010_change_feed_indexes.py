@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0009_remove_toolcategory'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['updated_at'], name='idx_tool_updated_at'),
+        ),
+        migrations.AlterField(
+            model_name='toolstats',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='最終更新日時'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:00
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_effective_ribbons(apps, schema_editor):
+    """既存ツールのeffective_ribbonsを計算（Tool.update_effective_ribbonsと同じ規則）"""
+    Tool = apps.get_model('tools', 'Tool')
+    now = timezone.now()
+    
+    tools = []
+    rows = Tool.objects.values_list('id', 'ribbons', 'created_at', 'stats__current_rank')
+    for tool_id, ribbons, created_at, current_rank in rows.iterator():
+        effective_ribbons = set(ribbons or [])
+        if created_at and (now - created_at).days <= 14:
+            effective_ribbons.add('new')
+        if current_rank and current_rank <= 10:
+            effective_ribbons.add('popular')
+        tools.append(Tool(id=tool_id, effective_ribbons=sorted(effective_ribbons)))
+    
+    Tool.objects.bulk_update(tools, ['effective_ribbons'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0010_change_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='effective_ribbons',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=20), blank=True, default=list, editable=False, help_text='手動リボン + 自動リボン（new / popular）。自動更新されます', size=None, verbose_name='実効リボン'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['effective_ribbons'], name='idx_tool_effective_ribbons'),
+        ),
+        migrations.RunPython(populate_effective_ribbons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:00
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def populate_tag_slugs(apps, schema_editor):
+    """既存ツールのtag_slugsをTaggedItemから作成"""
+    Tool = apps.get_model('tools', 'Tool')
+    TaggedItem = apps.get_model('tags', 'TaggedItem')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    
+    try:
+        content_type = ContentType.objects.get(app_label='tools', model='tool')
+    except ContentType.DoesNotExist:
+        # 新規DB（ツール未登録）
+        return
+    
+    slugs_map = {}
+    rows = TaggedItem.objects.filter(content_type=content_type).order_by(
+        'tag__slug'
+    ).values_list('object_id', 'tag__slug')
+    for object_id, slug in rows.iterator():
+        slugs_map.setdefault(object_id, []).append(slug)
+    
+    # GenericForeignKeyのため、削除済みツールを指す行は除外
+    existing_ids = set(Tool.objects.filter(id__in=slugs_map).values_list('id', flat=True))
+    tools = [
+        Tool(id=tool_id, tag_slugs=slugs)
+        for tool_id, slugs in slugs_map.items()
+        if tool_id in existing_ids
+    ]
+    Tool.objects.bulk_update(tools, ['tag_slugs'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('tags', '0008_tag_timestamps'),
+        ('tools', '0011_tool_effective_ribbons'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='tag_slugs',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, editable=False, help_text='タグフィルタ用（自動更新されます）', size=None, verbose_name='タグスラッグ'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_slugs'], name='idx_tool_tag_slugs'),
+        ),
+        migrations.RunPython(populate_tag_slugs, migrations.RunPython.noop),
+    ]
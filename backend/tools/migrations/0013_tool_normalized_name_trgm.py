@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0012_tool_tag_slugs'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='tool',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['normalized_name'], name='idx_tool_normalized_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:00
+# Manually modified for through model migration
+
+import django.db.models.deletion
+import taggit.managers
+from django.db import migrations, models
+
+
+def copy_tagged_items(apps, schema_editor):
+    """ツールのTaggedItem行をToolTagへ移し、TaggedItemから削除"""
+    Tool = apps.get_model('tools', 'Tool')
+    ToolTag = apps.get_model('tools', 'ToolTag')
+    TaggedItem = apps.get_model('tags', 'TaggedItem')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    try:
+        content_type = ContentType.objects.get(app_label='tools', model='tool')
+    except ContentType.DoesNotExist:
+        # 新規DB（ツール未登録）
+        return
+
+    # 件数によらず1回のINSERT ... SELECTでコピー
+    # （GenericForeignKeyのため、削除済みツールを指す行・重複行は除外）
+    schema_editor.execute(
+        f'INSERT INTO {ToolTag._meta.db_table} (content_object_id, tag_id) '
+        f'SELECT DISTINCT ti.object_id, ti.tag_id FROM {TaggedItem._meta.db_table} ti '
+        f'JOIN {Tool._meta.db_table} t ON t.id = ti.object_id '
+        f'WHERE ti.content_type_id = %s',
+        params=[content_type.pk]
+    )
+    TaggedItem.objects.filter(content_type=content_type).delete()
+
+
+def restore_tagged_items(apps, schema_editor):
+    """ToolTag行をTaggedItemへ戻す"""
+    ToolTag = apps.get_model('tools', 'ToolTag')
+    TaggedItem = apps.get_model('tags', 'TaggedItem')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    if not ToolTag.objects.exists():
+        return
+    content_type, _ = ContentType.objects.get_or_create(app_label='tools', model='tool')
+    schema_editor.execute(
+        f'INSERT INTO {TaggedItem._meta.db_table} (object_id, content_type_id, tag_id) '
+        f'SELECT content_object_id, %s, tag_id FROM {ToolTag._meta.db_table}',
+        params=[content_type.pk]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('tags', '0008_tag_timestamps'),
+        ('tools', '0013_tool_normalized_name_trgm'),
+    ]
+
+    operations = [
+        # Step 1: ToolTag中間モデルを作成
+        migrations.CreateModel(
+            name='ToolTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_object', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tool_tags', to='tools.tool')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tool_tags', to='tags.tag')),
+            ],
+            options={
+                'verbose_name': 'ツールタグ',
+                'verbose_name_plural': 'ツールタグ',
+                'indexes': [models.Index(fields=['tag', 'content_object'], name='idx_tooltag_tag_tool')],
+                'constraints': [models.UniqueConstraint(fields=('content_object', 'tag'), name='unique_tool_tag')],
+            },
+        ),
+        # Step 2: 既存の関連をTaggedItemからコピー
+        migrations.RunPython(copy_tagged_items, restore_tagged_items),
+        # Step 3: tagsフィールドの中間テーブルを切り替え（DB変更なし）
+        migrations.AlterField(
+            model_name='tool',
+            name='tags',
+            field=taggit.managers.TaggableManager(blank=True, help_text='関連するタグ', through='tools.ToolTag', to='tags.Tag', verbose_name='タグ'),
+        ),
+    ]
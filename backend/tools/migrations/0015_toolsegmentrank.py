@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0014_tooltag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolSegmentRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(blank=True, max_length=20, verbose_name='プラットフォーム')),
+                ('tool_type', models.CharField(blank=True, max_length=20, verbose_name='ツールタイプ')),
+                ('rank', models.PositiveIntegerField(verbose_name='順位')),
+                ('prev_rank', models.PositiveIntegerField(blank=True, help_text='前回の集計時のセグメント内順位（順位変動計算用）', null=True, verbose_name='前回順位')),
+                ('tool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segment_ranks', to='tools.tool', verbose_name='ツール')),
+            ],
+            options={
+                'verbose_name': 'セグメント別順位',
+                'verbose_name_plural': 'セグメント別順位',
+                'constraints': [models.UniqueConstraint(fields=('platform', 'tool_type', 'rank'), name='unique_segment_rank')],
+            },
+        ),
+    ]
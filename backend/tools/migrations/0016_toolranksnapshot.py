@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:00
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0015_toolsegmentrank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolRankSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField(verbose_name='集計日時')),
+                ('rank', models.PositiveIntegerField(verbose_name='順位')),
+                ('platform_rank', models.PositiveIntegerField(verbose_name='プラットフォーム別順位')),
+                ('type_rank', models.PositiveIntegerField(verbose_name='ツールタイプ別順位')),
+                ('segment_rank', models.PositiveIntegerField(verbose_name='セグメント別順位')),
+                ('score', models.FloatField(verbose_name='週間スコア')),
+                ('views', models.PositiveIntegerField(verbose_name='週間PV数')),
+                ('clicks', models.PositiveIntegerField(verbose_name='週間CTAクリック数')),
+                ('shares', models.PositiveIntegerField(verbose_name='週間シェア数')),
+                ('avg_duration', models.FloatField(verbose_name='週間平均滞在時間')),
+                ('tool', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rank_snapshots', to='tools.tool', verbose_name='ツール')),
+            ],
+            options={
+                'verbose_name': '順位履歴',
+                'verbose_name_plural': '順位履歴',
+                'indexes': [models.Index(fields=['tool', 'captured_at'], name='idx_rank_snapshot_tool'), django.contrib.postgres.indexes.BrinIndex(fields=['captured_at'], name='brin_rank_snapshot_time')],
+            },
+        ),
+        migrations.AlterField(
+            model_name='toolsegmentrank',
+            name='prev_rank',
+            field=models.PositiveIntegerField(blank=True, help_text='1週間前（履歴がなければ前回の集計時）のセグメント内順位（順位変動計算用）', null=True, verbose_name='前回順位'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0016_toolranksnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='日付')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='PV数')),
+                ('clicks', models.PositiveIntegerField(default=0, verbose_name='CTAクリック数')),
+                ('shares', models.PositiveIntegerField(default=0, verbose_name='シェア数')),
+                ('duration_total', models.PositiveIntegerField(default=0, help_text='10秒以上の滞在時間イベントの合計', verbose_name='滞在時間合計（秒）')),
+                ('duration_count', models.PositiveIntegerField(default=0, help_text='10秒以上の滞在時間イベントの件数', verbose_name='滞在時間イベント数')),
+                ('tool', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='tools.tool', verbose_name='ツール')),
+            ],
+            options={
+                'verbose_name': '日別統計',
+                'verbose_name_plural': '日別統計',
+                'indexes': [models.Index(fields=['date'], name='idx_daily_stats_date')],
+                'constraints': [models.UniqueConstraint(fields=('tool', 'date'), name='unique_tool_daily_stats')],
+            },
+        ),
+    ]
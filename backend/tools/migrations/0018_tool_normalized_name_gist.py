@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0017_tooldailystats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tool',
+            name='idx_tool_normalized_name_trgm',
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['normalized_name'], name='idx_tool_normalized_name_gist', opclasses=['gist_trgm_ops']),
+        ),
+    ]
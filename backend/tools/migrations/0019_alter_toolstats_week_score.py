@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0018_tool_normalized_name_gist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='toolstats',
+            name='week_score',
+            field=models.FloatField(db_index=True, default=0.0, help_text='日別集計の重み付き合計（重み: TOOL_SCORE_WEIGHTS）。直近TOOL_SCORE_WINDOW_DAYS日を半減期TOOL_SCORE_HALF_LIFE_DAYSで時間減衰（tools.scoring）', verbose_name='週間スコア'),
+        ),
+    ]
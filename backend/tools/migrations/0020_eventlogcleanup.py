@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 22:00
+
+from django.db import migrations, models
+
+
+def record_existing_cleanup(apps, schema_editor):
+    """
+    既存のEventLogは削除済みの可能性があるため、最も古いログの日時までを削除済みとして記録
+    （その日の日別集計は作り直さず、既存の値を維持する）
+    """
+    EventLog = apps.get_model('tools', 'EventLog')
+    EventLogCleanup = apps.get_model('tools', 'EventLogCleanup')
+
+    oldest = EventLog.objects.order_by('created_at').values_list('created_at', flat=True).first()
+    if oldest is not None:
+        EventLogCleanup.objects.create(cutoff=oldest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0019_alter_toolstats_week_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLogCleanup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cutoff', models.DateTimeField(help_text='この日時より前のEventLogを削除', verbose_name='削除基準日時')),
+                ('deleted_count', models.PositiveIntegerField(default=0, verbose_name='削除件数')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='実行日時')),
+            ],
+            options={
+                'verbose_name': 'イベントログ削除履歴',
+                'verbose_name_plural': 'イベントログ削除履歴',
+                'get_latest_by': 'cutoff',
+            },
+        ),
+        migrations.RunPython(record_existing_cleanup, migrations.RunPython.noop),
+    ]
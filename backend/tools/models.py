@@ -1,10 +1,51 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
 from django.utils.text import slugify
 import unicodedata
 import re
 from taggit.managers import TaggableManager
-from tags.models import TaggedItem
+from taggit.models import ItemBase
+
+
+# ========================================
+# ツールタグ（through model）
+# ========================================
+class ToolTag(ItemBase):
+    """
+    ToolとTagの中間テーブル
+    
+    汎用のTaggedItem（content_type + object_id）ではなく実FKで関連付け、
+    タグ絞り込み・関連ツール・タグ別件数のクエリをインデックスだけで処理する。
+    - (tool, tag) の複合ユニーク: ツール → タグの参照と重複防止
+    - (tag, tool) の複合インデックス: タグ → ツールの逆引き
+    （単一カラムのFKインデックスは複合インデックスの先頭カラムで代替できるため作成しない）
+    """
+    tag = models.ForeignKey(
+        'tags.Tag',
+        related_name='tool_tags',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    content_object = models.ForeignKey(
+        'tools.Tool',
+        related_name='tool_tags',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    
+    class Meta:
+        verbose_name = "ツールタグ"
+        verbose_name_plural = "ツールタグ"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_object', 'tag'],
+                name='unique_tool_tag'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'content_object'], name='idx_tooltag_tag_tool'),
+        ]
 
 
 # ========================================
@@ -88,6 +129,16 @@ class Tool(models.Model):
         default=list,
         help_text="例: new, featured, popular"
     )
+    # 実効リボン（手動リボン + 自動リボン）
+    # 一覧表示・リボンフィルタ用。保存時と週間統計更新時に再計算される
+    effective_ribbons = ArrayField(
+        models.CharField(max_length=20),
+        verbose_name="実効リボン",
+        blank=True,
+        default=list,
+        editable=False,
+        help_text="手動リボン + 自動リボン（new / popular）。自動更新されます"
+    )
     
     # 画像とURL
     image_url = models.URLField(
@@ -144,11 +195,21 @@ class Tool(models.Model):
     
     # タグ
     tags = TaggableManager(
-        through=TaggedItem,
+        through=ToolTag,
         verbose_name="タグ",
         help_text="関連するタグ",
         blank=True
     )
+    # タグスラッグ（tagsの非正規化コピー）
+    # タグフィルタを1条件（GINインデックス @> / &&）で処理するため、タグ変更時に同期される
+    tag_slugs = ArrayField(
+        models.CharField(max_length=100),
+        verbose_name="タグスラッグ",
+        blank=True,
+        default=list,
+        editable=False,
+        help_text="タグフィルタ用（自動更新されます）"
+    )
     
     # タイムスタンプ
     created_at = models.DateTimeField("作成日時", auto_now_add=True)
@@ -163,6 +224,11 @@ class Tool(models.Model):
             models.Index(fields=['price_type']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['normalized_name']),
+            # 類似ツール検出用（pg_trgm、トライグラム距離順の取得にはGiSTが必要）
+            GistIndex(fields=['normalized_name'], name='idx_tool_normalized_name_gist', opclasses=['gist_trgm_ops']),
+            models.Index(fields=['updated_at'], name='idx_tool_updated_at'),
+            GinIndex(fields=['effective_ribbons'], name='idx_tool_effective_ribbons'),
+            GinIndex(fields=['tag_slugs'], name='idx_tool_tag_slugs'),
         ]
         constraints = [
             # 同じ名前 + 同じプラットフォームの組み合わせを禁止
@@ -183,6 +249,9 @@ class Tool(models.Model):
         # 名前の正規化（重複チェック用）
         self.normalized_name = self._normalize_name(self.name)
         
+        # 実効リボンの再計算
+        self.refresh_effective_ribbons()
+        
         super().save(*args, **kwargs)
     
     @staticmethod
@@ -211,43 +280,116 @@ class Tool(models.Model):
         
         return normalized
 
-    @property
-    def computed_ribbons(self):
+    @staticmethod
+    def compute_ribbons(created_at, current_rank, now=None):
         """
         自動計算されるリボン
         - new: 作成から14日以内
         - popular: 週間ランキングトップ10
         """
         from django.utils import timezone
-        from datetime import timedelta
         
         computed = []
         
         # "new" チェック: 14日以内に作成
-        if self.created_at:
-            days_since_creation = (timezone.now() - self.created_at).days
+        if created_at:
+            days_since_creation = ((now or timezone.now()) - created_at).days
             if days_since_creation <= 14:
                 computed.append('new')
         
         # "popular" チェック: 週間ランキングトップ10
+        if current_rank and current_rank <= 10:
+            computed.append('popular')
+        
+        return computed
+    
+    @staticmethod
+    def merge_ribbons(manual, computed):
+        """手動リボン + 自動リボンを結合（重複を除き、名前順）"""
+        return sorted(set((manual or []) + computed))
+    
+    def _get_current_rank(self):
+        """週間ランキング順位（statsがない場合はNone）"""
         try:
-            if hasattr(self, 'stats') and self.stats.current_rank:
-                if self.stats.current_rank <= 10:
-                    computed.append('popular')
+            if hasattr(self, 'stats'):
+                return self.stats.current_rank
         except Exception:
             pass
-        
-        return computed
+        return None
+    
+    @property
+    def computed_ribbons(self):
+        """自動計算されるリボン（compute_ribbons参照）"""
+        return self.compute_ribbons(self.created_at, self._get_current_rank())
     
     @property
     def all_ribbons(self):
         """
         手動リボン + 自動リボンを結合（重複を除く）
         """
-        manual = self.ribbons or []
-        computed = self.computed_ribbons
-        # 重複を除いて結合
-        all_ribbons = list(set(manual + computed))
-        return all_ribbons
+        return self.merge_ribbons(self.ribbons, self.computed_ribbons)
+    
+    def refresh_effective_ribbons(self):
+        """effective_ribbonsを再計算（保存はしない）"""
+        from django.utils import timezone
+        
+        # 新規作成時はcreated_atが未設定のため現在時刻で判定
+        self.effective_ribbons = self.merge_ribbons(
+            self.ribbons,
+            self.compute_ribbons(self.created_at or timezone.now(), self._get_current_rank())
+        )
+    
+    @classmethod
+    def update_effective_ribbons(cls, queryset=None, batch_size=500):
+        """
+        effective_ribbonsを一括再計算（週間統計更新後に実行）
+        
+        変化のあったツールのみbulk_updateし、更新件数を返す
+        """
+        from django.utils import timezone
+        
+        now = timezone.now()
+        if queryset is None:
+            queryset = cls.objects.all()
+        
+        rows = queryset.values_list(
+            'id', 'ribbons', 'created_at', 'stats__current_rank', 'effective_ribbons'
+        )
+        changed = []
+        for tool_id, ribbons, created_at, current_rank, effective_ribbons in rows.iterator(chunk_size=batch_size):
+            ribbons = cls.merge_ribbons(ribbons, cls.compute_ribbons(created_at, current_rank, now))
+            if ribbons != effective_ribbons:
+                changed.append(cls(id=tool_id, effective_ribbons=ribbons, updated_at=now))
+        
+        # bulk_updateではauto_nowが更新されないため、updated_atも明示的に保存（変更フィード・エクスポート用）
+        cls.objects.bulk_update(changed, ['effective_ribbons', 'updated_at'], batch_size=batch_size)
+        return len(changed)
+    
+    @classmethod
+    def sync_tag_slugs(cls, tool_ids, batch_size=500):
+        """
+        指定ツールのtag_slugsをToolTagから再計算して保存
+        
+        Returns:
+            dict: ツールID → タグスラッグリスト（スラッグ順）
+        """
+        from django.utils import timezone
+        
+        tool_ids = list(tool_ids)
+        slugs_map = {tool_id: [] for tool_id in tool_ids}
+        rows = ToolTag.objects.filter(
+            content_object_id__in=tool_ids
+        ).order_by('tag__slug').values_list('content_object_id', 'tag__slug')
+        for tool_id, slug in rows:
+            slugs_map[tool_id].append(slug)
+        
+        # bulk_updateではauto_nowが更新されないため、updated_atも明示的に保存（変更フィード・エクスポート用）
+        now = timezone.now()
+        cls.objects.bulk_update(
+            [cls(id=tool_id, tag_slugs=slugs, updated_at=now) for tool_id, slugs in slugs_map.items()],
+            ['tag_slugs', 'updated_at'],
+            batch_size=batch_size
+        )
+        return slugs_map
 
-from .models_stats import ToolStats, EventLog
+from .models_stats import ToolStats, ToolSegmentRank, ToolRankSnapshot, ToolDailyStats, EventLogCleanup, EventLog
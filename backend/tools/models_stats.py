@@ -1,6 +1,7 @@
 """
 週間ランキング用のモデル
 """
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from .models import Tool
 
@@ -42,7 +43,7 @@ class ToolStats(models.Model):
     week_score = models.FloatField(
         '週間スコア',
         default=0.0,
-        help_text='WeeklyScore = (CTAクリック × 5) + (シェア × 2) + (滞在時間 ÷ 10 × 0.5) + (PV × 0.3)',
+        help_text='日別集計の重み付き合計（重み: TOOL_SCORE_WEIGHTS）。直近TOOL_SCORE_WINDOW_DAYS日を半減期TOOL_SCORE_HALF_LIFE_DAYSで時間減衰（tools.scoring）',
         db_index=True
     )
     
@@ -63,7 +64,8 @@ class ToolStats(models.Model):
     # メタデータ
     last_updated = models.DateTimeField(
         '最終更新日時',
-        auto_now=True
+        auto_now=True,
+        db_index=True
     )
     
     class Meta:
@@ -79,31 +81,41 @@ class ToolStats(models.Model):
         return f'{self.tool.name} - Score: {self.week_score:.1f}'
     
     def calculate_score(self):
-        """週間スコアを計算
+        """週間スコアを計算（このツールの週間統計のみ、時間減衰なし）
         
-        重み付け根拠:
+        重みは settings.TOOL_SCORE_WEIGHTS（tools.scoring.DEFAULT_WEIGHTS が既定値）:
         - CTAクリック (×5.0): 「このツールを使いたい」最強シグナル
         - シェア (×2.0): 「他人にも勧めたい」高評価シグナル  
         - 滞在時間 (÷10 × 0.5): 「じっくり検討」エンゲージメント
         - PV (×0.3): 「興味がある」最小シグナル
+        
+        集計（update_weekly_stats）では日別集計から全ツールを一括計算する（tools.scoring）
         """
+        from .scoring import get_score_config
+        
+        weights = get_score_config()['weights']
         score = (
-            (self.week_clicks * 5.0) +
-            (self.week_shares * 2.0) +
-            ((self.week_avg_duration / 10) * 0.5) +
-            (self.week_views * 0.3)
+            (self.week_clicks * weights['clicks']) +
+            (self.week_shares * weights['shares']) +
+            (self.week_avg_duration * weights['duration']) +
+            (self.week_views * weights['views'])
         )
         self.week_score = round(score, 2)
         return self.week_score
     
     def get_rank_change(self):
         """順位変動を取得"""
-        if self.prev_week_rank is None:
+        return self.format_rank_change(self.prev_week_rank, self.current_rank)
+    
+    @staticmethod
+    def format_rank_change(prev_week_rank, current_rank):
+        """前週順位と現在順位から順位変動の表示文字列を生成"""
+        if prev_week_rank is None:
             return 'NEW'
-        if self.current_rank is None:
+        if current_rank is None:
             return '---'
         
-        change = self.prev_week_rank - self.current_rank
+        change = prev_week_rank - current_rank
         if change > 0:
             return f'↑{change}'
         elif change < 0:
@@ -112,6 +124,155 @@ class ToolStats(models.Model):
             return '→'
 
 
+class ToolSegmentRank(models.Model):
+    """
+    セグメント別の週間順位（update_weekly_statsで全件再作成）
+    
+    セグメント = プラットフォーム × ツールタイプ（空文字は「すべて」）
+    - ('', ''): 全体 / ('mt5', ''): プラットフォーム別 / ('', 'EA'): ツールタイプ別 / ('mt5', 'EA'): 組み合わせ
+    各ツールは4セグメントに1行ずつ。(platform, tool_type, rank) の一意インデックスにより、
+    セグメントの上位N件は1回のインデックス範囲読み込みで取得できる。
+    """
+    
+    platform = models.CharField('プラットフォーム', max_length=20, blank=True)
+    tool_type = models.CharField('ツールタイプ', max_length=20, blank=True)
+    rank = models.PositiveIntegerField('順位')
+    prev_rank = models.PositiveIntegerField(
+        '前回順位',
+        null=True,
+        blank=True,
+        help_text='1週間前（履歴がなければ前回の集計時）のセグメント内順位（順位変動計算用）'
+    )
+    tool = models.ForeignKey(
+        Tool,
+        on_delete=models.CASCADE,
+        related_name='segment_ranks',
+        verbose_name='ツール'
+    )
+    
+    class Meta:
+        verbose_name = 'セグメント別順位'
+        verbose_name_plural = 'セグメント別順位'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['platform', 'tool_type', 'rank'],
+                name='unique_segment_rank'
+            )
+        ]
+    
+    def __str__(self):
+        return f'{self.platform or "*"}/{self.tool_type or "*"} {self.rank}位: {self.tool_id}'
+
+
+class ToolRankSnapshot(models.Model):
+    """
+    週間順位の履歴（update_weekly_statsの実行ごとに全ツール1行ずつ追記）
+
+    - 追記のみ（更新しない）。保持期間（RANK_HISTORY_RETENTION_DAYS）を過ぎた行は集計時に削除
+    - 順位変動（prev_week_rank）は1週間前のスナップショットから求める
+    - (tool, captured_at) の複合インデックスで、ツールごとの推移を1回の範囲読み込みで取得
+    - captured_at は追記順に増加するため、期間削除用にはBRINインデックス（数ページ程度）を使う
+    """
+
+    tool = models.ForeignKey(
+        Tool,
+        on_delete=models.CASCADE,
+        related_name='rank_snapshots',
+        db_index=False,
+        verbose_name='ツール'
+    )
+    captured_at = models.DateTimeField('集計日時')
+
+    # 順位（全体 / プラットフォーム別 / ツールタイプ別 / 組み合わせ）
+    rank = models.PositiveIntegerField('順位')
+    platform_rank = models.PositiveIntegerField('プラットフォーム別順位')
+    type_rank = models.PositiveIntegerField('ツールタイプ別順位')
+    segment_rank = models.PositiveIntegerField('セグメント別順位')
+
+    # 集計時の週間統計
+    score = models.FloatField('週間スコア')
+    views = models.PositiveIntegerField('週間PV数')
+    clicks = models.PositiveIntegerField('週間CTAクリック数')
+    shares = models.PositiveIntegerField('週間シェア数')
+    avg_duration = models.FloatField('週間平均滞在時間')
+
+    class Meta:
+        verbose_name = '順位履歴'
+        verbose_name_plural = '順位履歴'
+        indexes = [
+            models.Index(fields=['tool', 'captured_at'], name='idx_rank_snapshot_tool'),
+            BrinIndex(fields=['captured_at'], name='brin_rank_snapshot_time'),
+        ]
+
+    def __str__(self):
+        return f'{self.tool_id} {self.captured_at:%Y-%m-%d %H:%M} {self.rank}位'
+
+
+class ToolDailyStats(models.Model):
+    """
+    ツールの日別イベント集計（update_weekly_statsでEventLogから作成）
+
+    週間スコアの計算（tools.scoring）はEventLogではなくこの集計から行う。
+    EventLogの削除（cleanup_events）後も残るため、重みの変更時に過去のスコアを再計算できる。
+    """
+
+    tool = models.ForeignKey(
+        Tool,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        db_index=False,
+        verbose_name='ツール'
+    )
+    date = models.DateField('日付')
+    views = models.PositiveIntegerField('PV数', default=0)
+    clicks = models.PositiveIntegerField('CTAクリック数', default=0)
+    shares = models.PositiveIntegerField('シェア数', default=0)
+    duration_total = models.PositiveIntegerField(
+        '滞在時間合計（秒）',
+        default=0,
+        help_text='10秒以上の滞在時間イベントの合計'
+    )
+    duration_count = models.PositiveIntegerField(
+        '滞在時間イベント数',
+        default=0,
+        help_text='10秒以上の滞在時間イベントの件数'
+    )
+
+    class Meta:
+        verbose_name = '日別統計'
+        verbose_name_plural = '日別統計'
+        constraints = [
+            models.UniqueConstraint(fields=['tool', 'date'], name='unique_tool_daily_stats')
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='idx_daily_stats_date'),
+        ]
+
+    def __str__(self):
+        return f'{self.tool_id} {self.date}'
+
+
+class EventLogCleanup(models.Model):
+    """
+    EventLogの削除履歴（cleanup_eventsで記録）
+
+    削除基準日時の日以前の日別集計（ToolDailyStats）は削除前に作成した確定値とし、
+    refresh_daily_stats はそれより後の日のみEventLogから作り直す。
+    """
+
+    cutoff = models.DateTimeField('削除基準日時', help_text='この日時より前のEventLogを削除')
+    deleted_count = models.PositiveIntegerField('削除件数', default=0)
+    created_at = models.DateTimeField('実行日時', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'イベントログ削除履歴'
+        verbose_name_plural = 'イベントログ削除履歴'
+        get_latest_by = 'cutoff'
+
+    def __str__(self):
+        return f'{self.cutoff:%Y-%m-%d %H:%M} より前を削除（{self.deleted_count}件）'
+
+
 class EventLog(models.Model):
     """イベントログ（PV、滞在時間、シェア、CTAクリック記録用）"""
     
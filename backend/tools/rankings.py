@@ -0,0 +1,354 @@
+"""
+週間ランキングの順位計算（全体 + セグメント別）
+
+ToolStatsの週間スコアから、全体・プラットフォーム別・ツールタイプ別・
+プラットフォーム×ツールタイプ別の順位をウィンドウ関数（ROW_NUMBER）で
+1回のクエリで計算し、ToolStats.current_rank と ToolSegmentRank に保存する。
+
+セグメント別ランキングAPIは、全体TOP50を絞り込むのではなく
+セグメント内の本当の上位N件（セグメント内の順位）を返す。
+
+集計ごとに全ツールの順位・統計を ToolRankSnapshot に追記し、
+順位変動（前週順位）は1週間前のスナップショットと比較する
+（履歴が1週間分たまるまでは前回の集計と比較）。
+
+ランキングAPIのレスポンスはセグメントごとに1クエリで作成し、カタログの
+バージョン付きでキャッシュする（集計時に全セグメント分を事前作成）。
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+# ランキングの表示件数
+RANKING_SIZE = 50
+
+# ウィンドウ関数のアノテーション名 → (セグメントのplatformを使うか, tool_typeを使うか)
+SEGMENTS = {
+    'global_rank': (False, False),
+    'platform_rank': (True, False),
+    'type_rank': (False, True),
+    'segment_rank': (True, True),
+}
+
+# 順位変動の比較対象（この日数前のスナップショット）
+RANK_CHANGE_DAYS = 7
+
+# ランキングAPIレスポンスのキャッシュキー
+RANKING_CACHE_PREFIX = 'weekly_ranking'
+
+# ウィンドウ関数のアノテーション名 → ToolRankSnapshotのフィールド名
+SNAPSHOT_RANK_FIELDS = {
+    'global_rank': 'rank',
+    'platform_rank': 'platform_rank',
+    'type_rank': 'type_rank',
+    'segment_rank': 'segment_rank',
+}
+
+
+def get_rank_history_retention_days():
+    """順位履歴の保持日数（settings.RANK_HISTORY_RETENTION_DAYS）"""
+    from django.conf import settings
+    return getattr(settings, 'RANK_HISTORY_RETENTION_DAYS', 365)
+
+
+def compute_ranks():
+    """
+    全ツール（ToolStatsあり）の全体・セグメント別順位を1クエリで計算
+
+    同点はツール名順（従来の順位計算と同じ）
+
+    Returns:
+        list: [dict(tool_id, name, platform, tool_type, week_score, week_views, week_clicks,
+                    week_shares, week_avg_duration, current_rank, prev_week_rank,
+                    global_rank, platform_rank, type_rank, segment_rank)]（全体順位順）
+                    ※ current_rank は更新前の順位
+    """
+    from .models_stats import ToolStats
+
+    order_by = [F('week_score').desc(), F('tool__name').asc(), F('tool_id').asc()]
+    partitions = {
+        'global_rank': None,
+        'platform_rank': [F('tool__platform')],
+        'type_rank': [F('tool__tool_type')],
+        'segment_rank': [F('tool__platform'), F('tool__tool_type')],
+    }
+    return list(
+        ToolStats.objects.annotate(**{
+            name: Window(RowNumber(), partition_by=partition_by, order_by=order_by)
+            for name, partition_by in partitions.items()
+        }).values(
+            'tool_id', 'week_score', 'week_views', 'week_clicks', 'week_shares', 'week_avg_duration',
+            'current_rank', 'prev_week_rank', *partitions,
+            name=F('tool__name'), platform=F('tool__platform'), tool_type=F('tool__tool_type'),
+        ).order_by('global_rank')
+    )
+
+
+def build_segment_ranks(ranks, previous=None):
+    """
+    順位計算の結果 → ToolSegmentRank（未保存）のリスト
+
+    Args:
+        previous: {(platform, tool_type, tool_id): 前回順位}
+    """
+    from .models_stats import ToolSegmentRank
+
+    previous = previous or {}
+    segment_ranks = []
+    for row in ranks:
+        for name, (by_platform, by_type) in SEGMENTS.items():
+            platform = row['platform'] if by_platform else ''
+            tool_type = row['tool_type'] if by_type else ''
+            segment_ranks.append(ToolSegmentRank(
+                platform=platform,
+                tool_type=tool_type,
+                rank=row[name],
+                prev_rank=previous.get((platform, tool_type, row['tool_id'])),
+                tool_id=row['tool_id'],
+            ))
+    return segment_ranks
+
+
+def get_snapshot_ranks(at):
+    """
+    指定日時以前で最新のスナップショットの順位（ツールごと）
+
+    指定日時の直前RANK_CHANGE_DAYS日分のみ参照する
+    （DISTINCT ON + (tool, captured_at) インデックス）
+
+    Returns:
+        dict: {tool_id: {'global_rank': 順位, 'platform_rank': ..., 'type_rank': ..., 'segment_rank': ...}}
+    """
+    from .models_stats import ToolRankSnapshot
+
+    rows = ToolRankSnapshot.objects.filter(
+        captured_at__lte=at,
+        captured_at__gt=at - timedelta(days=RANK_CHANGE_DAYS)
+    ).order_by('tool_id', '-captured_at').distinct('tool_id').values_list(
+        'tool_id', *SNAPSHOT_RANK_FIELDS.values()
+    )
+    return {tool_id: dict(zip(SNAPSHOT_RANK_FIELDS, ranks)) for tool_id, *ranks in rows}
+
+
+def apply_previous_ranks(ranks, now):
+    """
+    前週順位を設定し、セグメント別の比較対象の順位を返す
+
+    1週間前のスナップショットがあればそれと比較（スナップショットにないツールはNEW）、
+    なければ前回の集計（ToolStats.current_rank / ToolSegmentRank）と比較する。
+
+    Returns:
+        dict: {(platform, tool_type, tool_id): 比較対象の順位}
+    """
+    from .models_stats import ToolSegmentRank
+
+    snapshot_ranks = get_snapshot_ranks(now - timedelta(days=RANK_CHANGE_DAYS))
+    if snapshot_ranks:
+        previous = {}
+        for row in ranks:
+            tool_ranks = snapshot_ranks.get(row['tool_id'])
+            row['prev_week_rank'] = tool_ranks['global_rank'] if tool_ranks else None
+            if tool_ranks:
+                for name, (by_platform, by_type) in SEGMENTS.items():
+                    key = (row['platform'] if by_platform else '', row['tool_type'] if by_type else '', row['tool_id'])
+                    previous[key] = tool_ranks[name]
+        return previous
+
+    for row in ranks:
+        if row['current_rank'] is not None:
+            row['prev_week_rank'] = row['current_rank']
+    return {
+        (platform, tool_type, tool_id): rank
+        for platform, tool_type, tool_id, rank in ToolSegmentRank.objects.values_list(
+            'platform', 'tool_type', 'tool_id', 'rank'
+        ).iterator(chunk_size=5000)
+    }
+
+
+def build_snapshots(ranks, captured_at):
+    """順位計算の結果 → ToolRankSnapshot（未保存）のリスト"""
+    from .models_stats import ToolRankSnapshot
+
+    return [
+        ToolRankSnapshot(
+            tool_id=row['tool_id'],
+            captured_at=captured_at,
+            score=row['week_score'],
+            views=row['week_views'],
+            clicks=row['week_clicks'],
+            shares=row['week_shares'],
+            avg_duration=row['week_avg_duration'],
+            **{field: row[name] for name, field in SNAPSHOT_RANK_FIELDS.items()},
+        )
+        for row in ranks
+    ]
+
+
+def update_rankings(dry_run=False, now=None):
+    """
+    全体順位・前週順位（ToolStats）とセグメント別順位（ToolSegmentRank）を更新し、
+    順位履歴（ToolRankSnapshot）を追記
+
+    Returns:
+        list: compute_ranks() の結果（prev_week_rank は比較対象の順位に更新済み）
+    """
+    from django.utils import timezone
+    from .models_stats import ToolRankSnapshot, ToolSegmentRank, ToolStats
+
+    now = now or timezone.now()
+    ranks = compute_ranks()
+    previous = apply_previous_ranks(ranks, now)
+    if dry_run:
+        return ranks
+
+    with transaction.atomic():
+        ToolStats.objects.bulk_update(
+            [
+                ToolStats(tool_id=row['tool_id'], current_rank=row['global_rank'], prev_week_rank=row['prev_week_rank'])
+                for row in ranks
+            ],
+            ['current_rank', 'prev_week_rank'],
+            batch_size=500
+        )
+        ToolSegmentRank.objects.all().delete()
+        ToolSegmentRank.objects.bulk_create(build_segment_ranks(ranks, previous), batch_size=1000)
+        ToolRankSnapshot.objects.bulk_create(build_snapshots(ranks, now), batch_size=1000)
+
+    return ranks
+
+
+def prune_rank_history(now=None):
+    """
+    保持期間を過ぎた順位履歴を削除
+
+    Returns:
+        int: 削除した行数
+    """
+    from django.utils import timezone
+    from .models_stats import ToolRankSnapshot
+
+    cutoff = (now or timezone.now()) - timedelta(days=get_rank_history_retention_days())
+    deleted, _ = ToolRankSnapshot.objects.filter(captured_at__lt=cutoff).delete()
+    return deleted
+
+
+def get_segment_ranks(platform='', tool_type='', limit=RANKING_SIZE):
+    """セグメント（プラットフォーム × ツールタイプ）の上位N件のToolSegmentRankクエリセット"""
+    from .models_stats import ToolSegmentRank
+
+    return ToolSegmentRank.objects.filter(
+        platform=platform,
+        tool_type=tool_type,
+        rank__lte=limit
+    ).order_by('rank')
+
+
+def build_ranking_response(platform='', tool_type='', fast=True):
+    """
+    セグメントの上位RANKING_SIZE件のランキングレスポンスを作成
+
+    順位・統計・ツール列は1回のクエリで取得し、メタ情報（updated_at / count）は
+    取得済みの行から求める（件数・先頭行のための追加クエリを発行しない）
+
+    Args:
+        fast: Trueなら WeeklyRankingFastSerializer、Falseなら WeeklyRankingSerializer
+
+    Returns:
+        dict: {'updated_at': 集計日時, 'count': 件数, 'rankings': [...]}
+    """
+    from django.db.models import F
+    from .serializers_stats import WeeklyRankingFastSerializer, WeeklyRankingSerializer
+
+    queryset = get_segment_ranks(platform, tool_type)
+    if fast:
+        serializer = WeeklyRankingFastSerializer()
+        rows = list(serializer.segment_rank_values(queryset, updated_at=F('tool__stats__last_updated')))
+        rankings = serializer.serialize_rows(rows)
+        updated_at = rows[0]['updated_at'] if rows else None
+    else:
+        # ToolStatsの順位をセグメント内の順位に置き換えてシリアライズ
+        stats_list = []
+        for segment_rank in queryset.select_related('tool__stats'):
+            stats = segment_rank.tool.stats
+            stats.current_rank = segment_rank.rank
+            stats.prev_week_rank = segment_rank.prev_rank
+            stats_list.append(stats)
+        rankings = WeeklyRankingSerializer(stats_list, many=True).data
+        updated_at = stats_list[0].last_updated if stats_list else None
+
+    return {
+        'updated_at': updated_at,
+        'count': len(rankings),
+        'rankings': list(rankings),
+    }
+
+
+def is_cacheable_segment(platform, tool_type):
+    """キャッシュ対象のセグメントか（任意の文字列でキャッシュキーが増えないよう選択肢のみ）"""
+    from .models import Tool
+
+    return (
+        platform in {'', *dict(Tool.PLATFORM_CHOICES)}
+        and tool_type in {'', *dict(Tool.TOOL_TYPE_CHOICES)}
+    )
+
+
+def get_ranking_cache_key(platform, tool_type, fast, version):
+    """ランキングレスポンスのキャッシュキー（カタログバージョン付き）"""
+    return f'{RANKING_CACHE_PREFIX}:{version}:{"fast" if fast else "drf"}:{platform}:{tool_type}'
+
+
+def get_ranking_response(platform='', tool_type='', version=None):
+    """
+    キャッシュ付きのランキングレスポンス（上位RANKING_SIZE件）
+
+    順位の更新・ツールの変更でカタログバージョンが変わると、次のリクエストで再作成
+    （update_weekly_statsでは warm_ranking_cache() で事前作成）
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+    from .facets import get_catalogue_version
+    from .serializers import use_fast_tool_serialization
+
+    fast = use_fast_tool_serialization()
+    if not is_cacheable_segment(platform, tool_type):
+        return build_ranking_response(platform, tool_type, fast=fast)
+
+    cache_key = get_ranking_cache_key(platform, tool_type, fast, version or get_catalogue_version())
+    data = cache.get(cache_key)
+    if data is None:
+        data = build_ranking_response(platform, tool_type, fast=fast)
+        cache.set(cache_key, data, getattr(settings, 'WEEKLY_RANKING_CACHE_TIMEOUT', 86400))
+    return data
+
+
+def warm_ranking_cache():
+    """
+    全セグメントのランキングレスポンスを作成してキャッシュ（集計・カタログ更新後に呼ぶ）
+
+    Returns:
+        int: 作成したセグメント数
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+    from .facets import get_catalogue_version
+    from .models_stats import ToolSegmentRank
+    from .serializers import use_fast_tool_serialization
+
+    fast = use_fast_tool_serialization()
+    version = get_catalogue_version()
+    segments = set(ToolSegmentRank.objects.values_list('platform', 'tool_type').distinct())
+    segments.add(('', ''))
+
+    cache.set_many(
+        {
+            get_ranking_cache_key(platform, tool_type, fast, version): build_ranking_response(platform, tool_type, fast=fast)
+            for platform, tool_type in segments
+            if is_cacheable_segment(platform, tool_type)
+        },
+        getattr(settings, 'WEEKLY_RANKING_CACHE_TIMEOUT', 86400)
+    )
+    return len(segments)
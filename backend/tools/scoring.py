@@ -0,0 +1,409 @@
+"""
+週間スコアの計算エンジン（時間減衰・重みは設定で変更可能）
+
+日別集計（ToolDailyStats）から全ツールのスコアを一括で計算する。
+
+    スコア = Σ減衰 × (クリック × w_clicks + シェア × w_shares + PV × w_views)
+           + 減衰加重の平均滞在時間（秒） × w_duration
+
+- 重み: settings.TOOL_SCORE_WEIGHTS（未指定の項目は従来の重み）
+- 時間減衰: 経過日数 d の日の集計に 0.5 ** (d / 半減期) を掛ける
+  （settings.TOOL_SCORE_HALF_LIFE_DAYS。7日の窓から1日が外れたときの順位の急変を抑える）
+  半減期が0なら減衰なしで直近7日間の単純合計（ToolStats.calculate_score と同じ）
+- 計算期間: 直近 TOOL_SCORE_WINDOW_DAYS 日（それより古い日の寄与は十分小さい）
+- NumPyがあれば全ツール分を配列演算（bincount）で計算、なければ同じ式の純Python実装
+- 週間PV数等の表示用の統計は、減衰なしの直近7日間の合計
+- replay_scores() で過去の日ごとのスコア・順位を再計算し、順位履歴を置き換えられる
+"""
+from datetime import datetime, time, timedelta
+
+# NumPy（全ツールのスコアの配列演算）
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+
+
+# 従来の重み（ToolStats.calculate_score と同じ）
+DEFAULT_WEIGHTS = {
+    'clicks': 5.0,     # CTAクリック: 「このツールを使いたい」最強シグナル
+    'shares': 2.0,     # シェア: 「他人にも勧めたい」高評価シグナル
+    'duration': 0.05,  # 平均滞在時間（秒）: ÷10 × 0.5
+    'views': 0.3,      # PV: 「興味がある」最小シグナル
+}
+
+# 日別集計の列（ToolDailyStatsのフィールド）
+ROLLUP_FIELDS = ('views', 'clicks', 'shares', 'duration_total', 'duration_count')
+
+# 表示用の週間統計の日数
+WEEK_DAYS = 7
+
+
+def get_score_config():
+    """
+    スコア計算の設定
+
+    Returns:
+        dict: {'weights': 重み, 'half_life': 半減期（日、Noneなら減衰なし）, 'window_days': 計算期間（日）}
+    """
+    from django.conf import settings
+
+    half_life = getattr(settings, 'TOOL_SCORE_HALF_LIFE_DAYS', 7.0) or None
+    return {
+        'weights': {**DEFAULT_WEIGHTS, **getattr(settings, 'TOOL_SCORE_WEIGHTS', {})},
+        'half_life': half_life,
+        'window_days': getattr(settings, 'TOOL_SCORE_WINDOW_DAYS', 28) if half_life else WEEK_DAYS,
+    }
+
+
+def day_start(date):
+    """日付の開始日時（ローカル時刻）"""
+    from django.utils import timezone
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def get_rollup_watermark():
+    """
+    日別集計の確定日（この日以前の集計はEventLogから作り直さない）
+
+    最新のEventLog削除（EventLogCleanup）の削除基準日時の日。
+    削除基準日時がちょうど日の開始ならその前日（その日のログはすべて残っている）。
+
+    Returns:
+        date: 確定日（削除履歴がなければNone）
+    """
+    from django.db.models import Max
+    from django.utils import timezone
+    from .models_stats import EventLogCleanup
+
+    cutoff = EventLogCleanup.objects.aggregate(cutoff=Max('cutoff'))['cutoff']
+    if cutoff is None:
+        return None
+    cutoff_date = timezone.localdate(cutoff)
+    if cutoff == day_start(cutoff_date):
+        return cutoff_date - timedelta(days=1)
+    return cutoff_date
+
+
+def refresh_daily_stats(start_date, end_date):
+    """
+    EventLogから期間内の日別集計を作り直す
+
+    EventLogが削除済みの日（cleanup_eventsで記録した確定日以前）は集計を残す
+
+    Returns:
+        int: 作成した日別集計の行数
+    """
+    from django.db import transaction
+    from django.db.models import Count, Q, Sum
+    from django.db.models.functions import TruncDate
+    from .models_stats import EventLog, ToolDailyStats
+
+    watermark = get_rollup_watermark()
+    if watermark is not None:
+        start_date = max(start_date, watermark + timedelta(days=1))
+    if start_date > end_date:
+        return 0
+
+    duration_filter = Q(event_type='duration', duration_seconds__gte=10)
+    rows = EventLog.objects.filter(
+        created_at__gte=day_start(start_date),
+        created_at__lt=day_start(end_date + timedelta(days=1))
+    ).annotate(date=TruncDate('created_at')).values('tool_id', 'date').annotate(
+        views=Count('id', filter=Q(event_type='view')),
+        clicks=Count('id', filter=Q(event_type='click')),
+        shares=Count('id', filter=Q(event_type='share')),
+        duration_total=Sum('duration_seconds', filter=duration_filter, default=0),
+        duration_count=Count('id', filter=duration_filter),
+    ).order_by()
+
+    with transaction.atomic():
+        ToolDailyStats.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+        created = ToolDailyStats.objects.bulk_create(
+            [ToolDailyStats(**row) for row in rows],
+            batch_size=1000
+        )
+    return len(created)
+
+
+def load_rollups(start_date, end_date, tool_ids=None):
+    """
+    期間内の日別集計を列ごとに取得
+
+    Args:
+        tool_ids: 対象ツールIDのリスト（未指定なら全ツール）
+
+    Returns:
+        dict: {'tool_id': [...], 'day': [日付の序数], 'views': [...], ...}
+              （NumPyがあれば各列はndarray）
+    """
+    from .models_stats import ToolDailyStats
+
+    rows = ToolDailyStats.objects.filter(date__gte=start_date, date__lte=end_date)
+    if tool_ids is not None:
+        rows = rows.filter(tool_id__in=tool_ids)
+
+    columns = {name: [] for name in ('tool_id', 'day') + ROLLUP_FIELDS}
+    appenders = [columns[name].append for name in columns]
+    for tool_id, date, *values in rows.values_list('tool_id', 'date', *ROLLUP_FIELDS).iterator(chunk_size=5000):
+        for append, value in zip(appenders, (tool_id, date.toordinal(), *values)):
+            append(value)
+
+    if NUMPY_ENABLED:
+        columns = {name: np.asarray(values, dtype=np.int64) for name, values in columns.items()}
+    return columns
+
+
+def score_rollups(tool_ids, rollups, as_of, config=None, week_days=WEEK_DAYS, use_numpy=None):
+    """
+    日別集計から全ツールのスコア・週間統計を一括計算（DBにアクセスしない）
+
+    Args:
+        tool_ids: 対象ツールIDのリスト（昇順）
+        rollups: load_rollups() の結果（計算期間外・対象外のツールの行は無視）
+        as_of: 基準日（経過日数0の日）
+        config: get_score_config() の形式（未指定なら現在の設定）
+        use_numpy: Falseなら純Python実装（未指定ならNumPyがあれば使用）
+
+    Returns:
+        dict: {'week_score', 'week_views', 'week_clicks', 'week_shares', 'week_avg_duration'}
+              の各リスト（tool_idsと同順）
+    """
+    config = config or get_score_config()
+    if not tool_ids:
+        return {name: [] for name in ('week_score', 'week_views', 'week_clicks', 'week_shares', 'week_avg_duration')}
+    if use_numpy is None:
+        use_numpy = NUMPY_ENABLED
+    if use_numpy and NUMPY_ENABLED:
+        return _score_numpy(tool_ids, rollups, as_of.toordinal(), config, week_days)
+    return _score_python(tool_ids, rollups, as_of.toordinal(), config, week_days)
+
+
+def _score_numpy(tool_ids, rollups, as_of_day, config, week_days):
+    n = len(tool_ids)
+    ids = np.asarray(tool_ids, dtype=np.int64)
+    row_ids = np.asarray(rollups['tool_id'], dtype=np.int64)
+    age = as_of_day - np.asarray(rollups['day'], dtype=np.int64)
+
+    # 行 → ツールの位置（tool_idsは昇順）
+    index = np.searchsorted(ids, row_ids)
+    mask = (
+        (age >= 0) & (age < config['window_days']) &
+        (index < n) & (ids[np.minimum(index, n - 1)] == row_ids)
+    )
+    index, age = index[mask], age[mask]
+
+    if config['half_life']:
+        decay = 0.5 ** (age / config['half_life'])
+    else:
+        decay = np.ones(len(age))
+    week = (age < week_days).astype(np.float64)
+
+    def totals(factor):
+        return {
+            name: np.bincount(
+                index,
+                weights=np.asarray(rollups[name], dtype=np.float64)[mask] * factor,
+                minlength=n
+            )
+            for name in ROLLUP_FIELDS
+        }
+
+    def average_duration(values):
+        return np.divide(
+            values['duration_total'], values['duration_count'],
+            out=np.zeros(n), where=values['duration_count'] > 0
+        )
+
+    decayed = totals(decay)
+    weekly = totals(week)
+    weights = config['weights']
+    score = (
+        decayed['clicks'] * weights['clicks'] +
+        decayed['shares'] * weights['shares'] +
+        average_duration(decayed) * weights['duration'] +
+        decayed['views'] * weights['views']
+    )
+    return {
+        'week_score': np.round(score, 2).tolist(),
+        'week_views': weekly['views'].astype(np.int64).tolist(),
+        'week_clicks': weekly['clicks'].astype(np.int64).tolist(),
+        'week_shares': weekly['shares'].astype(np.int64).tolist(),
+        'week_avg_duration': np.round(average_duration(weekly), 2).tolist(),
+    }
+
+
+def _score_python(tool_ids, rollups, as_of_day, config, week_days):
+    n = len(tool_ids)
+    position = {tool_id: i for i, tool_id in enumerate(tool_ids)}
+    decayed = {name: [0.0] * n for name in ROLLUP_FIELDS}
+    weekly = {name: [0.0] * n for name in ROLLUP_FIELDS}
+    half_life = config['half_life']
+
+    columns = [rollups[name] for name in ROLLUP_FIELDS]
+    for row, (tool_id, day) in enumerate(zip(rollups['tool_id'], rollups['day'])):
+        i = position.get(int(tool_id))
+        age = as_of_day - int(day)
+        if i is None or not 0 <= age < config['window_days']:
+            continue
+        decay = 0.5 ** (age / half_life) if half_life else 1.0
+        for name, column in zip(ROLLUP_FIELDS, columns):
+            value = float(column[row])
+            decayed[name][i] += value * decay
+            if age < week_days:
+                weekly[name][i] += value
+
+    def average_duration(values, i):
+        count = values['duration_count'][i]
+        return values['duration_total'][i] / count if count > 0 else 0.0
+
+    # NumPyの np.round と同じ丸め（100倍して偶数丸め）
+    def round2(value):
+        return round(value * 100) / 100
+
+    weights = config['weights']
+    return {
+        'week_score': [
+            round2(
+                decayed['clicks'][i] * weights['clicks'] +
+                decayed['shares'][i] * weights['shares'] +
+                average_duration(decayed, i) * weights['duration'] +
+                decayed['views'][i] * weights['views']
+            )
+            for i in range(n)
+        ],
+        'week_views': [int(value) for value in weekly['views']],
+        'week_clicks': [int(value) for value in weekly['clicks']],
+        'week_shares': [int(value) for value in weekly['shares']],
+        'week_avg_duration': [round2(average_duration(weekly, i)) for i in range(n)],
+    }
+
+
+def compute_tool_scores(as_of=None, config=None, week_days=WEEK_DAYS, use_numpy=None, tool_ids=None):
+    """
+    全ツール（tool_ids指定時はそのツールのみ）のスコア・週間統計を日別集計から計算
+
+    Returns:
+        dict: {tool_id: {'week_score', 'week_views', 'week_clicks', 'week_shares', 'week_avg_duration'}}
+    """
+    from django.utils import timezone
+    from .models import Tool
+
+    as_of = as_of or timezone.localdate()
+    config = config or get_score_config()
+    window_days = max(config['window_days'], week_days)
+    start_date = as_of - timedelta(days=window_days - 1)
+    if tool_ids is None:
+        tool_ids = list(Tool.objects.order_by('id').values_list('id', flat=True))
+        rollups = load_rollups(start_date, as_of)
+    else:
+        # score_rollups はID昇順を前提とする
+        tool_ids = sorted(set(tool_ids))
+        rollups = load_rollups(start_date, as_of, tool_ids)
+
+    result = score_rollups(tool_ids, rollups, as_of, config, week_days, use_numpy)
+    return {
+        tool_id: {name: values[i] for name, values in result.items()}
+        for i, tool_id in enumerate(tool_ids)
+    }
+
+
+def get_name_order():
+    """
+    ツールID → 名前順の位置（DBの照合順序で order_by('name', 'id')）
+
+    Pythonの文字列比較はDBの照合順序と異なり得るため、同点の並びはDBで決める
+    """
+    from .models import Tool
+
+    return {
+        tool_id: position
+        for position, tool_id in enumerate(Tool.objects.order_by('name', 'id').values_list('id', flat=True))
+    }
+
+
+def rank_tools(tools, scores, name_order):
+    """
+    スコアから全体・セグメント別の順位を計算（compute_ranks() と同じ順序: スコア降順 → 名前 → ID）
+
+    Args:
+        tools: [(id, platform, tool_type)]
+        scores: スコアのリスト（toolsと同順）
+        name_order: get_name_order() の結果（同点時の順序）
+
+    Returns:
+        list: [{'global_rank', 'platform_rank', 'type_rank', 'segment_rank'}]（toolsと同順）
+    """
+    from .rankings import SEGMENTS
+
+    counters = {}
+    ranks = [None] * len(tools)
+    for i in sorted(range(len(tools)), key=lambda i: (-scores[i], name_order[tools[i][0]])):
+        _, platform, tool_type = tools[i]
+        ranks[i] = {}
+        for name, (by_platform, by_type) in SEGMENTS.items():
+            key = (name, platform if by_platform else '', tool_type if by_type else '')
+            counters[key] = counters.get(key, 0) + 1
+            ranks[i][name] = counters[key]
+    return ranks
+
+
+def replay_scores(start_date, end_date, config=None, dry_run=False, progress=None):
+    """
+    日別集計から過去の日ごとのスコア・順位を再計算し、期間内の順位履歴を置き換え
+
+    重み・半減期の変更後に、ランキングの推移（ToolRankSnapshot）を新しい式で作り直す。
+    各日の集計日時はその日の終わり、対象はその日までに登録されたツール。
+
+    Args:
+        progress: 1日ごとに呼ばれるコールバック（日付, 作成したスナップショット数）
+
+    Returns:
+        int: 作成した（dry_run時は作成対象の）スナップショット数
+    """
+    from django.db import transaction
+    from .models import Tool
+    from .models_stats import ToolRankSnapshot
+    from .rankings import SNAPSHOT_RANK_FIELDS
+
+    config = config or get_score_config()
+    tools = list(Tool.objects.order_by('id').values_list('id', 'platform', 'tool_type', 'created_at'))
+    name_order = get_name_order()
+    window_days = max(config['window_days'], WEEK_DAYS)
+    rollups = load_rollups(start_date - timedelta(days=window_days - 1), end_date)
+
+    total = 0
+    with transaction.atomic():
+        if not dry_run:
+            ToolRankSnapshot.objects.filter(
+                captured_at__gte=day_start(start_date),
+                captured_at__lt=day_start(end_date + timedelta(days=1))
+            ).delete()
+
+        for offset in range((end_date - start_date).days + 1):
+            date = start_date + timedelta(days=offset)
+            captured_at = day_start(date + timedelta(days=1)) - timedelta(microseconds=1)
+            day_tools = [tool[:3] for tool in tools if tool[3] <= captured_at]
+            result = score_rollups([tool[0] for tool in day_tools], rollups, date, config)
+            ranks = rank_tools(day_tools, result['week_score'], name_order)
+
+            if not dry_run:
+                ToolRankSnapshot.objects.bulk_create([
+                    ToolRankSnapshot(
+                        tool_id=tool[0],
+                        captured_at=captured_at,
+                        score=result['week_score'][i],
+                        views=result['week_views'][i],
+                        clicks=result['week_clicks'][i],
+                        shares=result['week_shares'][i],
+                        avg_duration=result['week_avg_duration'][i],
+                        **{field: ranks[i][name] for name, field in SNAPSHOT_RANK_FIELDS.items()},
+                    )
+                    for i, tool in enumerate(day_tools)
+                ], batch_size=1000)
+            total += len(day_tools)
+            if progress:
+                progress(date, len(day_tools))
+
+    return total
@@ -1,19 +1,80 @@
 """
 Serializers for Tools API
 """
+from django.conf import settings
 from rest_framework import serializers
 from .models import Tool
 from tags.serializers import TagSimpleSerializer
 
 
-class ToolSerializer(serializers.ModelSerializer):
+def parse_csv_param(value):
+    """カンマ区切りのクエリパラメータをリストに変換（未指定はNone）"""
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class DynamicFieldsMixin:
+    """
+    スパースフィールドセット対応ミックスイン（?fields= / ?expand=）
+    
+    - fields指定: 指定したフィールドのみ返す
+    - expand指定: 重いフィールド（expandable_fields）を除いた軽量版 + 指定分を返す
+    - どちらも未指定: 従来通り全フィールドを返す
+    """
+    
+    # expand名 → 対応するフィールド名（重いフィールドのみ定義）
+    expandable_fields = {}
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+    
+    @classmethod
+    def get_field_names(cls):
+        """シリアライザが返す全フィールド名（定義順）"""
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and getattr(meta, 'fields', None):
+            return list(meta.fields)
+        return list(cls._declared_fields)
+    
+    @classmethod
+    def resolve_fields(cls, fields=None, expand=None):
+        """
+        fields/expandパラメータから返却フィールド名を決定
+        
+        Returns:
+            フィールド名のリスト（全フィールドを返す場合はNone）
+        """
+        if fields is None and expand is None:
+            return None
+        
+        all_fields = cls.get_field_names()
+        
+        if fields is not None:
+            selected = set()
+            for name in fields:
+                selected.update(cls.expandable_fields.get(name, [name]))
+        else:
+            heavy = {f for names in cls.expandable_fields.values() for f in names}
+            selected = set(all_fields) - heavy
+        
+        for name in expand or []:
+            selected.update(cls.expandable_fields.get(name, []))
+        
+        return [name for name in all_fields if name in selected]
+
+
+class ToolSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """ツールのシリアライザ（詳細表示用）"""
     
     # タグはネストされたシリアライザで表示
     tags = TagSimpleSerializer(many=True, read_only=True)
     
-    # リボンは自動計算 + 手動設定を結合
-    ribbons = serializers.SerializerMethodField()
+    # リボンは保存済みの実効リボン（手動設定 + 自動計算）
+    ribbons = serializers.ListField(child=serializers.CharField(), source='effective_ribbons', read_only=True)
     
     # 週間ランキング情報（後でToolStatsから取得）
     week_rank = serializers.SerializerMethodField()
@@ -45,6 +106,13 @@ class ToolSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
+    expandable_fields = {
+        'long_description': ['long_description'],
+        'metadata': ['metadata'],
+        'tags': ['tags'],
+        'stats': ['week_rank', 'week_rank_change', 'week_views'],
+    }
+    
     def get_week_rank(self, obj):
         """週間ランキング順位を取得"""
         if hasattr(obj, 'stats'):
@@ -63,19 +131,15 @@ class ToolSerializer(serializers.ModelSerializer):
             return obj.stats.week_views
         return 0
 
-    def get_ribbons(self, obj):
-        """手動リボン + 自動計算リボンを取得"""
-        return obj.all_ribbons
 
-
-class ToolListSerializer(serializers.ModelSerializer):
+class ToolListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """ツールのシリアライザ（一覧表示用・軽量版）"""
     
     # タグは名前のリストのみ
     tag_names = serializers.SerializerMethodField()
     
-    # リボンは自動計算 + 手動設定を結合
-    ribbons = serializers.SerializerMethodField()
+    # リボンは保存済みの実効リボン（手動設定 + 自動計算）
+    ribbons = serializers.ListField(child=serializers.CharField(), source='effective_ribbons', read_only=True)
     
     class Meta:
         model = Tool
@@ -95,11 +159,101 @@ class ToolListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
+    expandable_fields = {
+        'tags': ['tag_names'],
+    }
+    
     def get_tag_names(self, obj):
         """タグ名のリストを取得"""
         return [tag.name for tag in obj.tags.all()[:5]]  # 最大5個まで  # 最大5個まで
 
-    def get_ribbons(self, obj):
-        """手動リボン + 自動計算リボンを取得"""
-        return obj.all_ribbons
+
+def use_fast_tool_serialization():
+    """一覧系エンドポイントでToolListFastSerializerを使うかどうか（settings.FAST_TOOL_SERIALIZATION）"""
+    return getattr(settings, 'FAST_TOOL_SERIALIZATION', True)
+
+
+class ToolListFastSerializer:
+    """
+    ToolListSerializerと同一出力のプレーンdict版（一覧・ランキング・関連ツール用）
+    
+    values()の行 + 一括取得したタグ名マップから組み立て、
+    DRFのフィールド処理・オブジェクト単位のstats参照を省く
+    
+    使い方:
+        ToolListFastSerializer().serialize_queryset(Tool.objects.filter(...))
+    
+    ネストする場合はprefix付きで取得した行を渡す:
+        serializer = ToolListFastSerializer(prefix='tool__')
+        rows = ToolStats.objects.values(*serializer.get_value_fields())
+    """
+    
+    # ToolListSerializerのフィールドのうち、カラム値をそのまま返すもの
+    plain_fields = ('id', 'name', 'slug', 'short_description', 'platform', 'tool_type', 'price_type', 'image_url')
+    datetime_fields = ('created_at', 'updated_at')
+    
+    # タグ名の最大数（ToolListSerializer.get_tag_namesと同じ）
+    max_tag_names = 5
+    
+    def __init__(self, fields=None, prefix=''):
+        self.field_names = [
+            name for name in ToolListSerializer.Meta.fields
+            if fields is None or name in fields
+        ]
+        self.prefix = prefix
+        # 日時はDRFと同じ形式（タイムゾーン変換・ISO 8601）で出力
+        self._datetime_field = serializers.DateTimeField()
+    
+    def get_value_fields(self):
+        """values()で取得するカラム名"""
+        columns = ['id']
+        for name in self.field_names:
+            if name == 'ribbons':
+                columns.append('effective_ribbons')
+            elif name != 'tag_names':
+                columns.append(name)
+        return [self.prefix + name for name in columns]
+    
+    def get_tag_names_map(self, tool_ids):
+        """ツールID → タグ名リスト（Tagのデフォルト順で最大5件）を1クエリで取得"""
+        from .models import ToolTag
+        
+        tag_map = {}
+        rows = ToolTag.objects.filter(
+            content_object_id__in=tool_ids
+        ).order_by('tag__tag_category__display_order', 'tag__name').values_list('content_object_id', 'tag__name')
+        for tool_id, tag_name in rows:
+            names = tag_map.setdefault(tool_id, [])
+            if len(names) < self.max_tag_names:
+                names.append(tag_name)
+        return tag_map
+    
+    def serialize_queryset(self, queryset, limit=None):
+        """Toolクエリセットをシリアライズ（並び順はクエリセットの順序を維持）"""
+        rows = queryset.prefetch_related(None).values(*self.get_value_fields())
+        if limit is not None:
+            rows = rows[:limit]
+        return self.serialize_rows(rows)
+    
+    def serialize_rows(self, rows):
+        """values()の行リストをシリアライズ"""
+        rows = list(rows)
+        tag_map = {}
+        if 'tag_names' in self.field_names:
+            tag_map = self.get_tag_names_map([row[self.prefix + 'id'] for row in rows])
+        return [self.to_representation(row, tag_map) for row in rows]
+    
+    def to_representation(self, row, tag_map):
+        prefix = self.prefix
+        data = {}
+        for name in self.field_names:
+            if name == 'ribbons':
+                data[name] = list(row[prefix + 'effective_ribbons'])
+            elif name == 'tag_names':
+                data[name] = tag_map.get(row[prefix + 'id'], [])
+            elif name in self.datetime_fields:
+                data[name] = self._datetime_field.to_representation(row[prefix + name])
+            else:
+                data[name] = row[prefix + name]
+        return data
 
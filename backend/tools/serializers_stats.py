@@ -3,7 +3,7 @@
 """
 from rest_framework import serializers
 from .models_stats import ToolStats, EventLog
-from .serializers import ToolListSerializer
+from .serializers import ToolListSerializer, ToolListFastSerializer
 
 
 class ToolStatsSerializer(serializers.ModelSerializer):
@@ -49,6 +49,63 @@ class WeeklyRankingSerializer(serializers.Serializer):
         return obj.get_rank_change()
 
 
+class WeeklyRankingFastSerializer:
+    """
+    WeeklyRankingSerializerと同一出力のプレーンdict版
+    
+    ToolStatsのvalues()行（tool__プレフィックスでツール列を含む）から組み立てる
+    """
+    
+    stats_fields = ('current_rank', 'prev_week_rank', 'week_score', 'week_views', 'week_shares', 'week_avg_duration')
+    
+    def __init__(self):
+        self.tool_serializer = ToolListFastSerializer(prefix='tool__')
+    
+    def get_value_fields(self):
+        """values()で取得するカラム名"""
+        return list(dict.fromkeys(list(self.stats_fields) + self.tool_serializer.get_value_fields()))
+    
+    def serialize_queryset(self, queryset):
+        """ToolStatsクエリセットをシリアライズ"""
+        return self.serialize_rows(queryset.values(*self.get_value_fields()))
+    
+    def segment_rank_values(self, queryset, **extra):
+        """
+        ToolSegmentRankクエリセットのvalues()（順位・順位変動はセグメント内の値）
+        
+        Args:
+            extra: 追加で取得する式（名前=式）
+        """
+        from django.db.models import F
+        
+        stats_values = {
+            'current_rank': F('rank'),
+            'prev_week_rank': F('prev_rank'),
+            **{field: F(f'tool__stats__{field}') for field in self.stats_fields[2:]},
+        }
+        return queryset.values(*self.tool_serializer.get_value_fields(), **stats_values, **extra)
+    
+    def serialize_segment_ranks(self, queryset):
+        """ToolSegmentRankクエリセットをシリアライズ（順位・順位変動はセグメント内の値）"""
+        return self.serialize_rows(self.segment_rank_values(queryset))
+    
+    def serialize_rows(self, rows):
+        rows = list(rows)
+        tools = self.tool_serializer.serialize_rows(rows)
+        return [
+            {
+                'rank': int(row['current_rank']),
+                'rank_change': ToolStats.format_rank_change(row['prev_week_rank'], row['current_rank']),
+                'tool': tool,
+                'score': float(row['week_score']),
+                'week_views': int(row['week_views']),
+                'week_shares': int(row['week_shares']),
+                'week_avg_duration': float(row['week_avg_duration']),
+            }
+            for row, tool in zip(rows, tools)
+        ]
+
+
 class EventLogSerializer(serializers.ModelSerializer):
     """イベントログのシリアライザ"""
     
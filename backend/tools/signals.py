@@ -0,0 +1,161 @@
+"""
+ツール関連のシグナルハンドラ
+
+- タグ変更時にTool.tag_slugs（タグフィルタ用の非正規化カラム）を同期する
+- ツール・タグ変更時にファセット件数のキャッシュを無効化する
+- ツールの作成・説明文の変更時に説明文からタグを自動付与し、タグ語彙の変更時に照合器を再構築する
+- タグの付け外し・ツール削除時にタグ共起行列を再計算する
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from tags.cooccurrence import refresh_cooccurrence
+from tags.models import Tag, TagMapping
+from tags.signals import tags_bulk_updated
+from .autotag import TEXT_FIELDS, auto_tagging_on_save, autotag_tool, invalidate_matcher
+from .facets import invalidate_tool_catalogue
+from .models import Tool, ToolTag
+
+
+@receiver(post_save, sender=Tool)
+@receiver(post_delete, sender=Tool)
+def invalidate_facets_on_tool_change(sender, **kwargs):
+    """ツールの作成・更新・削除でファセットキャッシュを無効化"""
+    invalidate_tool_catalogue()
+
+
+@receiver(m2m_changed, sender=ToolTag)
+def sync_tool_tag_slugs(sender, instance, action, reverse, pk_set, **kwargs):
+    """tool.tags.add / remove / set / clear 後にtag_slugsを再計算
+
+    タグ側からの変更（reverse=True、instanceはTag、pk_setはツールID）では対象ツールを再計算する。
+    """
+    if reverse:
+        if action == 'pre_clear':
+            # clear後は外れたツールが分からないため、事前に記録
+            instance._cleared_tool_ids = set(
+                ToolTag.objects.filter(tag=instance).values_list('content_object_id', flat=True)
+            )
+            return
+        if action in ('post_add', 'post_remove'):
+            tool_ids = pk_set or ()
+        elif action == 'post_clear':
+            tool_ids = getattr(instance, '_cleared_tool_ids', ())
+        else:
+            return
+        if tool_ids:
+            Tool.sync_tag_slugs(tool_ids)
+        invalidate_tool_catalogue()
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear') or not isinstance(instance, Tool):
+        return
+    # 後続のsave()で古い値に戻らないよう、インスタンス側も更新
+    instance.tag_slugs = Tool.sync_tag_slugs([instance.pk])[instance.pk]
+    invalidate_tool_catalogue()
+
+
+@receiver(post_save, sender=Tag)
+def sync_tool_tag_slugs_on_tag_save(sender, instance, created, **kwargs):
+    """タグのスラッグ変更をtag_slugsに反映"""
+    if created:
+        return
+    tool_ids = ToolTag.objects.filter(tag=instance).values_list('content_object_id', flat=True)
+    # 新しいスラッグを含まないツールのみ再計算（スラッグ変更がなければ対象なし）
+    stale_ids = list(
+        Tool.objects.filter(id__in=tool_ids).exclude(
+            tag_slugs__contains=[instance.slug]
+        ).values_list('id', flat=True)
+    )
+    if stale_ids:
+        Tool.sync_tag_slugs(stale_ids)
+        invalidate_tool_catalogue()
+
+
+@receiver(post_delete, sender=Tag)
+def sync_tool_tag_slugs_on_tag_delete(sender, instance, **kwargs):
+    """削除されたタグをtag_slugsから除去（ToolTagはCASCADEで削除済み）"""
+    tool_ids = list(
+        Tool.objects.filter(tag_slugs__contains=[instance.slug]).values_list('id', flat=True)
+    )
+    if tool_ids:
+        Tool.sync_tag_slugs(tool_ids)
+        invalidate_tool_catalogue()
+
+
+@receiver(tags_bulk_updated)
+def sync_tool_tag_slugs_on_tags_bulk_updated(sender, tag_ids, **kwargs):
+    """タグの一括作成・更新（bulk操作、post_saveなし）をtag_slugs・キャッシュに反映"""
+    tool_ids = set(
+        ToolTag.objects.filter(tag_id__in=tag_ids).values_list('content_object_id', flat=True)
+    )
+    if tool_ids:
+        Tool.sync_tag_slugs(tool_ids)
+    invalidate_tool_catalogue()
+
+
+@receiver(pre_save, sender=Tool)
+def remember_text_on_tool_save(sender, instance, raw, update_fields, **kwargs):
+    """update_fields指定なしの更新では、説明文が変わったか判定するため保存前の説明文を記録"""
+    if raw or instance.pk is None or update_fields is not None or not auto_tagging_on_save():
+        return
+    instance._previous_text = Tool.objects.filter(pk=instance.pk).values_list(*TEXT_FIELDS).first()
+
+
+@receiver(post_save, sender=Tool)
+def autotag_on_tool_save(sender, instance, created, raw, update_fields, **kwargs):
+    """
+    説明文に含まれるタグを付与（作成時・説明文の変更時のみ）
+
+    説明文を変えない保存（ツール統合・スクリプトでの更新等）で、
+    編集者が外したタグを付け直さないよう対象外にする（fixture読み込みも対象外）
+    """
+    previous_text = instance.__dict__.pop('_previous_text', None)
+    if raw or not auto_tagging_on_save():
+        return
+    if not created:
+        if update_fields is not None:
+            if not set(update_fields) & set(TEXT_FIELDS):
+                return
+        elif previous_text == tuple(getattr(instance, field) for field in TEXT_FIELDS):
+            return
+    autotag_tool(instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=TagMapping)
+@receiver(post_delete, sender=TagMapping)
+@receiver(tags_bulk_updated)
+def invalidate_autotag_matcher(sender, **kwargs):
+    """タグ名・表記ゆれの変更で自動タグ付けの照合器を再構築"""
+    invalidate_matcher()
+
+
+@receiver(m2m_changed, sender=ToolTag)
+def refresh_cooccurrence_on_tool_tags_change(sender, instance, action, pk_set, **kwargs):
+    """tool.tags.add / remove / set / clear で、付け外ししたタグの共起件数を再計算"""
+    if not isinstance(instance, Tool):
+        return
+    if action == 'pre_clear':
+        # clear後は外したタグが分からないため、事前に記録
+        instance._cleared_tag_ids = set(
+            ToolTag.objects.filter(content_object=instance).values_list('tag_id', flat=True)
+        )
+    elif action in ('post_add', 'post_remove'):
+        refresh_cooccurrence(pk_set)
+    elif action == 'post_clear':
+        refresh_cooccurrence(getattr(instance, '_cleared_tag_ids', ()))
+
+
+@receiver(pre_delete, sender=Tool)
+def remember_tags_on_tool_delete(sender, instance, **kwargs):
+    """削除後はToolTagがCASCADEで消えるため、付いていたタグを記録"""
+    instance._deleted_tag_ids = set(
+        ToolTag.objects.filter(content_object=instance).values_list('tag_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tool)
+def refresh_cooccurrence_on_tool_delete(sender, instance, **kwargs):
+    """削除したツールに付いていたタグの共起件数を再計算"""
+    refresh_cooccurrence(getattr(instance, '_deleted_tag_ids', ()))
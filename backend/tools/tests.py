@@ -1,3 +1,798 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tags.models import Tag, TagCategory
+from .models import EventLog, Tool, ToolDailyStats, ToolStats, ToolTag
+from .serializers import ToolListSerializer, ToolListFastSerializer
+from .serializers_stats import WeeklyRankingSerializer, WeeklyRankingFastSerializer
+
+
+def create_tool(name, **fields):
+    """テスト用のツールを作成（未指定の必須項目は既定値、external_urlは名前から生成）"""
+    from django.utils.text import slugify
+
+    fields.setdefault('short_description', '短い説明')
+    fields.setdefault('platform', 'mt4')
+    fields.setdefault('tool_type', 'EA')
+    fields.setdefault('image_url', 'https://example.com/image.png')
+    fields.setdefault('external_url', f'https://example.com/tools/{slugify(name)}')
+    return Tool.objects.create(name=name, **fields)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SparseFieldsetTest(TestCase):
+    """?fields= / ?expand= による返却フィールドの絞り込みを検証"""
+
+    def setUp(self):
+        self.tool = create_tool('Sparse Tool', long_description='長い説明', metadata={'version': 1})
+        self.tool.tags.add(Tag.objects.create(name='RSI', slug='rsi'))
+        ToolStats.objects.create(tool=self.tool, week_views=10, current_rank=1)
+
+    def get_detail(self, params):
+        return self.client.get(f'/api/tools/{self.tool.slug}/', params).json()
+
+    def test_fields(self):
+        results = self.client.get('/api/tools/', {'fields': 'id,slug'}).json()['results']
+        self.assertEqual(results, [{'id': self.tool.pk, 'slug': 'sparse-tool'}])
+
+        # expand名（stats）を指定すると対応するフィールドをまとめて返す
+        data = self.get_detail({'fields': 'slug,stats'})
+        self.assertEqual(data, {'slug': 'sparse-tool', 'week_rank': 1, 'week_rank_change': 'NEW', 'week_views': 10})
+
+    def test_expand(self):
+        data = self.get_detail({'expand': 'tags'})
+        self.assertEqual([tag['slug'] for tag in data['tags']], ['rsi'])
+        for name in ('long_description', 'metadata', 'week_rank'):
+            self.assertNotIn(name, data)
+        self.assertEqual(data['name'], 'Sparse Tool')
+
+        # 未指定なら従来通り全フィールド
+        self.assertEqual(self.get_detail({})['long_description'], '長い説明')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BulkLookupTest(TestCase):
+    """複数ツール一括取得API（/api/tools/bulk/）を検証"""
+
+    def setUp(self):
+        self.tools = [create_tool(f'Bulk Tool {i}') for i in range(3)]
+
+    def get(self, params):
+        return self.client.get('/api/tools/bulk/', params)
+
+    def test_request_order_and_missing(self):
+        first, second, third = self.tools
+        data = self.get({
+            'slugs': f'{third.slug},unknown,{first.slug}',
+            'ids': f'{second.pk},{first.pk},999999',
+            'fields': 'id,slug',
+        }).json()
+
+        self.assertEqual([tool['id'] for tool in data['results']], [third.pk, first.pk, second.pk])
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['missing'], {'slugs': ['unknown'], 'ids': [999999]})
+        self.assertEqual(set(data['results'][0]), {'id', 'slug'})
+
+    def test_invalid_params(self):
+        self.assertEqual(self.get({}).status_code, 400)
+        self.assertEqual(self.get({'ids': '1,abc'}).status_code, 400)
+        self.assertEqual(self.get({'ids': ','.join(str(i) for i in range(101))}).status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ExportTest(TestCase):
+    """全ツールのストリーミングエクスポート（NDJSON）を検証"""
+
+    def setUp(self):
+        self.tools = [create_tool(f'Export Tool {i}') for i in range(3)]
+        Tool.objects.filter(pk=self.tools[0].pk).update(updated_at=timezone.now() - timedelta(days=10))
+
+    def get_slugs(self, query=''):
+        import json
+
+        response = self.client.get(f'/api/tools/export/{query}')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        return [json.loads(line)['slug'] for line in lines]
+
+    def test_export_all(self):
+        self.assertEqual(self.get_slugs(), [tool.slug for tool in self.tools])
+
+    def test_updated_since(self):
+        since = timezone.now() - timedelta(days=1)
+        expected = [tool.slug for tool in self.tools[1:]]
+        # +09:00 はURLエンコード（%2B）が必要
+        jst = since.astimezone(timezone.get_fixed_timezone(540)).isoformat()
+        self.assertEqual(self.get_slugs(f'?updated_since={jst.replace("+", "%2B")}'), expected)
+        self.assertEqual(self.get_slugs(f'?updated_since={since.strftime("%Y-%m-%dT%H:%M:%SZ")}'), expected)
+
+        response = self.client.get('/api/tools/export/?updated_since=2025-12-01T00:00:00+09:00')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FastSerializerParityTest(TestCase):
+    """高速シリアライザがDRFシリアライザと同一のJSONを出力することを検証"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category, _ = TagCategory.objects.get_or_create(
+            slug='technical_indicator',
+            defaults={'name': 'テクニカル指標', 'display_order': 1}
+        )
+        tags = [
+            Tag.objects.create(name=f'タグ{i}', slug=f'tag-{i}', tag_category=category if i % 2 else None)
+            for i in range(8)
+        ]
+        for i in range(6):
+            tool = create_tool(
+                f'Tool {i}',
+                platform=['mt4', 'mt5', 'tradingview'][i % 3],
+                ribbons=['featured'] if i % 2 == 0 else [],
+            )
+            tool.tags.add(*tags[:i + 2])
+            if i < 4:
+                ToolStats.objects.create(
+                    tool=tool,
+                    week_views=i * 10,
+                    week_shares=i,
+                    week_avg_duration=12.5,
+                    week_score=100.0 - i,
+                    current_rank=i * 5 + 1,
+                    prev_week_rank=None if i == 0 else i * 5,
+                )
+        # "new"リボンが付かない古いツール
+        Tool.objects.filter(slug='tool-5').update(created_at=timezone.now() - timedelta(days=30))
+        Tool.update_effective_ribbons()
+
+    def assertSameJSON(self, expected, actual):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(expected), renderer.render(actual))
+
+    def test_tool_list(self):
+        queryset = Tool.objects.order_by('id')
+        expected = ToolListSerializer(queryset.prefetch_related('tags').select_related('stats'), many=True).data
+        self.assertSameJSON(expected, ToolListFastSerializer().serialize_queryset(queryset))
+
+    def test_tool_list_with_fields(self):
+        fields = ['id', 'slug', 'ribbons', 'tag_names']
+        queryset = Tool.objects.order_by('id')
+        expected = ToolListSerializer(queryset, many=True, fields=fields).data
+        self.assertSameJSON(expected, ToolListFastSerializer(fields=fields).serialize_queryset(queryset))
+
+    def test_weekly_ranking(self):
+        queryset = ToolStats.objects.select_related('tool').filter(
+            current_rank__isnull=False
+        ).order_by('current_rank')
+        expected = WeeklyRankingSerializer(queryset, many=True).data
+        self.assertSameJSON(expected, WeeklyRankingFastSerializer().serialize_queryset(queryset))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class EffectiveRibbonsTest(TestCase):
+    """実効リボン（手動 + 自動）の保存・一括更新・フィルタを検証"""
+
+    def setUp(self):
+        self.tool = create_tool('Ribbon Tool', ribbons=['featured'])
+
+    def test_computed_on_save(self):
+        self.assertEqual(self.tool.effective_ribbons, ['featured', 'new'])
+
+    def test_bulk_update(self):
+        ToolStats.objects.create(tool=self.tool, current_rank=3)
+        past = timezone.now() - timedelta(days=30)
+        Tool.objects.filter(pk=self.tool.pk).update(created_at=past, updated_at=past)
+
+        self.assertEqual(Tool.update_effective_ribbons(), 1)
+        self.tool.refresh_from_db()
+        self.assertEqual(self.tool.effective_ribbons, ['featured', 'popular'])
+        # 変更フィード・エクスポートで検出できるようupdated_atも更新
+        self.assertGreater(self.tool.updated_at, past)
+        # 変化がなければ更新しない
+        self.assertEqual(Tool.update_effective_ribbons(), 0)
+
+    def test_filter_sees_computed_ribbons(self):
+        response = self.client.get('/api/tools/', {'ribbons': 'new,featured'})
+        self.assertEqual([tool['slug'] for tool in response.json()['results']], ['ribbon-tool'])
+
+        response = self.client.get('/api/tools/', {'ribbons': 'popular'})
+        self.assertEqual(response.json()['results'], [])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TagSlugsTest(TestCase):
+    """タグスラッグ（非正規化カラム）の同期とタグフィルタを検証"""
+
+    def setUp(self):
+        self.tags = [Tag.objects.create(name=f'タグ{i}', slug=f'tag-{i}') for i in range(3)]
+        self.tools = []
+        for i in range(3):
+            tool = create_tool(f'Tagged Tool {i}')
+            tool.tags.add(*self.tags[:i + 1])
+            self.tools.append(tool)
+
+    def get_slugs(self, params):
+        response = self.client.get('/api/tools/', params)
+        return sorted(tool['slug'] for tool in response.json()['results'])
+
+    def test_synced_on_tag_change(self):
+        tool = self.tools[2]
+        self.assertEqual(tool.tag_slugs, ['tag-0', 'tag-1', 'tag-2'])
+
+        tool.tags.remove(self.tags[1])
+        tool.refresh_from_db()
+        self.assertEqual(tool.tag_slugs, ['tag-0', 'tag-2'])
+
+    def test_synced_on_reverse_tag_change(self):
+        from django.db.models.signals import m2m_changed
+
+        def send(action, pk_set):
+            m2m_changed.send(
+                sender=ToolTag, instance=self.tags[0], action=action, reverse=True,
+                model=Tool, pk_set=pk_set,
+            )
+
+        # タグ側からの付け外し（instance=Tag、pk_set=ツールID）
+        ToolTag.objects.filter(tag=self.tags[0], content_object=self.tools[1]).delete()
+        send('post_remove', {self.tools[1].pk})
+        self.tools[1].refresh_from_db()
+        self.assertEqual(self.tools[1].tag_slugs, ['tag-1'])
+
+        send('pre_clear', None)
+        ToolTag.objects.filter(tag=self.tags[0]).delete()
+        send('post_clear', None)
+        for tool in self.tools:
+            tool.refresh_from_db()
+            self.assertNotIn('tag-0', tool.tag_slugs)
+
+    def test_synced_on_tag_rename_and_delete(self):
+        past = timezone.now() - timedelta(days=1)
+        Tool.objects.update(updated_at=past)
+        self.tags[0].slug = 'renamed'
+        self.tags[0].save()
+        self.tools[1].refresh_from_db()
+        self.assertEqual(self.tools[1].tag_slugs, ['renamed', 'tag-1'])
+        self.assertGreater(self.tools[1].updated_at, past)
+
+        self.tags[1].delete()
+        self.tools[1].refresh_from_db()
+        self.assertEqual(self.tools[1].tag_slugs, ['renamed'])
+
+    def test_filter_all_and_any(self):
+        self.assertEqual(self.get_slugs({'tags': 'tag-0,tag-1'}), ['tagged-tool-1', 'tagged-tool-2'])
+        self.assertEqual(self.get_slugs({'tags_any': 'tag-2,tag-1'}), ['tagged-tool-1', 'tagged-tool-2'])
+
+    def test_stored_in_tool_tag(self):
+        from django.db import IntegrityError, transaction
+
+        self.assertEqual(
+            set(ToolTag.objects.filter(tag=self.tags[0]).values_list('content_object_id', flat=True)),
+            {tool.pk for tool in self.tools}
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ToolTag.objects.create(content_object=self.tools[0], tag=self.tags[0])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ToolFacetsTest(TestCase):
+    """ファセット件数APIを検証"""
+
+    def setUp(self):
+        tag = Tag.objects.create(name='RSI', slug='rsi')
+        for i, platform in enumerate(['mt4', 'mt4', 'mt5']):
+            tool = create_tool(f'Facet Tool {i}', platform=platform, tool_type='Indicator')
+            if i > 0:
+                tool.tags.add(tag)
+
+    def test_counts(self):
+        data = self.client.get('/api/tools/facets/').json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['facets']['platform'], {'mt4': 2, 'mt5': 1, 'tradingview': 0})
+        self.assertEqual(data['facets']['tags'], {'rsi': 2})
+        self.assertEqual(data['facets']['ribbons'], {'new': 3})
+
+    def test_filtered_counts_and_invalidation(self):
+        data = self.client.get('/api/tools/facets/', {'platform': 'mt4', 'tags': 'rsi'}).json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['facets']['platform']['mt4'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tool.objects.get(slug='facet-tool-0').tags.add(Tag.objects.get(slug='rsi'))
+        # パラメータの順序違いも同じ条件として扱う
+        data = self.client.get('/api/tools/facets/', {'tags': 'rsi', 'platform': 'mt4,'}).json()
+        self.assertEqual(data['count'], 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ToolBitmapIndexTest(TestCase):
+    """ビットマップインデックスの結果がDBでの絞り込みと一致することを検証"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from . import bitmap_index
+
+        cache.clear()
+        bitmap_index._index = None
+
+        tags = [Tag.objects.create(name=f'索引{i}', slug=f'index-{i}') for i in range(3)]
+        for i in range(8):
+            tool = create_tool(
+                f'Index Tool {i}',
+                platform=['mt4', 'mt5', 'tradingview'][i % 3],
+                tool_type=['EA', 'Indicator'][i % 2],
+                price_type=['free', 'paid'][i % 2],
+                ribbons=['featured'] if i % 4 == 0 else [],
+            )
+            tool.tags.add(*tags[i % 3:])
+            ToolStats.objects.create(tool=tool, week_score=float(i % 5), current_rank=i + 1)
+
+    def assertSameResponse(self, path, params):
+        with self.settings(TOOL_BITMAP_INDEX=False):
+            expected = self.client.get(path, params).json()
+        with self.settings(TOOL_BITMAP_INDEX=True):
+            actual = self.client.get(path, params).json()
+        self.assertEqual(expected, actual)
+
+    def test_list_and_facets(self):
+        for params in (
+            {},
+            {'platform': 'mt4,mt5'},
+            {'tool_type': 'EA', 'price_type': 'free'},
+            {'tags': 'index-1,index-2', 'ribbons': 'featured'},
+            {'tags_any': 'index-0', 'page': 1, 'fields': 'id,slug'},
+            {'search': 'Tool 3'},
+            {'ordering': '-week_score'},
+        ):
+            with self.subTest(params=params):
+                self.assertSameResponse('/api/tools/', params)
+                self.assertSameResponse('/api/tools/facets/', params)
+
+    def test_result_slices(self):
+        from types import SimpleNamespace
+        from .bitmap_index import SEEK_CHUNK_BITS, BitmapResult
+
+        # チャンクをまたぐ疎なビットセットで、連続・非連続のスライスがリストと一致する
+        positions = list(range(3, SEEK_CHUNK_BITS * 3, 7))
+        index = SimpleNamespace(ids=[f'id-{i}' for i in range(SEEK_CHUNK_BITS * 3)])
+        result = BitmapResult(index, sum(1 << position for position in positions))
+        expected = [index.ids[position] for position in positions]
+        self.assertEqual(len(result), len(expected))
+        for start, stop in ((0, 20), (20, 40), (600, 620), (10, 30), (1500, 1800), (len(expected) - 5, len(expected) + 5)):
+            with self.subTest(start=start, stop=stop):
+                self.assertEqual(result[start:stop], expected[start:stop])
+        self.assertEqual(result[5:50:4], expected[5:50:4])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ToolAdminFormSimilarityTest(TestCase):
+    """管理フォームの類似ツール検出（pg_trgmで候補抽出 → ファジーマッチング）を検証"""
+
+    def setUp(self):
+        for name in ['Super Trend Indicator', 'Moving Average Cross']:
+            create_tool(name, tool_type='Indicator')
+
+    def get_similar_names(self, name, platform='mt4'):
+        from .admin import ToolAdminForm
+
+        form = ToolAdminForm(data={'name': name, 'platform': platform})
+        form.is_valid()
+        return [similar['tool'].name for similar in form._similar_tools]
+
+    def test_similar_name_warned(self):
+        self.assertEqual(self.get_similar_names('SuperTrend Indicator'), ['Super Trend Indicator'])
+
+    def test_other_platform_or_dissimilar_ignored(self):
+        self.assertEqual(self.get_similar_names('SuperTrend Indicator', platform='mt5'), [])
+        self.assertEqual(self.get_similar_names('RSI Divergence'), [])
+
+    def test_independent_of_server_similarity_threshold(self):
+        from django.db import connection
+
+        # %演算子の閾値を上げても、fuzz.ratioで85以上の候補は警告される
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL pg_trgm.similarity_threshold = 0.95')
+        self.assertEqual(self.get_similar_names('SuperTrend Indicator'), ['Super Trend Indicator'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DuplicateToolsTest(TestCase):
+    """MinHash/LSHによる重複候補検出とツール統合を検証"""
+
+    def test_find_duplicate_clusters(self):
+        from .duplicates import find_duplicate_clusters
+
+        rows = [
+            (1, 'supertrendindicator', 'https://www.example.com/a', 'トレンド方向を表示するインジケーター'),
+            (2, 'supertrendindicator2', 'https://example.com/b', 'トレンド方向を表示するインジケーター'),
+            (3, 'rsidivergence', 'https://other.example.org/c', 'ダイバージェンスを検出'),
+        ]
+        report = find_duplicate_clusters(rows, threshold=0.6)
+        self.assertEqual([cluster['tool_ids'] for cluster in report['clusters']], [[1, 2]])
+
+    def test_merge_tools(self):
+        from .duplicates import merge_tools
+
+        primary = create_tool('Super Trend', tool_type='Indicator')
+        duplicate = create_tool('SuperTrend v2', tool_type='Indicator')
+        tag = Tag.objects.create(name='トレンド', slug='trend')
+        duplicate.tags.add(tag)
+
+        today = timezone.localdate()
+        ToolDailyStats.objects.bulk_create([
+            ToolDailyStats(tool=primary, date=today, views=10, clicks=1),
+            ToolDailyStats(tool=duplicate, date=today, views=5, duration_total=30, duration_count=1),
+            ToolDailyStats(tool=duplicate, date=today - timedelta(days=1), views=7),
+        ])
+
+        self.assertEqual(merge_tools(primary, [duplicate]), 1)
+        primary.refresh_from_db()
+        self.assertFalse(Tool.objects.filter(pk=duplicate.pk).exists())
+        self.assertEqual(primary.tag_slugs, ['trend'])
+        self.assertEqual(primary.metadata['merged_slugs'], [duplicate.slug])
+        # 日別集計は日付ごとに合算
+        self.assertEqual(
+            list(ToolDailyStats.objects.filter(tool=primary).order_by('date').values_list(
+                'date', 'views', 'clicks', 'duration_total', 'duration_count'
+            )),
+            [(today - timedelta(days=1), 7, 0, 0, 0), (today, 15, 1, 30, 1)]
+        )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BulkImportTest(TestCase):
+    """CSV一括インポート（チャンク単位のバルクupsert）を検証"""
+
+    HEADER = 'name,slug,short_description,platform,tool_type,price_type,ribbons,image_url,external_url,tags\n'
+
+    def import_csv(self, body, **kwargs):
+        import io
+        from .bulk_import import import_tools
+
+        with self.captureOnCommitCallbacks(execute=True):
+            return import_tools(io.StringIO(self.HEADER + body), **kwargs)
+
+    def test_create_update_and_tags(self):
+        create_tool(
+            'Super Trend',
+            short_description='古い説明',
+            tool_type='Indicator',
+            external_url='https://example.com/old-url',
+        )
+        result = self.import_csv(
+            'Super Trend,super-trend-new,新しい説明,MT4,Indicator,free,,https://example.com/i.png,https://example.com/new-url,RSI\n'
+            'RSI Alert,rsi-alert,アラート,mt5,Indicator,paid,featured,https://example.com/i.png,https://example.com/rsi,"RSI,MACD"\n'
+            'Broken,broken,説明,unknown,Indicator,free,,https://example.com/i.png,https://example.com/broken,\n',
+            chunk_size=2
+        )
+
+        self.assertEqual((result['rows'], result['created'], result['updated']), (3, 1, 1))
+        self.assertEqual([line for line, message in result['errors']], [4])
+
+        updated = Tool.objects.get(normalized_name='super trend', platform='mt4')
+        self.assertEqual(updated.external_url, 'https://example.com/new-url')
+        self.assertEqual(updated.short_description, '新しい説明')
+        self.assertEqual(updated.tag_slugs, ['rsi'])
+
+        created = Tool.objects.get(slug='rsi-alert')
+        self.assertEqual(created.tag_slugs, ['macd', 'rsi'])
+        self.assertEqual(created.effective_ribbons, ['featured', 'new'])
+
+    def test_dry_run_rolls_back(self):
+        result = self.import_csv(
+            'RSI Alert,rsi-alert,アラート,mt5,Indicator,paid,,https://example.com/i.png,https://example.com/rsi,\n',
+            dry_run=True
+        )
+        self.assertEqual(result['created'], 1)
+        self.assertFalse(Tool.objects.exists())
+
+    @override_settings(TOOL_ADMIN_IMPORT_MAX_ROWS=1)
+    def test_admin_row_limit(self):
+        from django.contrib.auth import get_user_model
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password'))
+        row = 'RSI Alert {0},rsi-alert-{0},アラート,mt5,Indicator,paid,,https://example.com/i.png,https://example.com/rsi-{0},\n'
+
+        def upload(rows):
+            body = self.HEADER + ''.join(row.format(i) for i in range(rows))
+            with self.captureOnCommitCallbacks(execute=True):
+                return self.client.post('/admin/tools/tool/bulk-import/', {
+                    'import_file': SimpleUploadedFile('tools.csv', body.encode('utf-8-sig'), content_type='text/csv'),
+                })
+
+        # 上限を超えるファイルは取り込まずにimport_toolsを案内する
+        response = upload(2)
+        self.assertIsNone(response.context['result'])
+        self.assertFalse(Tool.objects.exists())
+
+        response = upload(1)
+        self.assertEqual(response.context['result']['created'], 1)
+        self.assertTrue(Tool.objects.filter(slug='rsi-alert-0').exists())
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AutoTagTest(TestCase):
+    """説明文からの自動タグ付け（Aho-Corasick）を検証"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_matcher(self):
+        from .autotag import TagMatcher
+
+        matcher = TagMatcher({
+            'rsi': {1}, 'ボリンジャーバンド': {2}, 'bb': {2}, 'usdjpy': {3}, 'ma': {4}, 'ドル円': {3},
+        })
+        self.assertEqual(matcher.find_in('ＲＳＩとBBを使ったUSDJPY専用EA', 'emaとsmaは対象外'), {1, 2, 3})
+        self.assertEqual(matcher.find_in('ボリンジャーバンドでドル円を監視', None), {2, 3})
+        self.assertEqual(matcher.find_in('rsi14 / ebb'), set())
+
+    def test_apply_on_save_and_bulk(self):
+        from tags.models import TagMapping
+        from .autotag import autotag_tools
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rsi = Tag.objects.create(name='RSI', slug='rsi', synonyms=['アールエスアイ'])
+            bollinger = Tag.objects.create(name='ボリンジャーバンド', slug='bollinger-bands')
+            TagMapping.objects.create(
+                canonical_name='ボリンジャーバンド',
+                variations=['ボリバン'],
+                category='technical_indicator'
+            )
+
+        tool = create_tool('Auto Tag Tool 0', short_description='ＲＳＩの売られすぎで買うEA')
+        tool.refresh_from_db()
+        self.assertEqual(tool.tag_slugs, ['rsi'])
+
+        # 説明文を変えない保存では、外したタグを付け直さない
+        tool.tags.remove(rsi)
+        tool.name = 'Auto Tag Tool 0 (renamed)'
+        tool.save()
+        self.assertFalse(tool.tags.exists())
+        tool.long_description = 'RSIの期間は14'
+        tool.save(update_fields=['long_description'])
+        self.assertEqual(list(tool.tags.all()), [rsi])
+
+        with self.settings(TOOL_AUTO_TAGGING_ON_SAVE=False):
+            other = create_tool('Auto Tag Tool 1', short_description='ボリバンとアールエスアイの組み合わせ')
+        self.assertFalse(other.tags.exists())
+
+        result = autotag_tools(Tool.objects.all())
+        self.assertEqual(result, {'tools': 2, 'suggestions': {other.pk: sorted([rsi.pk, bollinger.pk])}})
+        self.assertFalse(other.tags.exists())
+
+        autotag_tools(Tool.objects.all(), apply=True)
+        other.refresh_from_db()
+        self.assertEqual(other.tag_slugs, ['bollinger-bands', 'rsi'])
+        self.assertEqual(autotag_tools(Tool.objects.all())['suggestions'], {})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SegmentRankingTest(TestCase):
+    """セグメント別の週間順位（ウィンドウ関数で一括計算）とランキングAPIを検証"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .rankings import update_rankings
+
+        cache.clear()
+        self.tools = {}
+        for name, platform, tool_type, score in [
+            ('Alpha', 'mt4', 'EA', 100.0),
+            ('Bravo', 'mt4', 'EA', 90.0),
+            ('Charlie', 'mt5', 'Indicator', 80.0),
+            ('Delta', 'mt5', 'EA', 70.0),
+        ]:
+            tool = create_tool(name, platform=platform, tool_type=tool_type)
+            ToolStats.objects.create(tool=tool, week_score=score)
+            self.tools[name] = tool
+        update_rankings()
+
+    def get_ranking(self, params):
+        data = self.client.get('/api/ranking/weekly/', params).json()
+        return [(row['tool']['name'], row['rank'], row['rank_change']) for row in data['rankings']]
+
+    def test_segment_ranks(self):
+        self.assertEqual(ToolStats.objects.get(tool=self.tools['Delta']).current_rank, 4)
+        self.assertEqual(self.get_ranking({'platform': 'mt5'}), [('Charlie', 1, 'NEW'), ('Delta', 2, 'NEW')])
+        self.assertEqual(self.get_ranking({'tool_type': 'EA'}), [('Alpha', 1, 'NEW'), ('Bravo', 2, 'NEW'), ('Delta', 3, 'NEW')])
+        self.assertEqual(self.get_ranking({'platform': 'mt5', 'tool_type': 'EA'}), [('Delta', 1, 'NEW')])
+        self.assertEqual(self.get_ranking({'limit': 1}), [('Alpha', 1, 'NEW')])
+
+    def test_retrieve(self):
+        delta = self.tools['Delta']
+        data = self.client.get(f'/api/ranking/weekly/{delta.pk}/').json()
+        self.assertEqual((data['tool']['name'], data['rank'], data['score']), ('Delta', 4, 70.0))
+        self.assertEqual(self.client.get(f'/api/ranking/weekly/{delta.pk}/', {'platform': 'mt4'}).status_code, 404)
+
+    def test_rank_change_and_serializer_parity(self):
+        from .rankings import update_rankings
+
+        ToolStats.objects.filter(tool=self.tools['Delta']).update(week_score=95.0)
+        update_rankings()
+        self.assertEqual(self.get_ranking({'platform': 'mt5'}), [('Delta', 1, '↑1'), ('Charlie', 2, '↓1')])
+
+        fast = self.client.get('/api/ranking/weekly/', {'tool_type': 'EA'}).json()
+        with override_settings(FAST_TOOL_SERIALIZATION=False):
+            standard = self.client.get('/api/ranking/weekly/', {'tool_type': 'EA'}).json()
+        self.assertEqual(fast, standard)
+
+    def test_cached_response_and_etag(self):
+        from django.core.cache import cache
+        from .facets import CATALOGUE_VERSION_KEY, invalidate_tool_catalogue
+        from .rankings import update_rankings, warm_ranking_cache
+
+        self.assertEqual(warm_ranking_cache(), 8)
+        response = self.client.get('/api/ranking/weekly/', {'limit': 2})
+        etag = response['ETag']
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(self.client.get('/api/ranking/weekly/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # 再集計してもカタログバージョンが変わるまではキャッシュを返す
+        ToolStats.objects.filter(tool=self.tools['Delta']).update(week_score=150.0)
+        update_rankings()
+        self.assertEqual(self.get_ranking({'limit': 1}), [('Alpha', 1, 'NEW')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_tool_catalogue()
+        response = self.client.get('/api/ranking/weekly/', {'limit': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get_ranking({'limit': 1}), [('Delta', 1, '↑3')])
+
+        # バージョンキーがevictされても、最初のETagと同じバージョンには戻らない
+        cache.delete(CATALOGUE_VERSION_KEY)
+        self.assertEqual(self.client.get('/api/ranking/weekly/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rank_history(self):
+        from .models import ToolRankSnapshot
+        from .rankings import prune_rank_history, update_rankings
+
+        # setUpの集計を1週間前の履歴にする
+        ToolRankSnapshot.objects.update(captured_at=timezone.now() - timedelta(days=7, hours=1))
+        ToolStats.objects.filter(tool=self.tools['Delta']).update(week_score=95.0)
+        update_rankings()
+        # 同じ週に再集計しても比較対象は1週間前のまま
+        update_rankings()
+        self.assertEqual(ToolStats.objects.get(tool=self.tools['Delta']).prev_week_rank, 4)
+        self.assertEqual(self.get_ranking({'platform': 'mt5'}), [('Delta', 1, '↑1'), ('Charlie', 2, '↓1')])
+
+        data = self.client.get(f'/api/tools/{self.tools["Delta"].slug}/rank-history/', {'days': 30}).json()
+        self.assertEqual([row['rank'] for row in data['history']], [4, 2, 2])
+        self.assertEqual(self.client.get('/api/tools/unknown/rank-history/').status_code, 404)
+
+        with override_settings(RANK_HISTORY_RETENTION_DAYS=3):
+            self.assertEqual(prune_rank_history(), 4)
+        self.assertEqual(ToolRankSnapshot.objects.count(), 8)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ScoringEngineTest(TestCase):
+    """日別集計からの週間スコア一括計算（時間減衰・重み設定・再計算）を検証"""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.tools = []
+        for name in ('Steady', 'Fading'):
+            self.tools.append(create_tool(name, platform='mt5'))
+        steady, fading = self.tools
+        ToolDailyStats.objects.bulk_create([
+            ToolDailyStats(tool=steady, date=self.today, views=10, clicks=1, duration_total=100, duration_count=2),
+            ToolDailyStats(tool=steady, date=self.today - timedelta(days=7), views=10, shares=1),
+            ToolDailyStats(tool=fading, date=self.today - timedelta(days=6), views=20, clicks=2),
+        ])
+        # 昨日までのEventLogは削除済み（日別集計は確定値）として扱う
+        from .models import EventLogCleanup
+        from .scoring import day_start
+        EventLogCleanup.objects.create(cutoff=day_start(self.today))
+
+    @override_settings(TOOL_SCORE_HALF_LIFE_DAYS=0)
+    def test_matches_per_object_score_without_decay(self):
+        from .scoring import compute_tool_scores
+
+        scores = compute_tool_scores(as_of=self.today)
+        for tool in self.tools:
+            stats = ToolStats(tool=tool, **{
+                name: value for name, value in scores[tool.pk].items() if name != 'week_score'
+            })
+            self.assertEqual(scores[tool.pk]['week_score'], stats.calculate_score())
+        self.assertEqual(scores[self.tools[0].pk]['week_avg_duration'], 50.0)
+
+    @override_settings(TOOL_SCORE_HALF_LIFE_DAYS=7, TOOL_SCORE_WEIGHTS={'views': 1.0})
+    def test_decay_weights_and_numpy_parity(self):
+        from .scoring import NUMPY_ENABLED, compute_tool_scores
+
+        steady, fading = self.tools
+        scores = compute_tool_scores(as_of=self.today, use_numpy=False)
+        # 7日前の日も半分の重みで残り、6日前の日は減衰する
+        self.assertEqual(scores[steady.pk]['week_score'], 10 + 5.0 + 2.5 + 5 + 1.0)
+        self.assertEqual(scores[steady.pk]['week_views'], 10)
+        self.assertLess(scores[fading.pk]['week_score'], 20 + 10.0)
+        if NUMPY_ENABLED:
+            self.assertEqual(compute_tool_scores(as_of=self.today, use_numpy=True), scores)
+
+    def test_admin_calculate_scores(self):
+        from django.contrib.auth import get_user_model
+        from .facets import get_catalogue_version
+
+        steady, fading = self.tools
+        past = timezone.now() - timedelta(days=1)
+        ToolStats.objects.create(tool=steady, week_score=123.0)
+        ToolStats.objects.create(tool=fading)
+        ToolStats.objects.update(last_updated=past)
+        EventLog.objects.create(tool=fading, event_type='click')
+        version = get_catalogue_version()
+
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/tools/toolstats/', {'action': 'calculate_scores', '_selected_action': [fading.pk]})
+
+        # 今日の日別集計はEventLogから作り直され、選択したツールのみ更新される
+        stats = ToolStats.objects.get(tool=fading)
+        self.assertEqual((stats.week_clicks, stats.week_views), (3, 20))
+        self.assertGreater(stats.last_updated, past)
+        self.assertEqual(ToolStats.objects.get(tool=steady).week_score, 123.0)
+        self.assertNotEqual(get_catalogue_version(), version)
+
+    def test_rank_ties_follow_database_collation(self):
+        from .rankings import compute_ranks
+        from .scoring import get_name_order, rank_tools
+
+        # Pythonの文字列比較では 'Beta' < 'alpha'（DBの照合順序では異なり得る）
+        for name in ('charlie', 'Beta', 'alpha'):
+            ToolStats.objects.create(tool=create_tool(name))
+        tools = list(Tool.objects.filter(stats__isnull=False).order_by('id').values_list('id', 'platform', 'tool_type'))
+        ranks = rank_tools(tools, [0.0] * len(tools), get_name_order())
+
+        expected = {row['tool_id']: row['global_rank'] for row in compute_ranks()}
+        self.assertEqual({tool[0]: rank['global_rank'] for tool, rank in zip(tools, ranks)}, expected)
+
+    def test_replay_and_weekly_stats_command(self):
+        from django.core.management import call_command
+        from .models import ToolRankSnapshot
+        from .scoring import replay_scores
+
+        Tool.objects.update(created_at=timezone.now() - timedelta(days=30))
+        start = self.today - timedelta(days=3)
+        self.assertEqual(replay_scores(start, self.today), 8)
+        history = list(ToolRankSnapshot.objects.filter(tool=self.tools[1]).order_by('captured_at').values_list('rank', flat=True))
+        self.assertEqual(history, [1, 1, 1, 2])
+
+        EventLog.objects.create(tool=self.tools[1], event_type='click')
+        call_command('update_weekly_stats', stdout=StringIO())
+        stats = ToolStats.objects.get(tool=self.tools[1])
+        # 今日の日別集計はEventLogから作り直される
+        self.assertEqual((stats.week_clicks, stats.week_views), (3, 20))
+
+    def test_cleanup_events_records_watermark(self):
+        from django.core.management import call_command
+        from .models import EventLogCleanup
+        from .scoring import day_start, get_rollup_watermark, refresh_daily_stats
+
+        steady = self.tools[0]
+        EventLogCleanup.objects.all().delete()
+        ToolDailyStats.objects.all().delete()
+        for days in (4, 3, 3, 1):
+            event = EventLog.objects.create(tool=steady, event_type='view')
+            EventLog.objects.filter(pk=event.pk).update(created_at=day_start(self.today - timedelta(days=days)) + timedelta(hours=12))
+
+        # 削除前に削除対象の日を集計し、確定日（削除基準日時の日）を記録する
+        call_command('cleanup_events', days=2, stdout=StringIO())
+        self.assertEqual(EventLog.objects.count(), 1)
+        watermark = get_rollup_watermark()
+        self.assertEqual(watermark, self.today - timedelta(days=2))
+        rollups = dict(ToolDailyStats.objects.values_list('date', 'views'))
+        self.assertEqual(rollups, {self.today - timedelta(days=4): 1, self.today - timedelta(days=3): 2})
+
+        # 確定日以前の集計は作り直さず、それより後の日のみEventLogから作り直す
+        refresh_daily_stats(self.today - timedelta(days=7), self.today)
+        self.assertEqual(
+            dict(ToolDailyStats.objects.values_list('date', 'views')),
+            {**rollups, self.today - timedelta(days=1): 1}
+        )
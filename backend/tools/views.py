@@ -7,7 +7,52 @@ from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as django_filters
 from .models import Tool
-from .serializers import ToolSerializer, ToolListSerializer
+from .serializers import (
+    ToolSerializer,
+    ToolListSerializer,
+    ToolListFastSerializer,
+    parse_csv_param,
+    use_fast_tool_serialization,
+)
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields= / ?expand= 対応ビューミックスイン
+    
+    DynamicFieldsMixinを持つシリアライザに返却フィールドを渡し、
+    get_queryset()側では get_selected_fields() を見て取得カラム・prefetchを絞り込む
+    """
+    
+    def get_requested_fields(self):
+        """クエリパラメータから返却フィールドを決定（未指定はNone）"""
+        if not hasattr(self, '_requested_fields'):
+            serializer_class = self.get_serializer_class()
+            request = getattr(self, 'request', None)
+            if request is None or not hasattr(serializer_class, 'resolve_fields'):
+                self._requested_fields = None
+            else:
+                self._requested_fields = serializer_class.resolve_fields(
+                    parse_csv_param(request.query_params.get('fields')),
+                    parse_csv_param(request.query_params.get('expand')),
+                )
+        return self._requested_fields
+    
+    def get_selected_fields(self):
+        """実際に返却されるフィールド名のセット"""
+        fields = self.get_requested_fields()
+        if fields is None:
+            serializer_class = self.get_serializer_class()
+            if hasattr(serializer_class, 'get_field_names'):
+                return set(serializer_class.get_field_names())
+            return set(serializer_class().fields)
+        return set(fields)
+    
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
 
 
 class ToolFilter(django_filters.FilterSet):
@@ -23,7 +68,8 @@ class ToolFilter(django_filters.FilterSet):
     price_type = django_filters.ChoiceFilter(choices=Tool.PRICE_TYPE_CHOICES)
     
     # タグフィルタ（複数選択可、カンマ区切り）
-    tags = django_filters.CharFilter(method='filter_tags')
+    tags = django_filters.CharFilter(method='filter_tags')  # すべて含む
+    tags_any = django_filters.CharFilter(method='filter_tags_any')  # いずれかを含む
     
     # リボンフィルタ
     ribbons = django_filters.CharFilter(method='filter_ribbons')
@@ -33,7 +79,7 @@ class ToolFilter(django_filters.FilterSet):
     
     class Meta:
         model = Tool
-        fields = ['platform', 'tool_type', 'price_type', 'tags', 'ribbons', 'category']
+        fields = ['platform', 'tool_type', 'price_type', 'tags', 'tags_any', 'ribbons', 'category']
     
     def filter_platform(self, queryset, name, value):
         """プラットフォームフィルタ（カンマ区切りで複数指定可、OR条件）"""
@@ -48,36 +94,51 @@ class ToolFilter(django_filters.FilterSet):
         return queryset.filter(tool_type__in=tool_types)
     
     def filter_tags(self, queryset, name, value):
-        """タグフィルタ（カンマ区切りで複数指定可）"""
-        tag_slugs = [slug.strip() for slug in value.split(',')]
-        for slug in tag_slugs:
-            queryset = queryset.filter(tags__slug=slug)
-        return queryset.distinct()
+        """タグフィルタ（カンマ区切りで複数指定可、AND条件: tag_slugs @> 指定スラッグ）"""
+        tag_slugs = [slug.strip() for slug in value.split(',') if slug.strip()]
+        return queryset.filter(tag_slugs__contains=tag_slugs)
+    
+    def filter_tags_any(self, queryset, name, value):
+        """タグフィルタ（カンマ区切りで複数指定可、OR条件: tag_slugs && 指定スラッグ）"""
+        tag_slugs = [slug.strip() for slug in value.split(',') if slug.strip()]
+        if not tag_slugs:
+            return queryset
+        return queryset.filter(tag_slugs__overlap=tag_slugs)
     
     def filter_ribbons(self, queryset, name, value):
-        """リボンフィルタ（カンマ区切りで複数指定可）"""
-        ribbons = [r.strip() for r in value.split(',')]
-        for ribbon in ribbons:
-            queryset = queryset.filter(ribbons__contains=[ribbon])
-        return queryset
+        """
+        リボンフィルタ（カンマ区切りで複数指定可、AND条件）
+        
+        自動リボン（new / popular）を含む実効リボンで判定（GINインデックス @>）
+        """
+        ribbons = [r.strip() for r in value.split(',') if r.strip()]
+        return queryset.filter(effective_ribbons__contains=ribbons)
     
     def filter_category(self, queryset, name, value):
         """カテゴリフィルタ（slug指定）"""
         return queryset.filter(category__slug=value)
 
 
-class ToolViewSet(viewsets.ReadOnlyModelViewSet):
+class ToolViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ツールAPI
     
     list: ツール一覧取得（検索・フィルタリング対応）
     retrieve: ツール詳細取得
     related: 関連ツール取得（SEO内部リンク用）
+    rank_history: 週間順位の推移（トレンドグラフ用）
+    bulk: 複数ツール一括取得（slug / id指定）
+    facets: フィルタ選択肢ごとの件数（検索画面用）
+    export: 全ツールのNDJSONストリーミング出力（静的サイト生成用）
     
     ソートオプション:
     - ordering=-week_score: 人気順（週間スコア降順）
     - ordering=-created_at: 新着順
     - ordering=name: 名前順（昇順）
+    
+    フィールド指定:
+    - fields=id,name,slug: 指定フィールドのみ返却
+    - expand=tags,stats: 重いフィールドを除いた軽量版 + 指定分を返却
     """
     lookup_field = 'slug'
     
@@ -85,27 +146,269 @@ class ToolViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = ToolFilter
     search_fields = ['name', 'short_description', 'long_description']
     ordering_fields = ['created_at', 'name', 'week_score']
-    ordering = ['-week_score', '-created_at']  # デフォルトは人気順
+    ordering = ['-week_score', '-created_at', '-id']  # デフォルトは人気順
+    
+    # 人気順の同点の並び（ビットマップインデックスの並び順と一致させる）
+    popularity_tiebreak = ('-created_at', '-id')
+    
+    # シリアライザフィールド → 必要なカラム（stats__はselect_relatedで取得）
+    field_dependencies = {
+        'ribbons': ('effective_ribbons',),
+        'week_rank': ('stats__current_rank',),
+        'week_rank_change': ('stats__current_rank', 'stats__prev_week_rank'),
+        'week_views': ('stats__week_views',),
+    }
     
     def get_queryset(self):
         """
         week_scoreでのソートをサポートするため、
         statsをannotateしてweek_scoreをToolレベルで参照可能にする
+        
+        返却フィールドに応じて only() / select_related / prefetch を絞り込む
         """
-        from django.db.models import F, Value
+        from django.db.models import F, Prefetch, Value
         from django.db.models.functions import Coalesce
+        from tags.models import Tag
+        
+        selected = self.get_selected_fields()
+        concrete_fields = {f.name for f in Tool._meta.concrete_fields}
         
-        return Tool.objects.prefetch_related('tags').select_related('stats').annotate(
+        columns = {'id'}
+        for name in selected:
+            if name in self.field_dependencies:
+                columns.update(self.field_dependencies[name])
+            elif name in concrete_fields:
+                columns.add(name)
+        
+        queryset = Tool.objects.only(*columns)
+        
+        if any(column.startswith('stats__') for column in columns):
+            queryset = queryset.select_related('stats')
+        
+        if selected & {'tags', 'tag_names'}:
+            # TagSimpleSerializerのcategory用にtag_categoryも同時取得
+            queryset = queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.select_related('tag_category'))
+            )
+        
+        return queryset.annotate(
             # statsがないツールは0として扱う
             week_score=Coalesce(F('stats__week_score'), Value(0.0))
         )
     
+    def filter_queryset(self, queryset):
+        """
+        人気順（ordering=-week_score等）の同点を新着順 → ID降順で並べる
+        
+        ビットマップインデックス経由の一覧と同じ順序にし、ページ間の重複・欠落を防ぐ
+        """
+        queryset = super().filter_queryset(queryset)
+        ordering = list(queryset.query.order_by)
+        if ordering[:1] == ['-week_score']:
+            tiebreak = [field for field in self.popularity_tiebreak if field not in ordering]
+            if tiebreak:
+                queryset = queryset.order_by(*ordering, *tiebreak)
+        return queryset
+    
     def get_serializer_class(self):
         """一覧と詳細でシリアライザを使い分け"""
         if self.action == 'list':
             return ToolListSerializer
         return ToolSerializer
     
+    def list(self, request, *args, **kwargs):
+        """
+        ツール一覧取得
+        
+        FAST_TOOL_SERIALIZATION有効時はvalues()ベースのToolListFastSerializerで
+        ToolListSerializerと同一のJSONを生成する
+        
+        TOOL_BITMAP_INDEX有効時は絞り込み・件数・ページ分割をビットマップインデックスで行い、
+        DBからは表示ページ分のツールのみ取得する（インデックスで扱えない条件はDBで処理）
+        """
+        from rest_framework.response import Response
+        from .bitmap_index import get_tool_bitmap_index
+        
+        index = get_tool_bitmap_index()
+        bits = index.filter(request.query_params) if index is not None else None
+        if bits is not None:
+            result = index.result(bits)
+            page = self.paginate_queryset(result)
+            if page is not None:
+                return self.get_paginated_response(self.serialize_tool_ids(page))
+            return Response(self.serialize_tool_ids(list(result)))
+        
+        if not use_fast_tool_serialization():
+            return super().list(request, *args, **kwargs)
+        
+        serializer = ToolListFastSerializer(fields=self.get_requested_fields())
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(
+            *serializer.get_value_fields()
+        )
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize_rows(page))
+        return Response(serializer.serialize_rows(queryset))
+    
+    def serialize_tool_ids(self, tool_ids):
+        """ツールID列を一覧用にシリアライズ（ID列の順序を維持）"""
+        position = {tool_id: i for i, tool_id in enumerate(tool_ids)}
+        
+        if use_fast_tool_serialization():
+            serializer = ToolListFastSerializer(fields=self.get_requested_fields())
+            rows = Tool.objects.filter(id__in=tool_ids).values(*serializer.get_value_fields())
+            return serializer.serialize_rows(sorted(rows, key=lambda row: position[row['id']]))
+        
+        tools = sorted(
+            self.get_queryset().filter(id__in=tool_ids),
+            key=lambda tool: position[tool.id]
+        )
+        return self.get_serializer(tools, many=True).data
+    
+    # 一括取得の最大件数
+    bulk_max_items = 100
+    
+    @action(detail=False, methods=['get'])
+    def bulk(self, request):
+        """
+        複数ツール一括取得API
+        
+        GET /api/tools/bulk/?slugs=a,b,c
+        GET /api/tools/bulk/?ids=1,2,3
+        
+        - 1クエリ（+ prefetch）で取得し、リクエストの指定順で返却
+        - 見つからなかったslug / idは missing に列挙
+        - fields / expand パラメータにも対応
+        """
+        from rest_framework import status
+        from rest_framework.response import Response
+        
+        slugs = list(dict.fromkeys(parse_csv_param(request.query_params.get('slugs')) or []))
+        try:
+            ids = list(dict.fromkeys(
+                int(value) for value in parse_csv_param(request.query_params.get('ids')) or []
+            ))
+        except ValueError:
+            return Response(
+                {'error': 'idsは整数のカンマ区切りで指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not slugs and not ids:
+            return Response(
+                {'error': 'slugsまたはidsを指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(slugs) + len(ids) > self.bulk_max_items:
+            return Response(
+                {'error': f'一度に取得できるのは{self.bulk_max_items}件までです'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        tools = list(self.get_queryset().filter(
+            models.Q(slug__in=slugs) | models.Q(id__in=ids)
+        ))
+        by_slug = {tool.slug: tool for tool in tools}
+        by_id = {tool.id: tool for tool in tools}
+        
+        # リクエスト順に並べ替え（slugs → ids、重複は除外）
+        ordered = []
+        seen = set()
+        for tool in [by_slug.get(slug) for slug in slugs] + [by_id.get(pk) for pk in ids]:
+            if tool is not None and tool.id not in seen:
+                seen.add(tool.id)
+                ordered.append(tool)
+        
+        serializer = self.get_serializer(ordered, many=True)
+        return Response({
+            'count': len(ordered),
+            'results': serializer.data,
+            'missing': {
+                'slugs': [slug for slug in slugs if slug not in by_slug],
+                'ids': [pk for pk in ids if pk not in by_id],
+            },
+        })
+    
+    # エクスポート時のサーバーサイドカーソル取得件数
+    export_chunk_size = 500
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        全ツールのストリーミングエクスポートAPI（NDJSON）
+        
+        GET /api/tools/export/
+        GET /api/tools/export/?updated_since=2025-12-01T00:00:00%2B09:00
+        
+        - 1行1ツールのNDJSONを返す（ページング・COUNT不要）
+        - iterator(chunk_size)でサーバーサイドカーソルを使い、行ごとにシリアライズ
+          → カタログ件数に関わらずメモリ使用量は一定
+        - fields / expand パラメータにも対応
+        """
+        import json
+        from django.http import StreamingHttpResponse
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+        from rest_framework import status
+        from rest_framework.response import Response
+        from rest_framework.utils.encoders import JSONEncoder
+        
+        queryset = self.get_queryset().order_by('id')
+        
+        updated_since = request.query_params.get('updated_since')
+        if updated_since:
+            since = parse_datetime(updated_since)
+            if since is None:
+                return Response(
+                    {'error': 'updated_sinceはISO 8601形式で指定してください'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(updated_at__gte=since)
+        
+        # シリアライザは1つだけ生成し、行ごとにto_representationを呼ぶ
+        serializer = self.get_serializer()
+        
+        def stream():
+            for tool in queryset.iterator(chunk_size=self.export_chunk_size):
+                yield json.dumps(
+                    serializer.to_representation(tool),
+                    cls=JSONEncoder,
+                    ensure_ascii=False
+                ) + '\n'
+        
+        return StreamingHttpResponse(stream(), content_type='application/x-ndjson; charset=utf-8')
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        ファセット件数API（検索画面のフィルタ選択肢用）
+        
+        GET /api/tools/facets/?platform=mt4&tags=rsi&search=...
+        
+        - ToolFilterと同じパラメータ（+ search）で絞り込んだ結果セットの
+          platform / tool_type / price_type / ribbons / tags ごとの件数を返却
+        - 1回のSQLで集計し、正規化したフィルタ条件ごとにキャッシュ
+          （TOOL_BITMAP_INDEX有効時はビットマップインデックスで集計）
+        """
+        from rest_framework.response import Response
+        from .bitmap_index import get_tool_bitmap_index
+        from .facets import get_tool_facets
+        
+        index = get_tool_bitmap_index()
+        bits = index.filter(request.query_params) if index is not None else None
+        if bits is not None:
+            return Response(index.facets(bits))
+        
+        # 並び替え（OrderingFilter）は件数に影響しないため適用しない
+        queryset = Tool.objects.all()
+        for backend in (DjangoFilterBackend, filters.SearchFilter):
+            queryset = backend().filter_queryset(request, queryset, self)
+        
+        return Response(get_tool_facets(queryset, request.query_params))
+    
     @action(detail=True, methods=['get'])
     def related(self, request, slug=None):
         """
@@ -128,7 +431,7 @@ class ToolViewSet(viewsets.ReadOnlyModelViewSet):
             related_tools = Tool.objects.filter(
                 platform=tool.platform,
                 tool_type=tool.tool_type
-            ).exclude(id=tool.id).order_by('-created_at')[:6]
+            ).exclude(id=tool.id).order_by('-created_at')
         else:
             # タグベースで関連ツールを取得
             related_tools = Tool.objects.filter(
@@ -153,12 +456,64 @@ class ToolViewSet(viewsets.ReadOnlyModelViewSet):
             ).annotate(
                 # 総合スコア = タグ一致数 + platform + tool_type
                 relevance_score=models.F('tag_match_count') + models.F('platform_match') + models.F('type_match')
-            ).order_by('-relevance_score', '-created_at').distinct()[:6]
+            ).order_by('-relevance_score', '-created_at').distinct()
+        
+        if use_fast_tool_serialization():
+            results = ToolListFastSerializer().serialize_queryset(related_tools, limit=6)
+        else:
+            results = ToolListSerializer(related_tools[:6], many=True).data
+        return Response({
+            'count': len(results),
+            'results': results
+        })
+    
+    @action(detail=True, methods=['get'], url_path='rank-history')
+    def rank_history(self, request, slug=None):
+        """
+        週間順位の推移取得API（トレンドグラフ用）
+        
+        GET /api/tools/{slug}/rank-history/?days=90
+        
+        パラメータ:
+        - days: 取得する日数（デフォルト: 90、最大: 順位履歴の保持日数）
         
-        serializer = ToolListSerializer(related_tools, many=True)
+        ToolRankSnapshotの (tool, captured_at) インデックスの範囲読み込みのみで取得し、
+        集計日時の昇順で返す
+        """
+        from datetime import timedelta
+        from django.shortcuts import get_object_or_404
+        from django.utils import timezone
+        from rest_framework import status
+        from rest_framework.response import Response
+        from .models_stats import ToolRankSnapshot
+        from .rankings import get_rank_history_retention_days
+        
+        retention_days = get_rank_history_retention_days()
+        try:
+            days = int(request.query_params.get('days', 90))
+        except ValueError:
+            return Response(
+                {'error': 'daysは整数で指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        days = min(max(days, 1), retention_days)
+        
+        # ツール本体は不要のため、IDのみ取得
+        tool_id = get_object_or_404(Tool.objects.values_list('pk', flat=True), slug=slug)
+        history = list(
+            ToolRankSnapshot.objects.filter(
+                tool_id=tool_id,
+                captured_at__gte=timezone.now() - timedelta(days=days)
+            ).order_by('captured_at').values(
+                'captured_at', 'rank', 'platform_rank', 'type_rank', 'segment_rank',
+                'score', 'views', 'clicks', 'shares', 'avg_duration'
+            )
+        )
         return Response({
-            'count': len(serializer.data),
-            'results': serializer.data
+            'slug': slug,
+            'days': days,
+            'count': len(history),
+            'history': history
         })
 
 
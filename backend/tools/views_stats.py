@@ -1,73 +1,93 @@
 """
 週間ランキングAPI
 """
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from .models import Tool
-from .models_stats import ToolStats, EventLog
+from .models_stats import EventLog, ToolStats
+from .rankings import RANKING_SIZE, get_ranking_response, get_segment_ranks
 from .serializers_stats import (
     WeeklyRankingSerializer,
     EventTrackingSerializer
 )
 
 
-class WeeklyRankingViewSet(viewsets.ReadOnlyModelViewSet):
+class WeeklyRankingViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     """
     週間ランキングAPI
     
     list: 週間ランキング取得（TOP50）
+    retrieve: 全体TOP50内のツールの週間統計（/api/ranking/weekly/{tool_id}/）
     
     クエリパラメータ:
     - platform: プラットフォームフィルタ（mt4|mt5|tradingview）
     - tool_type: ツールタイプフィルタ（EA|Indicator|Library|Script|Strategy）
+    - limit: 件数（最大50）
+    
+    フィルタ指定時は全体TOP50の絞り込みではなく、セグメント内の順位で上位50件を返す
+    （update_weekly_statsで計算済みのToolSegmentRankを読み込むだけ）
+    
+    キャッシュ:
+    - セグメントごとの上位50件のレスポンスをカタログバージョン付きでキャッシュし、limitはその先頭を返す
+    - ETag / X-Ranking-Version ヘッダーにカタログバージョンを付与（If-None-Match一致時は304）
     """
     serializer_class = WeeklyRankingSerializer
     
     # ページネーション無効化（TOP50のみ表示）
     pagination_class = None
     
+    def get_limit(self):
+        """件数（1〜50、不正な値は50）"""
+        try:
+            return max(1, min(int(self.request.query_params.get('limit', RANKING_SIZE)), RANKING_SIZE))
+        except ValueError:
+            return RANKING_SIZE
+    
     def get_queryset(self):
-        """クエリセット取得（プラットフォーム・ツールタイプフィルタ対応）"""
-        queryset = ToolStats.objects.select_related('tool').filter(
-            current_rank__isnull=False,
-            current_rank__lte=50
-        ).order_by('current_rank')
-        
-        # プラットフォームフィルタ
-        platform = self.request.query_params.get('platform')
-        if platform:
-            # CharFieldの単純な等価比較
-            queryset = queryset.filter(tool__platform=platform)
-        
-        # ツールタイプフィルタ
-        tool_type = self.request.query_params.get('tool_type')
-        if tool_type:
-            queryset = queryset.filter(tool__tool_type=tool_type)
+        """セグメント（プラットフォーム × ツールタイプ）の上位N件（retrieveは全体TOP50のToolStats）"""
+        if self.action == 'retrieve':
+            queryset = ToolStats.objects.select_related('tool').filter(
+                current_rank__isnull=False,
+                current_rank__lte=RANKING_SIZE
+            )
+            platform = self.request.query_params.get('platform')
+            if platform:
+                queryset = queryset.filter(tool__platform=platform)
+            tool_type = self.request.query_params.get('tool_type')
+            if tool_type:
+                queryset = queryset.filter(tool__tool_type=tool_type)
+            return queryset
         
-        # limit パラメータ対応
-        limit = self.request.query_params.get('limit')
-        if limit:
-            try:
-                limit = int(limit)
-                queryset = queryset[:limit]
-            except ValueError:
-                pass
-        
-        return queryset
+        return get_segment_ranks(
+            self.request.query_params.get('platform', ''),
+            self.request.query_params.get('tool_type', ''),
+            self.get_limit()
+        )
     
     def list(self, request, *args, **kwargs):
         """ランキング一覧取得"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        from django.utils.http import parse_etags
+        from .facets import get_catalogue_version
         
-        # レスポンスにメタ情報を追加
+        version = get_catalogue_version()
+        etag = f'"weekly-ranking-{version}"'
+        headers = {'ETag': etag, 'X-Ranking-Version': str(version)}
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        data = get_ranking_response(
+            request.query_params.get('platform', ''),
+            request.query_params.get('tool_type', ''),
+            version=version
+        )
+        rankings = data['rankings'][:self.get_limit()]
         return Response({
-            'updated_at': queryset.first().last_updated if queryset.exists() else None,
-            'count': queryset.count(),
-            'rankings': serializer.data
-        })
+            'updated_at': data['updated_at'],
+            'count': len(rankings),
+            'rankings': rankings
+        }, headers=headers)
 
 
 @api_view(['POST'])